@@ -1,30 +1,259 @@
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 from pathlib import Path
 import warnings
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import webbrowser
 import unicodedata
 import re
+from html import escape
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+from functools import partial, wraps
+import threading
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o pico de memória não é medido
+    resource = None
 
 warnings.filterwarnings('ignore')
 
-# Configurações iniciais
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', 1000)
-pd.set_option('display.max_rows', 100)
+# Dependências pesadas (plotly, xlsxwriter, pyarrow, duckdb, streamlit) são importadas só na etapa que as usa:
+# quem importa o módulo para a análise carrega apenas pandas e numpy (ver tests/test_importacao.py)
 
-# Definir caminho do arquivo
-caminho_planilha = "C:/Users/walace.gorino/Documents/analise chamados do suporte.xlsx"
-path = Path(caminho_planilha)
-out_dir = path.parent
+# Planilha analisada: a da linha de comando, a de configurar_execucao ou a da variável de ambiente (não há padrão)
+caminho_planilha = os.environ.get('ANALISE_CHAMADOS_PLANILHA')
+path = Path(caminho_planilha) if caminho_planilha else None
+out_dir = path.parent if path else None
+
+# Cache colunar da planilha (Feather) para evitar reler o Excel a cada execução; sem pasta definida, não há cache
+cache_dir = out_dir / "cache_chamados" if out_dir else None
+CACHE_TAMANHO_MAX_MB = 2048
+CACHE_IDADE_MAX_DIAS = 30
+VERSAO_CACHE = 2
+
+# Armazém de resultados: a saída de cada etapa fica no cache sob o hash das entradas e parâmetros que a produziram
+USAR_CACHE = True  # False (--sem-cache): nenhum cache é lido nem gravado
+ATUALIZAR_CACHE = False  # True (--atualizar-cache): o cache existente é ignorado e regravado a partir do Excel
+VERSAO_RESULTADOS = 3
+
+# Leitura em blocos para planilhas maiores que a memória disponível
+MODO_STREAMING = False
+TAMANHO_BLOCO = 50_000
+
+# Análise incremental: só as linhas acrescentadas desde a última execução são processadas
+MODO_INCREMENTAL = False
+RECONSTRUIR_ESTADO = False
+ARQUIVO_ESTADO = "estado_incremental_chamados.pkl"
+estado_path = out_dir / ARQUIVO_ESTADO if out_dir else None
+VERSAO_ESTADO = 6
+
+# Dashboard: plotly.js embutido no HTML ('inline', para uso offline) ou carregado da CDN em versão fixa ('cdn')
+MODO_PLOTLY = 'cdn'  # --plotly inline
+MODOS_PLOTLY = ('cdn', 'inline')
+CASAS_DECIMAIS_GRAFICOS = 4
+
+# Detalhe de todas as categorias no dashboard: arquivos .js ao lado do HTML, carregados só ao abrir uma categoria
+PASTA_DETALHES = "detalhes_categorias"
+CATEGORIAS_POR_PARTE_DETALHES = 50
+TOP_SOLUCOES_DETALHES = 10
+
+# Exportação Excel: escrita em fluxo (constant_memory do xlsxwriter) e tabelas grandes divididas em várias abas
+EXCEL_MEMORIA_CONSTANTE = True
+LINHAS_MAX_ABA_EXCEL = 1_048_575  # limite de 1.048.576 linhas do Excel, menos o cabeçalho
+LINHAS_POR_LOTE_EXCEL = 10_000  # linhas convertidas para tipos nativos de cada vez ao gravar uma aba
+FORMATOS_EXPORTACAO = ('xlsx',)  # também 'csv.gz' e 'parquet': cópia completa de cada tabela, sem o limite do Excel
+
+# Quantidade de categorias e de soluções por categoria nos relatórios de soluções
+TOP_CATEGORIAS_SOLUCOES = 5
+TOP_SOLUCOES_CONSOLE = 3
+TOP_SOLUCOES_DASHBOARD = 5
+
+# Saídas (dashboard e Excel) geradas em paralelo; várias planilhas (uma por equipe) processadas em processos separados
+MAX_TAREFAS_PARALELAS = None
+PLANILHAS_EQUIPES = []
+ABRIR_NAVEGADOR = True
+ETAPAS_SAIDA = ('dashboard', 'excel')  # saídas geradas; na linha de comando, --apenas escolhe um subconjunto
+
+# Leitura de várias pastas de trabalho (uma por mês, com uma ou mais abas por equipe) num único conjunto de chamados
+ABAS_PLANILHA = None  # None: todas as abas com colunas de chamados; ou uma lista de nomes de abas
+EXTENSOES_PLANILHA = ('.xlsx', '.xlsm', '.xls')  # arquivos considerados ao receber uma pasta
+COLUNAS_ORIGEM = ['Arquivo_Origem', 'Aba_Origem']
+
+# Unifica variantes de grafia das categorias (ex.: "Impressora" e "impressora ") antes de agrupar
+CANONICALIZAR_CATEGORIAS = False
+
+# Agrupa soluções quase iguais ("Reiniciado o computador", "reiniciei o pc") antes de contar (--agrupar-solucoes)
+AGRUPAR_SOLUCOES_SIMILARES = False
+LIMIAR_SIMILARIDADE_SOLUCOES = 0.5  # Jaccard entre os conjuntos de radicais das duas soluções
+N_PERMUTACOES_MINHASH = 64
+FAIXAS_LSH = 16
+TAMANHO_RADICAL = 5
+VERSAO_ASSINATURAS = 1
+PALAVRAS_VAZIAS = {'o', 'a', 'os', 'as', 'um', 'uma', 'de', 'do', 'da', 'dos', 'das', 'e', 'em', 'no', 'na', 'nos', 'nas',
+                   'ao', 'aos', 'para', 'pra', 'por', 'pelo', 'pela', 'com', 'foi', 'feito', 'feita', 'realizado',
+                   'realizada', 'efetuado', 'efetuada', 'se', 'que', 'ja'}
+SINONIMOS_SOLUCOES = {'pc': 'computador', 'micro': 'computador', 'maquina': 'computador', 'desktop': 'computador',
+                      'note': 'notebook', 'laptop': 'notebook', 'reboot': 'reiniciado', 'email': 'correio', 'outlook': 'correio',
+                      'impressao': 'impressora', 'login': 'acesso', 'logon': 'acesso', 'pw': 'senha', 'password': 'senha'}
+
+# Compactação do frame após a carga: só as colunas dos papéis detectados, textos como category/Arrow
+COMPACTAR_MEMORIA = True
+PROPORCAO_MAX_CATEGORIA = 0.5  # acima desta proporção de valores distintos o texto vira string do Arrow
+
+# Cubo de agregados persistido por planilha: execuções seguintes não relêem as linhas se ela não mudou
+USAR_CUBO = True
+VERSAO_CUBO = 4
+DIMENSOES_CUBO = {'categoria', 'solucao', 'status', 'ano', 'mes', 'dia_semana', 'hora', 'data'}
+NOMES_DIMENSOES_TEMPO = {'ano': 'Ano', 'mes': 'Mês', 'dia_semana': 'Dia_Semana', 'hora': 'Hora', 'data': 'Data'}
+
+# SLA: tempo de resolução em horas úteis entre a abertura e o fechamento de cada chamado
+HORARIO_COMERCIAL = (8, 18)  # início e fim do expediente, em horas
+DIAS_UTEIS = '1111100'  # segunda a domingo, no formato weekmask do numpy
+FERIADOS = []  # datas 'AAAA-MM-DD' sem expediente
+META_SLA_HORAS = 16  # prazo de resolução em horas úteis, para o percentual de chamados no prazo
+PERCENTIS_SLA = (50, 90, 99)
+# Durações arredondadas para cima a esta resolução: as contagens por duração da leitura em blocos têm no máximo uma
+# entrada por faixa, e "no prazo" não muda enquanto a meta for múltipla da resolução
+RESOLUCAO_SLA_MINUTOS = 15
+
+# Tendências: contagens diárias e semanais de cada categoria comparadas com a média móvel dos períodos anteriores
+JANELA_TENDENCIA_DIAS = 28
+JANELA_TENDENCIA_SEMANAS = 8
+LIMIAR_Z_TENDENCIA = 3.0  # z-score a partir do qual a categoria é destacada como em alta
+MIN_CHAMADOS_TENDENCIA = 5  # mínimo no período para o alerta; categorias com menos no total ficam fora da matriz
+DESVIO_MINIMO_TENDENCIA = 1.0  # piso do desvio, para séries sem variação não gerarem z-scores infinitos
+VERSAO_TENDENCIAS = 1
+TOP_TENDENCIAS_DASHBOARD = 5
+SEMANAS_GRAFICO_TENDENCIAS = 52
+
+# Backend das contagens por várias chaves (cubo e pares categoria × solução); os resultados são idênticos
+BACKEND_AGREGACAO = 'pandas'  # 'duckdb' (--backend duckdb): multithread e com despejo em disco quando passa do limite de memória
+BACKENDS_AGREGACAO = ('pandas', 'duckdb')
+LIMITE_MEMORIA_DUCKDB = None  # ex.: '2GB'; None usa o padrão do DuckDB (80% da RAM)
+
+# Instrumentação: tempo, memória e linhas por etapa num relatório JSON ao lado do dashboard
+PERFILAR_ETAPAS = False  # também grava um .prof (cProfile) por etapa
+_medicoes_etapas = []
+_trava_medicoes = threading.Lock()
+
+def _pico_memoria_mb():
+    """Maior memória residente (RSS) desde o início do processo em MB, ou None onde não há getrusage"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _memoria_atual_mb():
+    """Memória residente (RSS) do processo neste momento em MB, ou None fora do Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+
+def _contar_linhas(valores):
+    """Quantidade de linhas do primeiro DataFrame encontrado entre os valores"""
+    for valor in valores:
+        if isinstance(valor, tuple):
+            valor = valor[0] if valor else None
+        if isinstance(valor, pd.DataFrame):
+            return len(valor)
+    return None
+
+def instrumentar(funcao):
+    """Registra tempo, memória e linhas de entrada/saída de cada chamada da etapa
+
+    ru_maxrss é o pico de toda a vida do processo: pico_processo_mb só mostra a etapa quando ela o eleva. O uso da
+    própria etapa vem do RSS atual lido no início e no fim (memoria_inicio_mb / memoria_fim_mb).
+    """
+    @wraps(funcao)
+    def etapa(*args, **kwargs):
+        perfil = None
+        if PERFILAR_ETAPAS:
+            import cProfile
+            perfil = cProfile.Profile()
+        pico_antes = _pico_memoria_mb()
+        memoria_antes = _memoria_atual_mb()
+        inicio = time.perf_counter()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            tempo = time.perf_counter() - inicio
+        pico_depois = _pico_memoria_mb()
+        memoria_depois = _memoria_atual_mb()
+        with _trava_medicoes:
+            _medicoes_etapas.append({
+                'etapa': funcao.__name__,
+                'inicio': datetime.now().isoformat(timespec='seconds'),
+                'tempo_s': round(tempo, 4),
+                'linhas_entrada': _contar_linhas(list(args) + list(kwargs.values())),
+                'linhas_saida': _contar_linhas([resultado]),
+                'memoria_inicio_mb': memoria_antes,
+                'memoria_fim_mb': memoria_depois,
+                'pico_processo_mb': pico_depois,
+                'aumento_pico_processo_mb': round(pico_depois - pico_antes, 1) if pico_depois is not None else None,
+                'thread': threading.current_thread().name,
+                'perfil': perfil,
+            })
+        return resultado
+    return etapa
+
+def reiniciar_medicoes():
+    """Descarta as medições acumuladas (ex.: antes de processar outra planilha no mesmo processo)"""
+    with _trava_medicoes:
+        _medicoes_etapas.clear()
+
+def salvar_relatorio_etapas(diretorio_saida=None):
+    """Grava o relatório JSON das etapas (e os perfis cProfile, se ativados) e imprime o resumo"""
+    diretorio = Path(diretorio_saida or out_dir)
+    with _trava_medicoes:
+        medicoes = [dict(m) for m in _medicoes_etapas]
+    try:
+        for medicao in medicoes:
+            perfil = medicao.pop('perfil')
+            medicao['arquivo_perfil'] = None
+            if perfil is not None:
+                pasta_perfis = diretorio / "perfis_etapas"
+                pasta_perfis.mkdir(parents=True, exist_ok=True)
+                arquivo = pasta_perfis / f"{medicao['etapa']}.prof"
+                perfil.dump_stats(arquivo)
+                medicao['arquivo_perfil'] = str(arquivo)
+        relatorio = {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'pico_processo_mb': _pico_memoria_mb(),
+            'etapas': medicoes,
+        }
+        relatorio_path = diretorio / "relatorio_etapas_chamados.json"
+        with open(relatorio_path, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"⚠️ Não foi possível gravar o relatório de etapas: {e}")
+        return None
+
+    print(f"\n⏱️ Tempo por etapa:")
+    for medicao in medicoes:
+        if medicao['memoria_fim_mb'] is not None:
+            memoria = f", RSS {medicao['memoria_inicio_mb']:.0f} → {medicao['memoria_fim_mb']:.0f} MB"
+        elif medicao['pico_processo_mb'] is not None:
+            memoria = f", pico do processo {medicao['pico_processo_mb']:.0f} MB"
+        else:
+            memoria = ""
+        linhas = f", {medicao['linhas_entrada']:,} linhas" if medicao['linhas_entrada'] is not None else ""
+        print(f"   • {medicao['etapa']}: {medicao['tempo_s']:.2f}s{linhas}{memoria}")
+    print(f"📝 Relatório de etapas: {relatorio_path}")
+    return relatorio_path
 
 def normalizar_texto(texto):
     """Normaliza texto removendo acentos e caracteres especiais"""
@@ -36,15 +265,513 @@ def normalizar_texto(texto):
     texto = ''.join(c for c in texto if c.isalnum() or c.isspace())
     return texto
 
-def carregar_dados():
-    """Carrega e processa os dados para o dashboard"""
+def normalizar_coluna(serie, compactar_espacos=False):
+    """Normaliza uma coluna inteira como normalizar_texto, processando cada valor distinto uma única vez"""
+    codigos, unicos = pd.factorize(serie)
+    normalizados = (pd.Series(unicos, dtype=object).astype(str)
+                    .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+                    .str.lower().str.replace(r'[^a-z0-9\s]', '', regex=True))
+    if compactar_espacos:
+        normalizados = normalizados.str.split().str.join(' ')
+    # Valores nulos continuam nulos em vez de virarem o texto 'nan'
+    valores = np.append(normalizados.to_numpy(dtype=object), None)
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
+
+def rotulos_canonicos(unicos, frequencias):
+    """Para cada rótulo (na ordem de primeira aparição), a grafia mais frequente entre as equivalentes a ele"""
+    chaves = normalizar_coluna(pd.Series(unicos, dtype=object), compactar_espacos=True)
+    variantes = pd.DataFrame({'chave': chaves.to_numpy(), 'frequencia': frequencias, 'original': unicos})
+    rotulos = (variantes.sort_values('frequencia', ascending=False, kind='stable')
+               .drop_duplicates('chave').set_index('chave')['original'])
+    return variantes['chave'].map(rotulos).to_numpy(dtype=object)
+
+def canonicalizar_coluna(serie):
+    """Unifica grafias equivalentes (acentos, caixa, pontuação e espaços) usando a variante mais frequente"""
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return serie, 0
+    canonicos = rotulos_canonicos(unicos, np.bincount(codigos[codigos >= 0], minlength=len(unicos)))
+    unificadas = len(unicos) - len(pd.unique(canonicos))
+    return pd.Series(np.append(canonicos, None)[codigos], index=serie.index, name=serie.name), unificadas
+
+def _radicais_textos(normalizados):
+    """Pares (texto, radical) sem repetição: palavras vazias removidas, sinônimos unificados e radical por prefixo"""
+    palavras = pd.Series(normalizados, dtype=object).reset_index(drop=True).str.split().explode().dropna()
+    palavras = palavras[~palavras.isin(PALAVRAS_VAZIAS)]
+    radicais = palavras.replace(SINONIMOS_SOLUCOES).str[:TAMANHO_RADICAL]
+    pares = pd.DataFrame({'texto': radicais.index.to_numpy(dtype=np.int64), 'radical': radicais.to_numpy()})
+    return pares.drop_duplicates(ignore_index=True)
+
+def assinaturas_minhash(pares, n_textos, n_permutacoes=N_PERMUTACOES_MINHASH, semente=42, tamanho_bloco=1 << 18):
+    """Assinaturas MinHash (uma linha uint32 por texto) do conjunto de radicais de cada texto"""
+    vazio = np.iinfo(np.uint32).max  # textos sem radicais ficam com a assinatura "vazia"
+    assinaturas = np.full((n_textos, n_permutacoes), vazio, dtype=np.uint32)
+    if pares.empty:
+        return assinaturas
+    codigos, vocabulario = pd.factorize(pares['radical'])
+
+    # Hash estável entre execuções (o hash() do Python muda a cada processo) e permutações (a*h + b) mod p
+    primo = np.uint64((1 << 31) - 1)
+    hashes = np.array([int.from_bytes(hashlib.blake2b(r.encode('utf-8'), digest_size=8).digest(), 'little')
+                       for r in vocabulario], dtype=np.uint64) % primo
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, int(primo), n_permutacoes, dtype=np.uint64)
+    b = rng.integers(0, int(primo), n_permutacoes, dtype=np.uint64)
+    tabela = ((hashes[:, None] * a + b) % primo).astype(np.uint32)
+
+    # Mínimo por texto "coluna a coluna": a k-ésima ocorrência de cada texto entra numa única passada vetorizada
+    textos = pares['texto'].to_numpy()
+    ordem = np.argsort(textos, kind='stable')
+    textos, codigos = textos[ordem], codigos[ordem]
+    inicios = np.flatnonzero(np.r_[True, textos[1:] != textos[:-1]])
+    posicao = np.arange(len(textos)) - np.repeat(inicios, np.diff(np.r_[inicios, len(textos)]))
+    ordem = np.argsort(posicao, kind='stable')
+    fronteiras = np.searchsorted(posicao[ordem], np.arange(posicao.max() + 2))
+    for inicio, fim in zip(fronteiras[:-1], fronteiras[1:]):
+        for bloco in range(inicio, fim, tamanho_bloco):
+            selecao = ordem[bloco:min(bloco + tamanho_bloco, fim)]
+            alvo = textos[selecao]  # sem repetição dentro de uma mesma posição
+            assinaturas[alvo] = np.minimum(assinaturas[alvo], tabela[codigos[selecao]])
+    return assinaturas
+
+def candidatos_lsh(assinaturas, faixas=FAIXAS_LSH):
+    """Pares candidatos (origem, destino) de textos que coincidem em ao menos uma faixa das assinaturas"""
+    n_textos, n_permutacoes = assinaturas.shape
+    linhas_faixa = n_permutacoes // faixas
+    indices = np.flatnonzero(assinaturas[:, 0] != np.iinfo(np.uint32).max)
+    origem, destino = [], []
+    for faixa in range(faixas):
+        bloco = assinaturas[indices, faixa * linhas_faixa:(faixa + 1) * linhas_faixa].astype(np.uint64)
+        chave = np.zeros(len(indices), dtype=np.uint64)
+        for coluna in range(linhas_faixa):
+            chave = chave * np.uint64(0x9E3779B97F4A7C15) + bloco[:, coluna]
+        # Cada texto de um balde é comparado só com o primeiro do balde: pares lineares no número de textos
+        # Os códigos do factorize seguem a ordem de primeira aparição: o k-ésimo primeiro é o líder do balde k
+        baldes, _ = pd.factorize(chave)
+        primeiros = np.flatnonzero(~pd.Series(baldes).duplicated().to_numpy())
+        lider = indices[primeiros[baldes]]
+        candidatos = lider != indices
+        origem.append(indices[candidatos])
+        destino.append(lider[candidatos])
+    if not origem:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    pares = pd.unique(np.concatenate(origem) * n_textos + np.concatenate(destino))
+    return pares // n_textos, pares % n_textos
+
+def similaridade_jaccard(pares, n_textos, origem, destino):
+    """Jaccard exato entre os conjuntos de radicais de cada par (origem, destino) de textos"""
+    codigos, vocabulario = pd.factorize(pares['radical'])
+    # Chave inteira texto × radical ordenada: a interseção vira uma busca binária por radical da origem
+    chaves = np.sort(pares['texto'].to_numpy().astype(np.int64) * len(vocabulario) + codigos)
+    textos, radicais = chaves // max(len(vocabulario), 1), chaves % max(len(vocabulario), 1)
+    tamanhos = np.bincount(textos, minlength=n_textos)
+    inicios = np.r_[0, np.cumsum(tamanhos)[:-1]]
+    intersecao = np.zeros(len(origem), dtype=np.int64)
+    if len(origem) and len(chaves):
+        repeticoes = tamanhos[origem]
+        par = np.repeat(np.arange(len(origem)), repeticoes)
+        deslocamento = np.arange(len(par)) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+        procurada = destino[par].astype(np.int64) * len(vocabulario) + radicais[inicios[origem][par] + deslocamento]
+        posicao = np.minimum(np.searchsorted(chaves, procurada), len(chaves) - 1)
+        intersecao = np.bincount(par[chaves[posicao] == procurada], minlength=len(origem))
+    uniao = tamanhos[origem] + tamanhos[destino] - intersecao
+    return intersecao / np.maximum(uniao, 1)
+
+def componentes_conexas(n_nos, origem, destino):
+    """Rótulo (menor índice) da componente conexa de cada nó, por propagação de rótulos com compressão de caminhos"""
+    grupos = np.arange(n_nos)
+    while len(origem):
+        menor = np.minimum(grupos[origem], grupos[destino])
+        novos = grupos.copy()
+        np.minimum.at(novos, origem, menor)
+        np.minimum.at(novos, destino, menor)
+        novos = novos[novos]
+        if np.array_equal(novos, grupos):
+            break
+        grupos = novos
+    return grupos
+
+def _arquivo_assinaturas():
+    """Caminho do cache de assinaturas e do último agrupamento das soluções"""
+    return cache_dir / f"assinaturas_solucoes.v{VERSAO_ASSINATURAS}.pkl"
+
+def _grupos_com_cache(normalizados, limiar, usar_cache=True):
+    """Grupos dos textos normalizados (únicos); assinaturas e o último agrupamento são reaproveitados entre execuções"""
+    parametros = repr((N_PERMUTACOES_MINHASH, FAIXAS_LSH, TAMANHO_RADICAL, sorted(PALAVRAS_VAZIAS),
+                       sorted(SINONIMOS_SOLUCOES.items())))
+    chave = hashlib.sha256(("\n".join(normalizados) + f"|{limiar}|{parametros}").encode('utf-8')).hexdigest()
+    usar_cache = cache_ativo(usar_cache)
+    arquivo = _arquivo_assinaturas() if usar_cache else None
+    cache = None
+    if usar_cache and arquivo.exists():
+        try:
+            cache = pd.read_pickle(arquivo)
+            if cache.get('parametros') != parametros:
+                cache = None
+        except Exception as e:
+            print(f"⚠️ Cache de assinaturas de soluções ignorado: {e}")
+    if cache is not None and cache['agrupamento'][0] == chave:
+        return cache['agrupamento'][1]
+
+    # Só os textos ainda não vistos passam pelo MinHash; os demais vêm do cache
+    n_textos = len(normalizados)
+    pares = _radicais_textos(normalizados)
+    posicoes = pd.Index(cache['textos']).get_indexer(normalizados) if cache is not None else np.full(n_textos, -1)
+    novos = np.flatnonzero(posicoes < 0)
+    assinaturas = np.empty((n_textos, N_PERMUTACOES_MINHASH), dtype=np.uint32)
+    if len(novos) < n_textos:
+        assinaturas[posicoes >= 0] = cache['assinaturas'][posicoes[posicoes >= 0]]
+    if len(novos):
+        pares_novos = pares[np.isin(pares['texto'].to_numpy(), novos)]
+        pares_novos = pares_novos.assign(texto=np.searchsorted(novos, pares_novos['texto'].to_numpy()))
+        assinaturas[novos] = assinaturas_minhash(pares_novos, len(novos))
+
+    # LSH só propõe candidatos; a união exige o Jaccard exato acima do limiar
+    origem, destino = candidatos_lsh(assinaturas)
+    similares = similaridade_jaccard(pares, n_textos, origem, destino) >= limiar
+    grupos = componentes_conexas(n_textos, origem[similares], destino[similares])
+
+    if usar_cache:
+        # O cache é refeito com os textos atuais: soluções que saíram da planilha deixam de ocupar espaço
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            temporario = arquivo.with_suffix('.tmp')
+            pd.to_pickle({'parametros': parametros, 'textos': np.asarray(normalizados, dtype=object),
+                          'assinaturas': assinaturas, 'agrupamento': (chave, grupos)}, temporario)
+            os.replace(temporario, arquivo)
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar o cache de assinaturas: {e}")
+    return grupos
+
+def agrupar_textos_similares(textos, frequencias, limiar=LIMIAR_SIMILARIDADE_SOLUCOES, usar_cache=True):
+    """Para cada texto, a posição do representante do seu grupo de quase duplicatas (a variante mais frequente)"""
+    if len(textos) == 0:
+        return np.array([], dtype=np.int64)
+    chaves, normalizados = pd.factorize(normalizar_coluna(pd.Series(textos, dtype=object), compactar_espacos=True))
+    grupos = _grupos_com_cache(list(normalizados), limiar, usar_cache)[chaves]
+    variantes = pd.DataFrame({'grupo': grupos, 'frequencia': frequencias})
+    representantes = (variantes.sort_values('frequencia', ascending=False, kind='stable')
+                      .drop_duplicates('grupo').reset_index().set_index('grupo')['index'])
+    return representantes.reindex(grupos).to_numpy()
+
+def agrupar_solucoes_similares(serie, limiar=LIMIAR_SIMILARIDADE_SOLUCOES, usar_cache=True):
+    """Substitui cada solução pela variante mais frequente do seu grupo de textos quase iguais (MinHash + LSH)"""
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) < 2:
+        return serie, 0
+    representantes = agrupar_textos_similares(np.asarray(unicos, dtype=object),
+                                              np.bincount(codigos[codigos >= 0], minlength=len(unicos)), limiar, usar_cache)
+    agrupadas = len(unicos) - len(np.unique(representantes))
+    novos_codigos = np.where(codigos >= 0, representantes[codigos], -1)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Mantém a coluna compacta: só as categorias representantes, na ordem de primeira aparição
+        codigos_finais, usados = pd.factorize(novos_codigos[novos_codigos >= 0])
+        resultado = np.full(len(serie), -1, dtype=np.int64)
+        resultado[novos_codigos >= 0] = codigos_finais
+        valores = pd.Categorical.from_codes(resultado, categories=pd.Index(np.asarray(unicos, dtype=object)[usados]))
+    else:
+        valores = np.append(np.asarray(unicos, dtype=object), None)[novos_codigos]
+    return pd.Series(valores, index=serie.index, name=serie.name), agrupadas
+
+def _agrupar_pares_solucoes(contagem_pares, limiar=LIMIAR_SIMILARIDADE_SOLUCOES, frequencias=None):
+    """Agrupa soluções similares numa contagem categoria × solução já agregada (leitura em blocos e incremental)
+
+    frequencias é a contagem de cada solução em todas as linhas, inclusive as sem categoria, como no frame completo.
+    """
+    solucoes = contagem_pares.index.get_level_values(1)
+    if frequencias is None:
+        codigos, unicos = pd.factorize(solucoes)
+        frequencias = np.bincount(codigos, weights=contagem_pares.to_numpy(), minlength=len(unicos)).astype(np.int64)
+    else:
+        unicos = frequencias.index
+        codigos, frequencias = unicos.get_indexer(solucoes), frequencias.to_numpy()
+    representantes = agrupar_textos_similares(np.asarray(unicos, dtype=object), frequencias, limiar)
+    indice = pd.MultiIndex.from_arrays([contagem_pares.index.get_level_values(0),
+                                        np.asarray(unicos, dtype=object)[representantes[codigos]]],
+                                       names=contagem_pares.index.names)
+    agrupada = pd.Series(contagem_pares.to_numpy(), index=indice)
+    return agrupada.groupby(level=[0, 1], sort=False).sum(), len(unicos) - len(np.unique(representantes))
+
+_cache_impressoes = {}
+
+def impressao_digital_planilha(caminho, tamanho_bloco=1 << 20):
+    """Gera a chave de cache da planilha a partir do caminho, mtime, tamanho e hash do conteúdo"""
+    caminho = Path(caminho).resolve()
+    info = caminho.stat()
+    # O hash do conteúdo é calculado uma vez por versão do arquivo (cubo e leitura usam a mesma chave)
+    memoria = (str(caminho), info.st_mtime_ns, info.st_size)
+    if memoria in _cache_impressoes:
+        return _cache_impressoes[memoria]
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    versao = f"{caminho}|{info.st_mtime_ns}|{info.st_size}|{sha.hexdigest()}"
+    # O prefixo identifica a planilha; o sufixo, a versão do conteúdo
+    prefixo = hashlib.sha256(str(caminho).encode('utf-8')).hexdigest()[:12]
+    _cache_impressoes[memoria] = f"{prefixo}-{hashlib.sha256(versao.encode('utf-8')).hexdigest()[:20]}"
+    return _cache_impressoes[memoria]
+
+def impressao_digital_conjunto(caminhos):
+    """Chave de cache de um conjunto de planilhas: a da própria planilha quando há uma só, senão a combinação das chaves"""
+    chaves = [impressao_digital_planilha(caminho) for caminho in caminhos]
+    if len(chaves) == 1:
+        return chaves[0]
+    identidade = '|'.join(str(Path(caminho).resolve()) for caminho in caminhos)
+    prefixo = hashlib.sha256(identidade.encode('utf-8')).hexdigest()[:12]
+    return f"{prefixo}-{hashlib.sha256('|'.join(chaves).encode('utf-8')).hexdigest()[:20]}"
+
+def _chave_aba(chave, aba):
+    """Chave de cache de uma aba: o prefixo passa a identificar planilha e aba, para as abas não se substituírem no cache"""
+    prefixo, versao = chave.split('-')
+    return f"{hashlib.sha256(f'{prefixo}|{aba}'.encode('utf-8')).hexdigest()[:12]}-{versao}"
+
+def _tipar_para_cache(df):
+    """Aplica os tipos de processar_datas e deixa as colunas compatíveis com o formato colunar"""
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        # Colunas com tipos misturados (ex.: números e textos) não são aceitas pelo Arrow
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    coluna_data = encontrar_coluna_data(df)
+    if coluna_data:
+        df = processar_datas(df, coluna_data)
+    return df
+
+def cache_ativo(usar_cache=True):
+    """Indica se o cache é lido e gravado: pedido pela chamada, não desativado (--sem-cache) e com pasta definida"""
+    return bool(usar_cache and USAR_CACHE and cache_dir is not None)
+
+def _arquivo_cache(chave):
+    """Caminho da cópia colunar; a versão do formato invalida caches de versões anteriores do script"""
+    return cache_dir / f"{chave}.v{VERSAO_CACHE}.feather"
+
+def ler_cache_planilha(chave):
+    """Lê a cópia colunar da planilha via memory-map; retorna None se não houver cache"""
+    arquivo = _arquivo_cache(chave)
+    if not arquivo.exists():
+        return None
+    import pyarrow.feather as feather
+    tabela = feather.read_table(str(arquivo), memory_map=True)
+    # Atualiza o mtime para que a política de expiração funcione como LRU
+    os.utime(arquivo)
+    return tabela.to_pandas(split_blocks=True)
+
+def salvar_cache_planilha(df, chave):
+    """Grava a cópia colunar (Feather sem compressão, apta a memory-map) e remove versões antigas"""
+    import pyarrow.feather as feather
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    arquivo = _arquivo_cache(chave)
+    temporario = arquivo.with_suffix('.tmp')
+    feather.write_feather(df, str(temporario), compression='uncompressed')
+    os.replace(temporario, arquivo)
+    prefixo = chave.split('-')[0]
+    for antigo in cache_dir.glob(f"{prefixo}-*.feather"):
+        if antigo != arquivo:
+            antigo.unlink(missing_ok=True)
+    limpar_cache(manter=[arquivo])
+    return arquivo
+
+def limpar_cache(tamanho_max_mb=CACHE_TAMANHO_MAX_MB, idade_max_dias=CACHE_IDADE_MAX_DIAS, manter=()):
+    """Remove do diretório de cache os arquivos expirados e os menos usados acima do limite de tamanho
+
+    Os arquivos em manter (o que acabou de ser gravado) nunca são removidos, mesmo que sozinhos passem do limite.
+    """
+    if cache_dir is None or not cache_dir.exists():
+        return []
+    manter = {Path(arquivo) for arquivo in manter}
+    agora = time.time()
+    arquivos = []
+    for arquivo in cache_dir.iterdir():
+        # Processos da leitura em paralelo gravam e removem arquivos do cache durante a varredura
+        try:
+            info = arquivo.stat()
+        except FileNotFoundError:
+            continue
+        if arquivo.is_file() and arquivo not in manter:
+            arquivos.append((info.st_mtime, info.st_size, arquivo))
+    arquivos.sort(key=lambda item: item[0])
+    removidos = []
+    restantes = []
+    for modificacao, tamanho, arquivo in arquivos:
+        if idade_max_dias is not None and agora - modificacao > idade_max_dias * 86400:
+            arquivo.unlink(missing_ok=True)
+            removidos.append(arquivo)
+        else:
+            restantes.append((tamanho, arquivo))
+    if tamanho_max_mb is not None:
+        total = sum(tamanho for tamanho, _ in restantes)
+        for arquivo in manter:
+            try:
+                total += arquivo.stat().st_size
+            except FileNotFoundError:
+                pass
+        limite = tamanho_max_mb * 1024 * 1024
+        for tamanho, arquivo in restantes:
+            if total <= limite:
+                break
+            total -= tamanho
+            arquivo.unlink(missing_ok=True)
+            removidos.append(arquivo)
+    return removidos
+
+def _arquivo_manifesto(chave):
+    """Lista das abas de chamados de uma versão da pasta de trabalho, já gravadas no cache colunar"""
+    return cache_dir / f"{chave}.abas.json"
+
+def _ler_manifesto(chave, abas):
+    """Abas em cache da pasta de trabalho para a seleção de abas pedida; None se ela precisar ser lida de novo"""
+    try:
+        manifesto = json.loads(_arquivo_manifesto(chave).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if manifesto.get('selecao') != (list(abas) if abas else None):
+        return None
+    os.utime(_arquivo_manifesto(chave))  # expiração do cache como LRU
+    return manifesto['abas']
+
+def _salvar_manifesto(chave, abas, lidas):
+    """Grava a lista de abas lidas e remove as listas de versões anteriores da mesma pasta de trabalho"""
+    arquivo = _arquivo_manifesto(chave)
+    temporario = arquivo.with_suffix('.tmp')
+    temporario.write_text(json.dumps({'selecao': list(abas) if abas else None, 'abas': list(lidas)}, ensure_ascii=False),
+                          encoding='utf-8')
+    os.replace(temporario, arquivo)
+    for antigo in cache_dir.glob(f"{chave.split('-')[0]}-*.abas.json"):
+        if antigo != arquivo:
+            antigo.unlink(missing_ok=True)
+
+def ler_abas_planilha(caminho, chave=None, abas=None):
+    """Lê as abas de chamados de uma pasta de trabalho ({aba: frame}); com a chave, grava cada aba no cache colunar
+
+    Executada nos processos da pool de carregar_dados: com o frame já no cache, devolve None no lugar dele e o
+    processo principal o lê por memory-map, sem serializar as linhas entre processos.
+    """
+    caminho = Path(caminho)
+    print(f"Carregando planilha: {caminho.name}")
+    with pd.ExcelFile(caminho) as pasta:
+        nomes = [aba for aba in pasta.sheet_names if not abas or aba in abas]
+        lidas = {}
+        for aba in nomes:
+            df = pasta.parse(aba)
+            if not df.empty:
+                lidas[aba] = _tipar_para_cache(df)
+    # Numa pasta com várias abas, só entram as que têm uma coluna de categoria pelo cabeçalho; se nenhuma tiver,
+    # vale a primeira aba, como na leitura de uma única aba
+    if len(lidas) > 1:
+        chamados = {aba: df for aba, df in lidas.items() if (detectar_papeis_colunas(df)['categoria'] or (None, 0))[1] > 0.1}
+        for aba in lidas.keys() - chamados.keys():
+            print(f"ℹ️ Aba '{aba}' de {caminho.name} ignorada: nenhuma coluna de categoria identificada")
+        lidas = chamados or dict([next(iter(lidas.items()))])
+    if chave:
+        for aba, df in lidas.items():
+            try:
+                salvar_cache_planilha(df, _chave_aba(chave, aba))
+                lidas[aba] = None
+            except Exception as e:
+                print(f"⚠️ Não foi possível gravar o cache colunar da aba '{aba}': {e}")
+    return lidas
+
+def planilha_configurada():
+    """Planilha padrão das funções chamadas sem caminho; falha se nenhuma foi informada"""
+    if path is None:
+        raise ValueError("Nenhuma planilha informada: passe o caminho na linha de comando, na variável de ambiente "
+                         "ANALISE_CHAMADOS_PLANILHA ou em configurar_execucao")
+    return path
+
+def caminhos_planilhas(caminho=None):
+    """Pastas de trabalho a ler: um caminho, uma pasta, um padrão glob ou uma lista deles (padrão: a planilha configurada)"""
+    if caminho is None:
+        caminho = planilha_configurada()
+    return expandir_planilhas([str(c) for c in caminho] if isinstance(caminho, (list, tuple)) else [str(caminho)])
+
+def alinhar_colunas(partes):
+    """Renomeia, em cada parte, as colunas de categoria, solução, data, status e fechamento para os nomes da primeira parte"""
+    referencia = {}
+    alinhadas = []
+    for df in partes:
+        papeis = {papel: resultado.coluna for papel, resultado in detectar_papeis_colunas(df).items() if resultado}
+        fechamento = encontrar_coluna_fechamento(df, papeis.get('data'))
+        if fechamento:
+            papeis['fechamento'] = fechamento
+        renomear = {}
+        for papel, coluna in papeis.items():
+            destino = referencia.setdefault(papel, coluna)
+            if destino != coluna:
+                renomear[coluna] = destino
+        # Uma coluna sem papel com o nome de destino ficaria duplicada
+        conflitos = {destino: f"{destino}_original" for destino in renomear.values()
+                     if destino in df.columns and destino not in renomear}
+        alinhadas.append(df.rename(columns={**conflitos, **renomear}))
+    return alinhadas
+
+@instrumentar
+def carregar_dados(caminho=None, usar_cache=True, forcar_atualizacao=False, chave=None, abas=None,
+                   max_tarefas=MAX_TAREFAS_PARALELAS):
+    """Carrega e processa os dados para o dashboard: todas as abas de chamados de uma ou mais pastas de trabalho"""
+    caminhos = caminhos_planilhas(caminho)
+    abas = ABAS_PLANILHA if abas is None else abas
+    usar_cache = cache_ativo(usar_cache)
+    forcar_atualizacao = forcar_atualizacao or ATUALIZAR_CACHE
     try:
-        if not path.exists():
-            print(f"❌ ERRO: O arquivo não foi encontrado em '{path}'")
-            print("👉 Por favor, edite a variável 'caminho_planilha' no código com o caminho correto.")
+        faltando = [c for c in caminhos if not c.exists()] or ([] if caminhos else [caminho])
+        if faltando:
+            print(f"❌ ERRO: O arquivo não foi encontrado em '{faltando[0]}'")
+            print("👉 Informe o caminho na linha de comando ou na variável de ambiente ANALISE_CHAMADOS_PLANILHA.")
             return None
-        print(f"Carregando planilha: {path.name}")
-        df = pd.read_excel(path)
+        lidas, chaves, tarefas = {}, {}, {}
+        for arquivo in caminhos:
+            chaves[arquivo] = None
+            if usar_cache:
+                try:
+                    chaves[arquivo] = chave if chave and len(caminhos) == 1 else impressao_digital_planilha(arquivo)
+                    em_cache = None if forcar_atualizacao else _ler_manifesto(chaves[arquivo], abas)
+                    if em_cache is not None:
+                        lidas[arquivo] = {aba: ler_cache_planilha(_chave_aba(chaves[arquivo], aba)) for aba in em_cache}
+                        if all(df is not None for df in lidas[arquivo].values()):
+                            print(f"⚡ Planilha carregada do cache colunar: {arquivo.name}")
+                            continue
+                except Exception as e:
+                    print(f"⚠️ Cache indisponível, lendo o Excel diretamente: {e}")
+                    chaves[arquivo] = None
+            tarefas[arquivo] = partial(ler_abas_planilha, arquivo, chaves[arquivo], abas)
+
+        if len(tarefas) == 1:
+            arquivo, tarefa = next(iter(tarefas.items()))
+            lidas[arquivo] = tarefa()
+        elif tarefas:
+            # O openpyxl é CPU-bound e segura o GIL: cada pasta de trabalho é lida em um processo
+            print(f"🚀 Lendo {len(tarefas)} pastas de trabalho em paralelo...")
+            inicializador = partial(configurar_execucao, path, out_dir, cache_dir, dict(PAPEIS_FORCADOS), abas, USAR_CACHE,
+                                    AGRUPAR_SOLUCOES_SIMILARES, ATUALIZAR_CACHE, BACKEND_AGREGACAO,
+                                    PERSISTIR_PAPEIS, MODO_PLOTLY)
+            resultados = executar_em_paralelo({str(arquivo): tarefa for arquivo, tarefa in tarefas.items()}, max_tarefas,
+                                              processos=True, inicializador=inicializador)
+            for arquivo in tarefas:
+                if resultados[str(arquivo)]['erro'] is not None:
+                    raise resultados[str(arquivo)]['erro']
+                lidas[arquivo] = resultados[str(arquivo)]['resultado']
+        for arquivo in tarefas:
+            if chaves[arquivo]:
+                # As abas gravadas no cache pelos processos são lidas por memory-map
+                lidas[arquivo] = {aba: df if df is not None else ler_cache_planilha(_chave_aba(chaves[arquivo], aba))
+                                  for aba, df in lidas[arquivo].items()}
+                try:
+                    _salvar_manifesto(chaves[arquivo], abas, lidas[arquivo])
+                except OSError as e:
+                    print(f"⚠️ Não foi possível gravar a lista de abas no cache: {e}")
+
+        origens = [(arquivo, aba) for arquivo in caminhos for aba in lidas[arquivo]]
+        partes = [lidas[arquivo][aba] for arquivo, aba in origens]
+        df = pd.concat(alinhar_colunas(partes), ignore_index=True) if len(partes) > 1 else partes[0]
+        tamanhos = [len(parte) for parte in partes]
+        for coluna, nomes in (('Arquivo_Origem', [arquivo.name for arquivo, _ in origens]),
+                              ('Aba_Origem', [str(aba) for _, aba in origens])):
+            codigos, unicos = pd.factorize(pd.Series(nomes, dtype=object))
+            df[coluna] = pd.Categorical.from_codes(np.repeat(codigos, tamanhos), categories=unicos)
+        df.attrs['datas_invalidas'] = sum(parte.attrs.get('datas_invalidas', 0) for parte in partes)
+        if len(caminhos) > 1 or len(partes) > 1:
+            print(f"📂 {len(partes)} abas de {len(caminhos)} pastas de trabalho ({len(caminhos) - len(tarefas)} do cache)")
         print(f"✅ Dataset carregado com sucesso. Shape: {df.shape}")
         print(f"📊 Colunas disponíveis: {list(df.columns)}")
         return df
@@ -52,107 +779,539 @@ def carregar_dados():
         print(f"❌ Erro durante o carregamento: {str(e)}")
         return None
 
+# Colunas impostas por papel (ex.: {'status': 'Situação'}), no lugar da detecção automática
+PAPEIS_FORCADOS = {}
+
+# Palavras-chave (já normalizadas) que identificam o papel de cada coluna pelo cabeçalho
+PALAVRAS_CHAVE_PAPEIS = {
+    'categoria': ['categoria', 'tipo', 'assunto', 'natureza', 'classificacao', 'descricao',
+                  'solicitacao', 'problema', 'informado', 'chamado', 'motivo'],
+    'solucao': ['solucao', 'resolucao', 'apresentada', 'solucaoapresentada', 'resultado', 'procedimento'],
+    'data': ['data', 'date', 'abertura', 'criado', 'timestamp'],
+    'status': ['status', 'estado', 'situacao', 'fechamento', 'andamento'],
+}
+# Termos de cabeçalho que indicam a data de encerramento do chamado
+PALAVRAS_FECHAMENTO = ['fechamento', 'encerramento', 'conclusao', 'resolvido', 'finalizado', 'solucionado']
+# Formatos de data testados por processar_datas, do mais provável (padrão brasileiro) ao menos provável
+FORMATOS_DATA = ['%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y', '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M',
+                 '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y %H:%M', '%d/%m/%y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M',
+                 '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y']
+# Reescrita em ISO 8601 dos formatos com dia/mês antes do ano (o parser ISO do pandas é bem mais rápido que strptime)
+_REESCRITA_ISO = {
+    '%d/%m/%Y': (r'^(\d{1,2})/(\d{1,2})/(\d{4})', r'\3-\2-\1'),
+    '%d-%m-%Y': (r'^(\d{1,2})-(\d{1,2})-(\d{4})', r'\3-\2-\1'),
+    '%d.%m.%Y': (r'^(\d{1,2})\.(\d{1,2})\.(\d{4})', r'\3-\2-\1'),
+    '%m/%d/%Y': (r'^(\d{1,2})/(\d{1,2})/(\d{4})', r'\3-\1-\2'),
+}
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+# Colunas criadas por processar_datas (e as de origem, de carregar_dados), que nunca são candidatas a um papel
+COLUNAS_DERIVADAS = ['Ano', 'Mês', 'Dia', 'Dia_Semana', 'Hora']
+_padrao_data_texto = r'\d{1,4}[/\-.]\d{1,2}[/\-.]\d{1,4}'
+_cache_papeis = {}
+# O cache de papéis só vai para papeis_colunas.json quando a pasta de cache foi escolhida (--cache / configurar_execucao)
+PERSISTIR_PAPEIS = False
+
+class PapelColuna(NamedTuple):
+    """Coluna escolhida para um papel e a confiança (0 a 1) da escolha"""
+    coluna: str
+    confianca: float
+
+def _perfil_coluna(serie):
+    """Mede, numa amostra, a taxa de datas, a cardinalidade e o tamanho médio dos textos"""
+    valores = serie.dropna()
+    if valores.empty:
+        return {'taxa_data': 0.0, 'cardinalidade': 0.0, 'distintos': 0, 'comprimento': 0.0, 'numerica': False}
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        taxa_data = 1.0
+    elif pd.api.types.is_numeric_dtype(valores):
+        taxa_data = 0.0
+    else:
+        textos = valores.astype(str)
+        candidatos = textos[textos.str.contains(_padrao_data_texto, regex=True)]
+        convertidos = pd.to_datetime(candidatos, errors='coerce', dayfirst=True, format='mixed')
+        taxa_data = convertidos.notna().sum() / len(valores)
+    distintos = valores.nunique()
+    return {
+        'taxa_data': float(taxa_data),
+        'cardinalidade': distintos / len(valores),
+        'distintos': distintos,
+        'comprimento': float(valores.astype(str).str.len().mean()),
+        'numerica': pd.api.types.is_numeric_dtype(valores) and not pd.api.types.is_bool_dtype(valores),
+    }
+
+def _pontuar_papel(papel, pontuacao, cabecalho, perfil):
+    """Ajusta a pontuação do cabeçalho conforme o conteúdo amostrado da coluna"""
+    if papel == 'data':
+        # Entre várias datas, a de abertura representa o chamado; a de fechamento fica em segundo plano
+        if any(palavra in cabecalho for palavra in PALAVRAS_FECHAMENTO):
+            pontuacao -= 0.5
+        return pontuacao + perfil['taxa_data'] - 0.5
+    if perfil['taxa_data'] > 0.8 or perfil['numerica']:
+        return pontuacao - 2.0
+    if papel == 'status':
+        return pontuacao + (0.5 if perfil['distintos'] <= 20 else -0.5)
+    if papel == 'categoria':
+        # Textos livres longos ou quase únicos (ex.: "Descrição") só servem se não houver alternativa
+        if perfil['comprimento'] > 60 or (perfil['cardinalidade'] > 0.5 and perfil['distintos'] > 50):
+            return pontuacao * 0.1
+        return pontuacao + 0.5 * (1 - perfil['cardinalidade'])
+    return pontuacao
+
+def _chave_esquema(df):
+    """Identifica o esquema (nomes e tipos das colunas) de uma planilha"""
+    esquema = repr([(str(col), str(tipo)) for col, tipo in df.dtypes.items()])
+    return hashlib.sha256(esquema.encode('utf-8')).hexdigest()[:24]
+
+def _papeis_em_disco():
+    """Indica se o cache de papéis é lido e gravado em disco, além da memória"""
+    return PERSISTIR_PAPEIS and cache_ativo()
+
+def _ler_cache_papeis(chave, df):
+    """Busca o resultado da detecção de papéis na memória ou, com PERSISTIR_PAPEIS, no cache em disco"""
+    if chave in _cache_papeis:
+        return _cache_papeis[chave]
+    if not _papeis_em_disco():
+        return None
+    arquivo = cache_dir / "papeis_colunas.json"
+    try:
+        salvo = json.loads(arquivo.read_text(encoding='utf-8')).get(chave)
+    except (OSError, ValueError):
+        return None
+    if salvo is None:
+        return None
+    por_nome = {str(col): col for col in df.columns}
+    papeis = {papel: PapelColuna(por_nome[valor[0]], valor[1]) if valor else None for papel, valor in salvo.items()}
+    _cache_papeis[chave] = papeis
+    return papeis
+
+def _salvar_cache_papeis(chave, papeis):
+    """Guarda o resultado da detecção de papéis na memória e, com PERSISTIR_PAPEIS, no cache em disco"""
+    _cache_papeis[chave] = papeis
+    if not _papeis_em_disco():
+        return
+    arquivo = cache_dir / "papeis_colunas.json"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        salvo = json.loads(arquivo.read_text(encoding='utf-8')) if arquivo.exists() else {}
+        salvo[chave] = {papel: [str(p.coluna), p.confianca] if p else None for papel, p in papeis.items()}
+        # Processos da leitura em paralelo gravam o mesmo arquivo: substituição atômica, nunca um JSON pela metade
+        temporario = arquivo.with_suffix(f'.{os.getpid()}.tmp')
+        temporario.write_text(json.dumps(salvo, ensure_ascii=False), encoding='utf-8')
+        os.replace(temporario, arquivo)
+    except (OSError, ValueError):
+        pass
+
+def _aplicar_papeis_forcados(df, papeis):
+    """Sobrepõe aos papéis detectados as colunas de PAPEIS_FORCADOS; a coluna imposta deixa qualquer outro papel"""
+    if not PAPEIS_FORCADOS:
+        return papeis
+    papeis = dict(papeis)
+    for papel, coluna in PAPEIS_FORCADOS.items():
+        if papel not in papeis:
+            continue  # ex.: 'fechamento', resolvido por encontrar_coluna_fechamento
+        if coluna not in df.columns:
+            print(f"⚠️ Coluna '{coluna}' informada para {papel} não existe na planilha; mantida a detecção automática")
+            continue
+        for outro, resultado in papeis.items():
+            if resultado and resultado.coluna == coluna:
+                papeis[outro] = None
+        papeis[papel] = PapelColuna(coluna, 1.0)
+    return papeis
+
+def detectar_papeis_colunas(df, tamanho_amostra=1000, usar_cache=True):
+    """Identifica de uma vez as colunas de categoria, solução, data e status, com a confiança de cada escolha"""
+    chave = _chave_esquema(df)
+    usar_cache = usar_cache and USAR_CACHE
+    if usar_cache:
+        papeis = _ler_cache_papeis(chave, df)
+        if papeis is not None:
+            return _aplicar_papeis_forcados(df, papeis)
+
+    colunas = [col for col in df.columns if col not in COLUNAS_DERIVADAS and col not in COLUNAS_ORIGEM]
+    cabecalhos = normalizar_coluna(pd.Series([str(col) for col in colunas], dtype=object)).tolist()
+    amostra = df.sample(tamanho_amostra, random_state=0) if len(df) > tamanho_amostra else df
+    perfis = {}
+    candidatos = []
+    for posicao, (col, cabecalho) in enumerate(zip(colunas, cabecalhos)):
+        for ordem, (papel, palavras) in enumerate(PALAVRAS_CHAVE_PAPEIS.items()):
+            pontuacao = sum(1 for palavra in palavras if palavra in cabecalho)
+            if pontuacao == 0 and not (papel == 'data' and pd.api.types.is_datetime64_any_dtype(df[col])):
+                continue
+            if col not in perfis:
+                perfis[col] = _perfil_coluna(amostra[col])
+            pontuacao = _pontuar_papel(papel, pontuacao, cabecalho, perfis[col])
+            if pontuacao > 0:
+                candidatos.append((pontuacao, posicao, ordem, papel, col))
+
+    # Cada coluna assume um único papel: as maiores pontuações escolhem primeiro
+    candidatos.sort(key=lambda c: (-c[0], c[1], c[2]))
+    papeis = dict.fromkeys(PALAVRAS_CHAVE_PAPEIS)
+    usadas = set()
+    for pontuacao, _, _, papel, col in candidatos:
+        if papeis[papel] is not None or col in usadas:
+            continue
+        concorrentes = [c[0] for c in candidatos if c[3] == papel and c[4] != col and c[4] not in usadas]
+        segunda = max(concorrentes, default=0.0)
+        # Confiança: vantagem sobre o melhor concorrente, reduzida quando a evidência é fraca
+        papeis[papel] = PapelColuna(col, round(pontuacao / (pontuacao + segunda) * min(1.0, pontuacao), 2))
+        usadas.add(col)
+
+    if papeis['categoria'] is None:
+        livres = [col for col in df[colunas].select_dtypes(exclude=[np.number]).columns if col not in usadas]
+        if livres:
+            papeis['categoria'] = PapelColuna(livres[0], 0.1)
+
+    if usar_cache:
+        _salvar_cache_papeis(chave, papeis)
+    return _aplicar_papeis_forcados(df, papeis)
+
+def _coluna_do_papel(df, papel):
+    """Retorna apenas o nome da coluna detectada para o papel"""
+    resultado = detectar_papeis_colunas(df)[papel]
+    return resultado.coluna if resultado else None
+
 def encontrar_coluna_categoria(df):
     """Encontra automaticamente a coluna de categoria/solicitação"""
-    palavras_chave = ['categoria', 'tipo', 'assunto', 'natureza', 'classificacao', 'descricao',
-                      'solicitacao', 'problema', 'informado', 'chamado', 'motivo']
-    melhor_coluna = None
-    melhor_pontuacao = 0
-    for col in df.columns:
-        col_normalized = normalizar_texto(col)
-        pontuacao = sum(1 for palavra in palavras_chave if palavra in col_normalized)
-        if pontuacao > melhor_pontuacao:
-            melhor_pontuacao = pontuacao
-            melhor_coluna = col
-    if melhor_coluna:
-        return melhor_coluna
-    colunas_nao_numericas = df.select_dtypes(exclude=[np.number]).columns
-    return colunas_nao_numericas[0] if len(colunas_nao_numericas) > 0 else None
+    return _coluna_do_papel(df, 'categoria')
 
 def encontrar_coluna_solucao(df):
     """Encontra automaticamente a coluna de solução"""
-    palavras_chave = ['solucao', 'resolucao', 'apresentada', 'solucaoapresentada', 'resultado', 'procedimento']
-    melhor_coluna = None
-    melhor_pontuacao = 0
-    for col in df.columns:
-        col_normalized = normalizar_texto(col)
-        pontuacao = sum(1 for palavra in palavras_chave if palavra in col_normalized)
-        if pontuacao > melhor_pontuacao:
-            melhor_pontuacao = pontuacao
-            melhor_coluna = col
-    return melhor_coluna
+    return _coluna_do_papel(df, 'solucao')
 
 def encontrar_coluna_data(df):
     """Encontra automaticamente a coluna de data"""
-    palavras_chave = ['data', 'date', 'abertura', 'criado', 'timestamp']
-    melhor_coluna = None
-    melhor_pontuacao = 0
-    for col in df.columns:
-        col_normalized = normalizar_texto(col)
-        pontuacao = sum(1 for palavra in palavras_chave if palavra in col_normalized)
-        if pontuacao > melhor_pontuacao:
-            melhor_pontuacao = pontuacao
-            melhor_coluna = col
-    return melhor_coluna
+    return _coluna_do_papel(df, 'data')
 
 def encontrar_coluna_status(df):
     """Encontra automaticamente a coluna de status"""
-    palavras_chave = ['status', 'estado', 'situacao', 'fechamento', 'andamento']
-    melhor_coluna = None
-    melhor_pontuacao = 0
-    for col in df.columns:
-        col_normalized = normalizar_texto(col)
-        pontuacao = sum(1 for palavra in palavras_chave if palavra in col_normalized)
-        if pontuacao > melhor_pontuacao:
-            melhor_pontuacao = pontuacao
-            melhor_coluna = col
-    return melhor_coluna
+    return _coluna_do_papel(df, 'status')
+
+def detectar_formato_data(textos, tamanho_amostra=1000):
+    """Detecta, numa amostra, o formato de data que converte a maior parte dos valores"""
+    amostra = textos.sample(tamanho_amostra, random_state=0) if len(textos) > tamanho_amostra else textos
+    melhor_formato, melhor_taxa = None, 0.0
+    for formato in FORMATOS_DATA:
+        taxa = pd.to_datetime(amostra, format=formato, errors='coerce').notna().mean()
+        # Em empate (ex.: dias até 12), vale a ordem de FORMATOS_DATA, que prioriza dd/mm/aaaa
+        if taxa > melhor_taxa:
+            melhor_formato, melhor_taxa = formato, taxa
+    return melhor_formato, melhor_taxa
+
+def _como_texto(serie):
+    """Converte para strings do Arrow, cujas operações .str são vetorizadas, quando o pyarrow está disponível"""
+    try:
+        return serie.astype('string[pyarrow]')
+    except ImportError:
+        return serie.astype(object)
+
+def _converter_com_formato(textos, formato):
+    """Converte textos com o formato dado; dd/mm/aaaa e similares são reescritos em ISO para usar o parser rápido"""
+    parte_data = formato.split(' ')[0]
+    if parte_data in _REESCRITA_ISO:
+        padrao, troca = _REESCRITA_ISO[parte_data]
+        return pd.to_datetime(textos.str.replace(padrao, troca, regex=True), format='ISO8601', errors='coerce')
+    return pd.to_datetime(textos, format=formato, errors='coerce')
+
+def converter_datas(serie):
+    """Converte a coluna para datetime com o formato dominante; retorna a série e o total de falhas"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, 0
+    if pd.api.types.is_numeric_dtype(serie):
+        # Números em uma coluna de data são datas seriais do Excel (dias desde 30/12/1899)
+        datas = pd.to_datetime(serie, unit='D', origin='1899-12-30', errors='coerce')
+        return datas, int(serie.notna().sum() - datas.notna().sum())
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo in ('datetime', 'datetime64', 'date'):
+        # Células que o Excel já entregou como data/hora
+        datas = pd.to_datetime(serie, errors='coerce')
+        return datas, int(serie.notna().sum() - datas.notna().sum())
+    eh_texto = serie.notna() if tipo in ('string', 'empty') else serie.map(type) == str
+    datas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    if not eh_texto.all():
+        datas[~eh_texto] = pd.to_datetime(serie[~eh_texto], errors='coerce')
+    vazios = 0
+    if eh_texto.any():
+        textos = _como_texto(serie[eh_texto]).str.strip()
+        formato, _ = detectar_formato_data(textos)
+        if formato:
+            convertidas = _converter_com_formato(textos, formato)
+        else:
+            convertidas = pd.Series(pd.NaT, index=textos.index, dtype='datetime64[ns]')
+        # Só as linhas fora do formato dominante passam pela inferência, mais lenta
+        em_branco = textos.eq('').to_numpy(dtype=bool)
+        restantes = convertidas.isna().to_numpy() & ~em_branco
+        if restantes.any():
+            convertidas[restantes] = pd.to_datetime(textos[restantes], errors='coerce', format='ISO8601')
+            restantes &= convertidas.isna().to_numpy()
+        if restantes.any():
+            convertidas[restantes] = pd.to_datetime(textos[restantes].astype(object), errors='coerce',
+                                                    dayfirst=True, format='mixed')
+        datas[eh_texto] = convertidas.to_numpy()
+        vazios = int(em_branco.sum())
+    return datas, int(serie.notna().sum() - vazios - datas.notna().sum())
 
 def processar_datas(df, coluna_data):
-    """Processa colunas de data и extrai informações temporais"""
+    """Processa colunas de data e extrai informações temporais"""
     if coluna_data and coluna_data in df.columns:
         try:
-            df[coluna_data] = pd.to_datetime(df[coluna_data], errors='coerce')
-            df['Ano'] = df[coluna_data].dt.year
-            df['Mês'] = df[coluna_data].dt.month
-            df['Dia'] = df[coluna_data].dt.day
-            df['Dia_Semana'] = df[coluna_data].dt.day_name()
-            df['Hora'] = df[coluna_data].dt.hour
+            df[coluna_data], falhas = converter_datas(df[coluna_data])
+            datas = df[coluna_data].dt
+            # Campos derivados compactos; Dia_Semana é 0 (segunda) a 6 (domingo) e só vira texto ao desenhar
+            df['Ano'] = datas.year.astype('Int16')
+            df['Mês'] = datas.month.astype('Int8')
+            df['Dia'] = datas.day.astype('Int8')
+            df['Dia_Semana'] = datas.dayofweek.astype('Int8')
+            df['Hora'] = datas.hour.astype('Int8')
+            df.attrs['datas_invalidas'] = falhas
             print("✅ Datas processadas com sucesso")
+            if falhas:
+                print(f"⚠️ {falhas} valores da coluna '{coluna_data}' não puderam ser convertidos em data")
         except Exception as e:
             print(f"❌ Erro ao processar datas: {e}")
     return df
 
-def analise_chamados(df):
+def _texto_compacto(serie, proporcao_max_categoria=PROPORCAO_MAX_CATEGORIA):
+    """Converte uma coluna de texto em category (poucos valores distintos) ou em string do Arrow"""
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) <= proporcao_max_categoria * len(serie):
+        # Categorias na ordem de primeira aparição, como as contagens do restante do pipeline
+        return pd.Series(pd.Categorical.from_codes(codigos, categories=unicos), index=serie.index, name=serie.name)
+    return _como_texto(serie)
+
+def _imprimir_relatorio_memoria(antes, depois):
+    """Mostra a memória de cada coluna antes e depois da compactação"""
+    mb = 1024 * 1024
+    print(f"\n🧮 Memória por coluna (antes → depois):")
+    for coluna, bytes_antes in antes.items():
+        if coluna == 'Index':
+            continue
+        destino = f"{depois[coluna] / mb:.1f} MB" if coluna in depois.index else "removida"
+        print(f"   • {coluna}: {bytes_antes / mb:.1f} MB → {destino}")
+    print(f"   Total: {antes.sum() / mb:.1f} MB → {depois.sum() / mb:.1f} MB "
+          f"({1 - depois.sum() / max(antes.sum(), 1):.0%} de economia)")
+
+def compactar_chamados(df, papeis, proporcao_max_categoria=PROPORCAO_MAX_CATEGORIA, relatorio=True, colunas_extras=()):
+    """Mantém só as colunas usadas pelos papéis detectados e converte textos e campos derivados para tipos compactos"""
+    coluna_data = papeis['data'].coluna if papeis.get('data') else None
+    colunas = list(dict.fromkeys([papel.coluna for papel in papeis.values() if papel] +
+                                 [coluna for coluna in COLUNAS_DERIVADAS if coluna in df.columns] + list(colunas_extras)))
+    compacto = {}
+    for coluna in colunas:
+        serie = df[coluna]
+        if coluna in colunas_extras:
+            pass  # mantidas como estão (ex.: a data de fechamento, convertida depois)
+        elif coluna in COLUNAS_DERIVADAS:
+            serie = serie.astype('Int16' if coluna == 'Ano' else 'Int8')
+        elif coluna != coluna_data and (serie.dtype == object or isinstance(serie.dtype, pd.StringDtype)):
+            serie = _texto_compacto(serie, proporcao_max_categoria)
+        compacto[coluna] = serie
+    df_compacto = pd.DataFrame(compacto, index=df.index)
+    df_compacto.attrs = dict(df.attrs)
+    if relatorio:
+        _imprimir_relatorio_memoria(df.memory_usage(deep=True), df_compacto.memory_usage(deep=True))
+    return df_compacto
+
+def encontrar_coluna_fechamento(df, coluna_abertura=None, tamanho_amostra=1000):
+    """Coluna com a data de encerramento do chamado: cabeçalho de fechamento e conteúdo de data"""
+    forcada = PAPEIS_FORCADOS.get('fechamento')
+    if forcada:
+        if forcada in df.columns:
+            return forcada
+        print(f"⚠️ Coluna '{forcada}' informada para fechamento não existe na planilha; mantida a detecção automática")
+    colunas = [col for col in df.columns
+               if col not in COLUNAS_DERIVADAS and col not in COLUNAS_ORIGEM and col != coluna_abertura]
+    if not colunas:
+        return None
+    cabecalhos = normalizar_coluna(pd.Series([str(col) for col in colunas], dtype=object)).tolist()
+    amostra = df.sample(tamanho_amostra, random_state=0) if len(df) > tamanho_amostra else df
+    for col, cabecalho in zip(colunas, cabecalhos):
+        if any(palavra in cabecalho for palavra in PALAVRAS_FECHAMENTO) and _perfil_coluna(amostra[col])['taxa_data'] > 0.5:
+            return col
+    return None
+
+def horas_uteis(abertura, fechamento, horario=HORARIO_COMERCIAL, dias_uteis=DIAS_UTEIS, feriados=FERIADOS):
+    """Horas úteis entre abertura e fechamento (arrays datetime64); NaN sem uma das datas ou com fechamento anterior"""
+    abertura = np.asarray(abertura).astype('datetime64[s]')
+    fechamento = np.asarray(fechamento).astype('datetime64[s]')
+    horas = np.full(len(abertura), np.nan)
+    validos = ~np.isnat(abertura) & ~np.isnat(fechamento)
+    validos[validos] = fechamento[validos] >= abertura[validos]
+    if not validos.any():
+        return horas
+    abertura, fechamento = abertura[validos], fechamento[validos]
+    calendario = np.busdaycalendar(weekmask=dias_uteis, holidays=np.array(feriados, dtype='datetime64[D]'))
+    inicio, fim = horario[0] * 3600, horario[1] * 3600
+    dia_abertura, dia_fechamento = abertura.astype('datetime64[D]'), fechamento.astype('datetime64[D]')
+    # Hora do dia (em segundos) limitada ao expediente
+    hora_abertura = np.clip((abertura - dia_abertura).astype(np.int64), inicio, fim)
+    hora_fechamento = np.clip((fechamento - dia_fechamento).astype(np.int64), inicio, fim)
+    util_abertura = np.is_busday(dia_abertura, busdaycal=calendario)
+    util_fechamento = np.is_busday(dia_fechamento, busdaycal=calendario)
+    mesmo_dia = dia_abertura == dia_fechamento
+    # Dias úteis inteiros entre os dois, mais o resto do dia da abertura e o começo do dia do fechamento
+    dias_inteiros = np.busday_count(np.minimum(dia_abertura + 1, dia_fechamento), dia_fechamento, busdaycal=calendario)
+    segundos = np.where(
+        mesmo_dia,
+        np.where(util_abertura, hora_fechamento - hora_abertura, 0),
+        dias_inteiros * (fim - inicio) + np.where(util_abertura, fim - hora_abertura, 0)
+        + np.where(util_fechamento, hora_fechamento - inicio, 0))
+    horas[validos] = segundos / 3600
+    return horas
+
+def arredondar_horas(horas, resolucao_minutos=None):
+    """Arredonda as durações (horas) para cima ao múltiplo de resolucao_minutos seguinte; NaN continua NaN"""
+    passo = (resolucao_minutos or RESOLUCAO_SLA_MINUTOS) * 60
+    # horas_uteis parte de segundos inteiros: voltar a eles evita que 0.25 h vire 0.2500000001 e suba uma faixa
+    return np.ceil(np.round(np.asarray(horas, dtype=np.float64) * 3600) / passo) * passo / 3600
+
+def percentis_por_grupo(codigos, rotulos, horas, nome, percentis=PERCENTIS_SLA, meta_horas=META_SLA_HORAS):
+    """Quantidade, média, percentis (interpolação linear, como o quantile do pandas) e % no prazo de cada grupo"""
+    validos = (codigos >= 0) & ~np.isnan(horas)
+    codigos, horas = codigos[validos], horas[validos]
+    colunas = [nome, 'Chamados', 'Media_Horas'] + [f'P{p}_Horas' for p in percentis] + ['Percentual_No_Prazo']
+    if len(horas) == 0:
+        return pd.DataFrame(columns=colunas)
+    # Uma única ordenação (grupo, duração) serve para os percentis de todos os grupos: a chave grupo × (máximo + 1)
+    # + horas mantém os grupos separados e sai mais barata que o lexsort de duas chaves
+    ordem = np.argsort(codigos * (horas.max() + 1) + horas)
+    codigos, horas = codigos[ordem], horas[ordem]
+    grupos, inicios, tamanhos = np.unique(codigos, return_index=True, return_counts=True)
+    tabela = {nome: np.asarray(rotulos, dtype=object)[grupos], 'Chamados': tamanhos,
+              'Media_Horas': np.add.reduceat(horas, inicios) / tamanhos}
+    for p in percentis:
+        posicao = inicios + (tamanhos - 1) * (p / 100)
+        abaixo, acima = np.floor(posicao).astype(np.int64), np.ceil(posicao).astype(np.int64)
+        tabela[f'P{p}_Horas'] = horas[abaixo] + (horas[acima] - horas[abaixo]) * (posicao - abaixo)
+    tabela['Percentual_No_Prazo'] = np.add.reduceat(horas <= meta_horas, inicios) / tamanhos * 100
+    resultado = pd.DataFrame(tabela, columns=colunas).round(2)
+    return resultado.sort_values('Chamados', ascending=False, kind='stable', ignore_index=True)
+
+def _imprimir_resumo_sla(sla, n_categorias=5):
+    """Exibe no console o tempo de resolução geral e o das categorias mais frequentes"""
+    if sla is None:
+        return
+    geral = sla['geral']
+    print(f"\n🕒 Tempo de resolução em horas úteis ({HORARIO_COMERCIAL[0]:02d}h–{HORARIO_COMERCIAL[1]:02d}h, "
+          f"entre '{sla['colunas'][0]}' e '{sla['colunas'][1]}'): {sla['chamados']} chamados")
+    if sla['chamados'] == 0:
+        return
+    print(f"   Geral: p50 {geral['P50_Horas']:.1f} h | p90 {geral['P90_Horas']:.1f} h | p99 {geral['P99_Horas']:.1f} h"
+          f" | {geral['Percentual_No_Prazo']:.1f}% em até {META_SLA_HORAS} h")
+    for _, linha in sla['categoria'].head(n_categorias).iterrows():
+        print(f"   • {linha.iloc[0]}: p50 {linha['P50_Horas']:.1f} h, p90 {linha['P90_Horas']:.1f} h, "
+              f"p99 {linha['P99_Horas']:.1f} h ({linha['Chamados']} chamados)")
+
+def agregar_horas_resolucao(df, coluna_categoria, coluna_status=None, coluna_data=None, coluna_fechamento=None):
+    """Chamados por faixa de duração em horas úteis (geral, por categoria e por status): contagens somáveis entre blocos"""
+    if not coluna_data or not coluna_fechamento or coluna_fechamento not in df.columns:
+        return None
+    horas = arredondar_horas(horas_uteis(df[coluna_data].to_numpy(), df[coluna_fechamento].to_numpy()))
+    validos = ~np.isnan(horas)
+    grupos = [np.full(validos.sum(), 'geral', dtype=object)]
+    rotulos = [np.full(validos.sum(), 'Geral', dtype=object)]
+    duracoes = [horas[validos]]
+    for grupo, coluna in (('categoria', coluna_categoria), ('status', coluna_status)):
+        if coluna:
+            codigos, unicos = _fatorar(df[coluna])
+            selecionados = validos & (codigos >= 0)
+            grupos.append(np.full(selecionados.sum(), grupo, dtype=object))
+            rotulos.append(np.asarray(unicos, dtype=object)[codigos[selecionados]])
+            duracoes.append(horas[selecionados])
+    indice = pd.MultiIndex.from_arrays([np.concatenate(grupos), np.concatenate(rotulos), np.concatenate(duracoes)],
+                                       names=['Grupo', 'Rotulo', 'Horas'])
+    return pd.Series(np.ones(len(indice), dtype=np.int64), index=indice).groupby(level=[0, 1, 2], sort=False).sum()
+
+def sla_dos_agregados(agregados, coluna_data, coluna_fechamento):
+    """Os percentis de analisar_sla a partir das durações agregadas; cada duração é repetida pela sua contagem"""
+    horas = agregados.get('horas_resolucao')
+    if horas is None:
+        horas = pd.Series([], dtype=np.int64, index=pd.MultiIndex.from_arrays([[], [], []]))
+    grupos = horas.index.get_level_values(0).to_numpy(dtype=object)
+    rotulos = horas.index.get_level_values(1).to_numpy(dtype=object)
+    duracoes = horas.index.get_level_values(2).to_numpy(dtype=np.float64)
+    contagens = horas.to_numpy(dtype=np.int64)
+
+    def percentis(grupo, ordem, nome):
+        # Os códigos seguem a ordem de primeira aparição das contagens, a mesma do _fatorar do frame completo
+        selecionados = grupos == grupo
+        codigos = pd.Index(ordem, dtype=object).get_indexer(rotulos[selecionados])
+        return percentis_por_grupo(np.repeat(codigos, contagens[selecionados]), np.asarray(ordem, dtype=object),
+                                   np.repeat(duracoes[selecionados], contagens[selecionados]), nome)
+
+    chamados = int(contagens[grupos == 'geral'].sum())
+    return {
+        'colunas': (coluna_data, coluna_fechamento),
+        'chamados': chamados,
+        'geral': percentis('geral', ['Geral'], 'Grupo').iloc[0] if chamados else None,
+        'categoria': percentis('categoria', agregados['categorias'].index, 'Categoria'),
+        'status': percentis('status', agregados['status'].index, 'Status') if agregados['status'] is not None else None,
+    }
+
+@instrumentar
+def analisar_sla(df, coluna_categoria, coluna_status=None, coluna_data=None, coluna_fechamento=None):
+    """Tempo de resolução em horas úteis de cada chamado e seus percentis por categoria e por status"""
+    if not coluna_data or not coluna_fechamento or coluna_fechamento not in df.columns:
+        return None
+    # Mesma resolução das contagens somáveis da leitura em blocos: os dois caminhos dão os mesmos percentis
+    horas = arredondar_horas(horas_uteis(df[coluna_data].to_numpy(), df[coluna_fechamento].to_numpy()))
+    todos = np.zeros(len(horas), dtype=np.int64)
+    sla = {
+        'colunas': (coluna_data, coluna_fechamento),
+        'chamados': int((~np.isnan(horas)).sum()),
+        'geral': percentis_por_grupo(todos, np.array(['Geral'], dtype=object), horas, 'Grupo').iloc[0]
+                 if (~np.isnan(horas)).any() else None,
+        'categoria': percentis_por_grupo(*_fatorar(df[coluna_categoria]), horas, 'Categoria'),
+        'status': percentis_por_grupo(*_fatorar(df[coluna_status]), horas, 'Status') if coluna_status else None,
+    }
+    _imprimir_resumo_sla(sla)
+    return sla
+
+@instrumentar
+def analise_chamados(df, canonicalizar=False, compactar=False, copiar=True, agrupar_solucoes=False):
     """Realiza análise específica de chamados"""
     print("\n" + "="*60)
     print("ANÁLISE GERAL DE CHAMADOS")
     print("="*60)
-    df_clean = df.copy()
-    coluna_categoria = encontrar_coluna_categoria(df_clean)
-    if not coluna_categoria:
+    papeis = detectar_papeis_colunas(df)
+    coluna_fechamento = encontrar_coluna_fechamento(df, papeis['data'].coluna if papeis['data'] else None)
+    if compactar:
+        # O frame compacto já é novo: a cópia defensiva fica dispensada
+        extras = [coluna for coluna in [coluna_fechamento, *COLUNAS_ORIGEM] if coluna and coluna in df.columns]
+        df_clean = compactar_chamados(df, papeis, colunas_extras=extras)
+    else:
+        df_clean = df.copy() if copiar else df
+    if not papeis['categoria']:
         print("❌ Não foi possível identificar uma coluna de categoria")
         return df_clean, None, None, None, None, None
     
-    coluna_solucao = encontrar_coluna_solucao(df_clean)
-    coluna_data = encontrar_coluna_data(df_clean)
-    coluna_status = encontrar_coluna_status(df_clean)
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status = (
+        papel.coluna if papel else None for papel in papeis.values())
     
-    print(f"📋 Coluna de categoria identificada: '{coluna_categoria}'")
-    if coluna_solucao:
-        print(f"📋 Coluna de solução identificada: '{coluna_solucao}'")
-    if coluna_data:
-        print(f"📋 Coluna de data identificada: '{coluna_data}'")
-    if coluna_status:
-        print(f"📋 Coluna de status identificada: '{coluna_status}'")
+    nomes_papeis = {'categoria': 'categoria', 'solucao': 'solução', 'data': 'data', 'status': 'status'}
+    for papel, resultado in papeis.items():
+        if resultado:
+            print(f"📋 Coluna de {nomes_papeis[papel]} identificada: '{resultado.coluna}' (confiança {resultado.confianca:.0%})")
     
     # Processar datas se disponível
     if coluna_data:
         df_clean = processar_datas(df_clean, coluna_data)
+    if coluna_fechamento:
+        print(f"📋 Coluna de fechamento identificada: '{coluna_fechamento}'")
+        df_clean[coluna_fechamento], _ = converter_datas(df_clean[coluna_fechamento])
+        df_clean.attrs['coluna_fechamento'] = coluna_fechamento
+
+    if canonicalizar:
+        df_clean[coluna_categoria], unificadas = canonicalizar_coluna(df_clean[coluna_categoria])
+        print(f"🔤 {unificadas} grafias variantes unificadas na coluna '{coluna_categoria}'")
+
+    if agrupar_solucoes and coluna_solucao:
+        df_clean[coluna_solucao], agrupadas = agrupar_solucoes_similares(df_clean[coluna_solucao])
+        print(f"🧩 {agrupadas} soluções quase iguais agrupadas na coluna '{coluna_solucao}'")
     
     print(f"\n📊 Estatísticas da coluna '{coluna_categoria}':")
-    print(f"   Valores únicos: {df_clean[coluna_categoria].nunique()}")
-    contagem_categorias = df_clean[coluna_categoria].value_counts()
+    codigos, categorias = _fatorar(df_clean[coluna_categoria])
+    contagem_categorias = _ordenar_contagem(_contagem_por_codigo(codigos, categorias, coluna_categoria))
+    print(f"   Valores únicos: {len(contagem_categorias)}")
     print(f"\n📈 Distribuição de categorias (top 10):")
     for i, (categoria, quantidade) in enumerate(contagem_categorias.head(10).items(), 1):
         percentual = (quantidade / len(df_clean)) * 100
@@ -160,7 +1319,8 @@ def analise_chamados(df):
     
     return df_clean, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias
 
-def analisar_solucoes_por_categoria(df, col_categoria, col_solucao):
+@instrumentar
+def analisar_solucoes_por_categoria(df, col_categoria, col_solucao, agregados=None, agrupar_similares=False):
     """Agrupa por categoria e conta as soluções apresentadas."""
     if not col_categoria or not col_solucao:
         print("⚠️ Colunas de categoria e/ou solução não encontradas. Análise de soluções por categoria pulada.")
@@ -171,25 +1331,1009 @@ def analisar_solucoes_por_categoria(df, col_categoria, col_solucao):
     print("="*60)
 
     # Agrupa pela categoria do problema e conta a frequência de cada solução
-    solucoes_agrupadas = df.groupby(col_categoria)[col_solucao].value_counts().rename('Contagem')
-    df_solucoes = solucoes_agrupadas.reset_index()
+    if agregados is None or agregados['solucoes'] is None:
+        if agrupar_similares:
+            solucoes, agrupadas = agrupar_solucoes_similares(df[col_solucao])
+            df = df.assign(**{col_solucao: solucoes})
+            print(f"🧩 {agrupadas} soluções quase iguais agrupadas")
+        agregados = agregar_chamados(df, col_categoria, col_solucao)
+    df_solucoes = agregados['solucoes']
 
     # Exibir no console as top 5 categorias e suas top 3 soluções
-    top_categorias = df[col_categoria].value_counts().nlargest(5).index
+    top_categorias = agregados['categorias'].head(TOP_CATEGORIAS_SOLUCOES).index
+    imprimir_top_solucoes(agregados['top_solucoes'], top_categorias, col_categoria, col_solucao)
+
+    return df_solucoes
+
+def top_solucoes_por_categoria(df_solucoes, contagem_categorias, col_categoria,
+                               n_solucoes=TOP_SOLUCOES_DASHBOARD, n_categorias=TOP_CATEGORIAS_SOLUCOES):
+    """Seleciona de uma só vez as n soluções mais aplicadas das n categorias mais frequentes"""
+    top_categorias = contagem_categorias.head(n_categorias).index
+    selecionadas = df_solucoes[df_solucoes[col_categoria].isin(top_categorias)]
+    # A posição no ranking ordena as categorias; o sort estável preserva o desempate de nlargest
+    ranking = pd.Categorical(selecionadas[col_categoria], categories=top_categorias).codes
+    selecionadas = selecionadas.assign(Ranking=ranking).sort_values(
+        ['Ranking', 'Contagem'], ascending=[True, False], kind='stable')
+    return selecionadas.groupby('Ranking', sort=False).head(n_solucoes).reset_index(drop=True)
+
+def imprimir_top_solucoes(top_solucoes, top_categorias, col_categoria, col_solucao, n_solucoes=TOP_SOLUCOES_CONSOLE):
+    """Exibe no console as soluções mais comuns das categorias informadas"""
     print("🔍 Exibindo as soluções mais comuns para os problemas mais frequentes:")
+    grupos = {categoria: grupo for categoria, grupo in top_solucoes.groupby(col_categoria, sort=False)}
     for categoria in top_categorias:
         print(f"\n--- Problema: '{categoria}' ---")
-        top_solucoes = df_solucoes[df_solucoes[col_categoria] == categoria].nlargest(3, 'Contagem')
-        if top_solucoes.empty:
+        grupo = grupos.get(categoria)
+        if grupo is None or grupo.empty:
             print("   (Nenhuma solução registrada para esta categoria)")
         else:
-            for _, row in top_solucoes.iterrows():
-                print(f"   -> Solução: '{row[col_solucao]}' ( aplicada {row['Contagem']} vezes )")
+            for solucao, contagem in zip(grupo[col_solucao].head(n_solucoes), grupo['Contagem'].head(n_solucoes)):
+                print(f"   -> Solução: '{solucao}' ( aplicada {contagem} vezes )")
 
-    return df_solucoes
+def _nomes_colunas(cabecalho):
+    """Reproduz os nomes de coluna gerados por pd.read_excel (vazios e duplicados)"""
+    nomes, vistos = [], {}
+    for i, nome in enumerate(cabecalho):
+        nome = f"Unnamed: {i}" if nome is None or str(nome).strip() == '' else str(nome)
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+def _detectar_formato_csv(caminho):
+    """Detecta separador e codificação de uma exportação CSV a partir do início do arquivo"""
+    with open(caminho, 'rb') as f:
+        amostra = f.read(64 * 1024)
+    try:
+        amostra.decode('utf-8')
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError:
+        codificacao = 'latin-1'
+    primeira_linha = amostra.decode(codificacao, errors='ignore').splitlines()[0] if amostra else ''
+    separador = max([';', ',', '\t'], key=primeira_linha.count)
+    return separador, codificacao
+
+def ler_planilha_em_blocos(caminho=None, tamanho_bloco=TAMANHO_BLOCO, pular_linhas=0):
+    """Lê a planilha (.xlsx) ou sua exportação CSV em blocos de linhas, sem materializar o DataFrame inteiro"""
+    caminho = Path(caminho) if caminho else planilha_configurada()
+    if caminho.suffix.lower() in ('.csv', '.txt'):
+        separador, codificacao = _detectar_formato_csv(caminho)
+        yield from pd.read_csv(caminho, sep=separador, encoding=codificacao, chunksize=tamanho_bloco,
+                               skiprows=range(1, pular_linhas + 1))
+        return
+
+    from openpyxl import load_workbook
+    from itertools import islice
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        colunas = _nomes_colunas(cabecalho)
+        # As linhas já processadas são percorridas pelo parser, mas não viram DataFrame
+        for _ in islice(linhas, pular_linhas):
+            pass
+        while True:
+            bloco = list(islice(linhas, tamanho_bloco))
+            if not bloco:
+                break
+            yield pd.DataFrame.from_records(bloco, columns=colunas)
+    finally:
+        livro.close()
+
+def _ordenar_contagem(serie):
+    """Ordena contagens de forma decrescente e estável (empates mantêm a ordem de aparição)"""
+    return serie.sort_values(ascending=False, kind='stable')
+
+def _fatorar(serie):
+    """pd.factorize com os rótulos como valores simples, mesmo em colunas category ou string do Arrow"""
+    codigos, unicos = pd.factorize(serie)
+    if isinstance(unicos.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+        unicos = unicos.astype(object)
+    return codigos, unicos
+
+def _contagem_por_codigo(codigos, rotulos, nome):
+    """Conta códigos de pd.factorize com np.bincount, na ordem de primeira aparição"""
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(rotulos))
+    serie = pd.Series(contagens, index=pd.Index(rotulos, name=nome), name='count')
+    return serie[serie > 0]
+
+def _campo_inteiro(df, coluna):
+    """Campo temporal derivado (Int8/Int16 com nulos) como inteiros numpy, com -1 no lugar dos nulos"""
+    return df[coluna].to_numpy(dtype='int64', na_value=-1)
+
+def _contagem_por_posicao(codigos, tamanho, nomes, base=None, pesos=None):
+    """Conta códigos inteiros densos com np.bincount e devolve só as combinações presentes"""
+    contagens = np.bincount(codigos, weights=pesos, minlength=tamanho).astype(np.int64)
+    presentes = np.flatnonzero(contagens)
+    if base is None:
+        indice = pd.Index(presentes, name=nomes[0])
+    else:
+        indice = pd.MultiIndex.from_arrays([presentes // base, presentes % base], names=nomes)
+    return pd.Series(contagens[presentes], index=indice, name='count')
+
+def _contar_combinacoes_duckdb(chaves):
+    """Contagem por combinação no DuckDB, com as tabelas de hash despejadas em disco quando excedem a memória"""
+    import duckdb
+    # Sem pasta de cache configurada (ou com --sem-cache), o despejo vai para uma pasta temporária descartada ao final
+    temporaria = cache_dir is None or not USAR_CACHE
+    if temporaria:
+        pasta_despejo = Path(tempfile.mkdtemp(prefix='analise_duckdb_'))
+    else:
+        pasta_despejo = cache_dir / 'duckdb_tmp'
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    conexao = duckdb.connect(config={'temp_directory': str(pasta_despejo)})
+    try:
+        if LIMITE_MEMORIA_DUCKDB:
+            conexao.execute(f"SET memory_limit = '{LIMITE_MEMORIA_DUCKDB}'")
+        conexao.register('chaves', chaves.assign(_posicao=np.arange(len(chaves), dtype=np.int64)))
+        colunas = ', '.join(f'"{coluna}"' for coluna in chaves.columns)
+        # A menor posição de cada combinação reproduz a ordem de primeira aparição do groupby(sort=False)
+        linhas = conexao.execute(f"SELECT {colunas}, count(*) AS contagem FROM chaves "
+                                 f"GROUP BY {colunas} ORDER BY min(_posicao)").df()
+    finally:
+        conexao.close()
+        if temporaria:
+            shutil.rmtree(pasta_despejo, ignore_errors=True)
+    return linhas.astype({**chaves.dtypes.to_dict(), 'contagem': np.int64})
+
+def contar_combinacoes(chaves, backend=None):
+    """Conta as combinações distintas das colunas de códigos inteiros, na ordem de primeira aparição"""
+    backend = backend or BACKEND_AGREGACAO
+    if backend not in BACKENDS_AGREGACAO:
+        raise ValueError(f"Backend de agregação desconhecido: {backend!r} (use um de {BACKENDS_AGREGACAO})")
+    if backend == 'duckdb' and len(chaves):
+        try:
+            return _contar_combinacoes_duckdb(chaves)
+        except ImportError:
+            print("⚠️ DuckDB não instalado (pip install duckdb); agregando com pandas")
+    return chaves.groupby(list(chaves.columns), sort=False).size().rename('contagem').reset_index()
+
+def _datas_dos_campos(ano, mes, dia):
+    """Datas (datetime64[D]) montadas a partir dos campos derivados Ano, Mês e Dia"""
+    meses = ((ano - 1970) * 12 + mes - 1).astype('datetime64[M]')
+    return meses.astype('datetime64[D]') + (dia - 1).astype('timedelta64[D]')
+
+def _serie_categoria_dia(categorias, datas, contagens, nome):
+    """Contagem por categoria e data (MultiIndex), base das séries de tendência"""
+    indice = pd.MultiIndex.from_arrays([np.asarray(categorias, dtype=object), pd.DatetimeIndex(datas)], names=[nome, 'Data'])
+    return pd.Series(np.asarray(contagens, dtype=np.int64), index=indice, name='count')
+
+def calcular_agregados(df, coluna_categoria, coluna_solucao=None, coluna_status=None, backend=None):
+    """Calcula, sobre códigos inteiros e numa única passada por coluna, as contagens usadas por gráficos, dashboard e exportação"""
+    codigos_categoria, categorias = _fatorar(df[coluna_categoria])
+    agregados = {
+        'total': len(df),
+        'categorias': _contagem_por_codigo(codigos_categoria, categorias, coluna_categoria),
+        'solucoes': None,
+        'ano_mes': None,
+        'dia_semana': None,
+        'hora': None,
+        'dia_hora': None,
+        'status': None,
+        'sla': None,
+        'categoria_dia': None,
+        'categoria_status': None,
+        'tendencias': None,
+        'frequencia_solucoes': None,
+        'horas_resolucao': None,
+    }
+    if coluna_solucao and coluna_solucao in df.columns:
+        # Cada par categoria × solução vira um único inteiro; a ordem de primeira aparição é preservada
+        codigos_solucao, solucoes = _fatorar(df[coluna_solucao])
+        validos = (codigos_categoria >= 0) & (codigos_solucao >= 0)
+        pares = contar_combinacoes(pd.DataFrame({'categoria': codigos_categoria[validos],
+                                                 'solucao': codigos_solucao[validos]}), backend)
+        indice = pd.MultiIndex.from_arrays(
+            [categorias.take(pares['categoria'].to_numpy()), solucoes.take(pares['solucao'].to_numpy())],
+            names=[coluna_categoria, coluna_solucao])
+        agregados['solucoes'] = pd.Series(pares['contagem'].to_numpy(), index=indice)
+        agregados['frequencia_solucoes'] = _contagem_por_codigo(codigos_solucao, solucoes, coluna_solucao)
+    if 'Ano' in df.columns and 'Mês' in df.columns:
+        ano, mes = _campo_inteiro(df, 'Ano'), _campo_inteiro(df, 'Mês')
+        validos = (ano >= 0) & (mes >= 1)
+        if validos.any():
+            ano_inicial = ano[validos].min()
+            codigos = (ano[validos] - ano_inicial) * 12 + mes[validos] - 1
+            serie = _contagem_por_posicao(codigos, 0, ['Ano', 'Mês'], base=12)
+            serie.index = serie.index.set_levels([serie.index.levels[0] + ano_inicial, serie.index.levels[1] + 1])
+            agregados['ano_mes'] = serie
+        if 'Dia' in df.columns:
+            dia_mes = _campo_inteiro(df, 'Dia')
+            validos &= (codigos_categoria >= 0) & (dia_mes >= 1)
+            datas = _datas_dos_campos(ano[validos], mes[validos], dia_mes[validos])
+            contagem = contar_combinacoes(pd.DataFrame({'categoria': codigos_categoria[validos],
+                                                        'data': datas.astype(np.int64)}), backend)
+            agregados['categoria_dia'] = _serie_categoria_dia(
+                categorias.take(contagem['categoria'].to_numpy()), contagem['data'].to_numpy().astype('datetime64[D]'),
+                contagem['contagem'].to_numpy(), coluna_categoria)
+    if 'Dia_Semana' in df.columns:
+        dia = _campo_inteiro(df, 'Dia_Semana')
+        agregados['dia_semana'] = _contagem_por_posicao(dia[dia >= 0], 7, ['Dia_Semana'])
+    if 'Hora' in df.columns:
+        hora = _campo_inteiro(df, 'Hora')
+        agregados['hora'] = _contagem_por_posicao(hora[hora >= 0], 24, ['Hora'])
+    if 'Hora' in df.columns and 'Dia_Semana' in df.columns:
+        validos = (dia >= 0) & (hora >= 0)
+        agregados['dia_hora'] = _contagem_por_posicao(dia[validos] * 24 + hora[validos], 7 * 24,
+                                                      ['Dia_Semana', 'Hora'], base=24)
+    if coluna_status and coluna_status in df.columns:
+        codigos_status, status = _fatorar(df[coluna_status])
+        agregados['status'] = _contagem_por_codigo(codigos_status, status, coluna_status)
+        validos = (codigos_categoria >= 0) & (codigos_status >= 0)
+        pares = contar_combinacoes(pd.DataFrame({'categoria': codigos_categoria[validos],
+                                                 'status': codigos_status[validos]}), backend)
+        indice = pd.MultiIndex.from_arrays(
+            [categorias.take(pares['categoria'].to_numpy()), status.take(pares['status'].to_numpy())],
+            names=[coluna_categoria, coluna_status])
+        agregados['categoria_status'] = pd.Series(pares['contagem'].to_numpy(), index=indice)
+    return agregados
+
+def agregar_chamados(df, coluna_categoria, coluna_solucao=None, coluna_status=None, backend=None):
+    """Calcula e ordena todas as contagens da análise; o resultado alimenta gráficos, dashboard e Excel"""
+    agregados = calcular_agregados(df, coluna_categoria, coluna_solucao, coluna_status, backend)
+    return finalizar_agregados(agregados, coluna_categoria, coluna_solucao)
+
+def somar_agregados(acumulado, parcial):
+    """Soma dois conjuntos de agregados, preservando a ordem de primeira aparição das chaves"""
+    if acumulado is None:
+        return parcial
+    resultado = {'total': acumulado['total'] + parcial['total']}
+    for chave, serie in acumulado.items():
+        if chave == 'total':
+            continue
+        outra = parcial.get(chave)
+        if serie is None or outra is None:
+            resultado[chave] = serie if outra is None else outra
+            continue
+        niveis = list(range(serie.index.nlevels))
+        resultado[chave] = pd.concat([serie, outra]).groupby(level=niveis, sort=False).sum()
+    return resultado
+
+def _tabela_solucoes(contagem_pares, coluna_categoria, coluna_solucao):
+    """Monta a tabela longa categoria/solução/contagem, ordenada por categoria e contagem decrescente"""
+    df_solucoes = contagem_pares.rename('Contagem').reset_index()
+    df_solucoes.columns = [coluna_categoria, coluna_solucao, 'Contagem']
+    return df_solucoes.sort_values([coluna_categoria, 'Contagem'], ascending=[True, False],
+                                   kind='stable', ignore_index=True)
+
+def _mapear_rotulos(serie, mapa, nivel=0, selecao=None):
+    """Troca os rótulos de um nível do índice pelos do mapa e soma as contagens que passam a coincidir"""
+    niveis = list(range(serie.index.nlevels))
+    valores = np.asarray(serie.index.get_level_values(nivel), dtype=object).copy()
+    selecao = np.ones(len(valores), dtype=bool) if selecao is None else selecao
+    valores[selecao] = pd.Index(valores[selecao], dtype=object).map(mapa).to_numpy(dtype=object)
+    if len(niveis) == 1:
+        indice = pd.Index(valores, dtype=object, name=serie.index.name)
+    else:
+        arrays = [serie.index.get_level_values(i) for i in niveis]
+        arrays[nivel] = valores
+        indice = pd.MultiIndex.from_arrays(arrays, names=serie.index.names)
+    return pd.Series(serie.to_numpy(), index=indice, name=serie.name).groupby(level=niveis, sort=False).sum()
+
+def normalizar_agregados(agregados, colunas, canonicalizar=False, agrupar_solucoes=False):
+    """Aplica aos agregados somados em blocos as mesmas normalizações do frame completo (analise_chamados e analisar_sla)
+
+    Os agregados persistidos ficam com as grafias originais: a variante mais frequente pode mudar com novas linhas,
+    então a unificação é refeita sobre as contagens totais a cada execução, como no frame inteiro.
+    """
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status, coluna_fechamento = colunas
+    agregados = dict(agregados)
+    agregados['categorias_unificadas'] = {}
+    if canonicalizar:
+        categorias = agregados['categorias']
+        rotulos = categorias.index.to_numpy(dtype=object)
+        mapa = dict(zip(rotulos, rotulos_canonicos(rotulos, categorias.to_numpy())))
+        unificadas = {rotulo: canonico for rotulo, canonico in mapa.items() if rotulo != canonico}
+        if unificadas:
+            for chave in ('categorias', 'solucoes', 'categoria_dia', 'categoria_status'):
+                if agregados[chave] is not None:
+                    agregados[chave] = _mapear_rotulos(agregados[chave], mapa)
+            if agregados.get('horas_resolucao') is not None:
+                horas = agregados['horas_resolucao']
+                agregados['horas_resolucao'] = _mapear_rotulos(
+                    horas, mapa, 1, np.asarray(horas.index.get_level_values(0) == 'categoria'))
+        agregados['categorias_unificadas'] = unificadas
+        print(f"🔤 {len(unificadas)} grafias variantes unificadas na coluna '{coluna_categoria}'")
+    if agrupar_solucoes and agregados['solucoes'] is not None:
+        agregados['solucoes'], agrupadas = _agrupar_pares_solucoes(
+            agregados['solucoes'], frequencias=agregados.get('frequencia_solucoes'))
+        print(f"🧩 {agrupadas} soluções quase iguais agrupadas na coluna '{coluna_solucao}'")
+    if coluna_data and coluna_fechamento:
+        agregados['sla'] = sla_dos_agregados(agregados, coluna_data, coluna_fechamento)
+        _imprimir_resumo_sla(agregados['sla'])
+    return agregados
+
+def finalizar_agregados(agregados, coluna_categoria, coluna_solucao=None):
+    """Ordena as contagens acumuladas e monta as tabelas no formato do restante do pipeline"""
+    agregados = dict(agregados)
+    agregados['categorias'] = _ordenar_contagem(agregados['categorias']).rename('count')
+    agregados['categorias'].index.name = coluna_categoria
+    if agregados['solucoes'] is not None and not isinstance(agregados['solucoes'], pd.DataFrame):
+        agregados['solucoes'] = _tabela_solucoes(agregados['solucoes'], coluna_categoria, coluna_solucao)
+    if agregados['status'] is not None:
+        agregados['status'] = _ordenar_contagem(agregados['status'])
+    if agregados.get('tendencias') is None:
+        agregados['tendencias'] = atualizar_tendencias(agregados.get('categoria_dia'))
+    agregados['top_solucoes'] = None
+    if agregados['solucoes'] is not None:
+        agregados['top_solucoes'] = top_solucoes_por_categoria(
+            agregados['solucoes'], agregados['categorias'], coluna_categoria,
+            max(TOP_SOLUCOES_CONSOLE, TOP_SOLUCOES_DASHBOARD), TOP_CATEGORIAS_SOLUCOES)
+    return agregados
+
+def construir_cubo(df, coluna_categoria, coluna_solucao=None, coluna_data=None, coluna_status=None,
+                   backend=None):
+    """Pré-agrega os chamados por dia, hora, categoria, status e solução (códigos inteiros) para filtros rápidos"""
+    n_linhas = len(df)
+    dimensoes, rotulos = {}, {}
+    for papel, coluna in (('categoria', coluna_categoria), ('status', coluna_status), ('solucao', coluna_solucao)):
+        if coluna and coluna in df.columns:
+            codigos, unicos = _fatorar(df[coluna])
+            dimensoes[papel], rotulos[papel] = codigos.astype(np.int32), np.asarray(unicos, dtype=object)
+        else:
+            dimensoes[papel], rotulos[papel] = np.full(n_linhas, -1, np.int32), np.array([], dtype=object)
+
+    # Dias contados a partir da data mais antiga; -1 onde a data é inválida
+    origem = None
+    dia = np.full(n_linhas, -1, np.int32)
+    if coluna_data and coluna_data in df.columns and pd.api.types.is_datetime64_any_dtype(df[coluna_data]):
+        dias = df[coluna_data].to_numpy().astype('datetime64[D]')
+        validos = ~np.isnat(dias)
+        if validos.any():
+            origem = dias[validos].min()
+            dia[validos] = (dias[validos] - origem).astype(np.int32)
+    hora = _campo_inteiro(df, 'Hora').astype(np.int8) if 'Hora' in df.columns else np.full(n_linhas, -1, np.int8)
+
+    # As linhas do cubo seguem a primeira aparição, como as contagens de calcular_agregados
+    linhas = contar_combinacoes(pd.DataFrame({'dia': dia, 'hora': hora, **dimensoes}), backend)
+    linhas['contagem'] = linhas['contagem'].astype(np.int32)
+    return {
+        'linhas': linhas,
+        'rotulos': rotulos,
+        'origem': origem,
+        'colunas': {'categoria': coluna_categoria, 'solucao': coluna_solucao, 'data': coluna_data, 'status': coluna_status},
+        'total': n_linhas,
+    }
+
+def _campos_de_data(cubo, dia):
+    """Ano, mês e dia da semana (0 = segunda) de cada linha do cubo, -1 sem data; calculados uma vez por dia distinto"""
+    ano, mes, dia_semana = (np.full(len(dia), -1, np.int64) for _ in range(3))
+    validos = dia >= 0
+    if cubo['origem'] is not None and validos.any():
+        dias_unicos, posicao = np.unique(dia[validos], return_inverse=True)
+        datas = pd.DatetimeIndex(cubo['origem'] + dias_unicos.astype('timedelta64[D]'))
+        ano[validos] = datas.year.to_numpy()[posicao]
+        mes[validos] = datas.month.to_numpy()[posicao]
+        dia_semana[validos] = datas.dayofweek.to_numpy()[posicao]
+    return ano, mes, dia_semana
+
+def _valores_dimensao(cubo, linhas, dimensao):
+    """Valores inteiros de uma dimensão nas linhas do cubo (códigos para os textos, -1 quando ausente)"""
+    if dimensao not in DIMENSOES_CUBO:
+        raise ValueError(f"Dimensão desconhecida: '{dimensao}'. Use uma de {sorted(DIMENSOES_CUBO)}")
+    if dimensao in ('categoria', 'solucao', 'status', 'hora'):
+        return linhas[dimensao].to_numpy().astype(np.int64)
+    dia = linhas['dia'].to_numpy().astype(np.int64)
+    if dimensao == 'data':
+        return dia
+    ano, mes, dia_semana = _campos_de_data(cubo, dia)
+    return {'ano': ano, 'mes': mes, 'dia_semana': dia_semana}[dimensao]
+
+def _rotulos_dimensao(cubo, dimensao, valores):
+    """Converte os valores inteiros de uma dimensão nos rótulos exibidos"""
+    if dimensao in ('categoria', 'solucao', 'status'):
+        return cubo['rotulos'][dimensao][valores]
+    if dimensao == 'data':
+        return pd.DatetimeIndex(cubo['origem'] + valores.astype('timedelta64[D]'))
+    return valores
+
+def _codigos_do_cubo(cubo, papel, valores):
+    """Códigos do cubo correspondentes a uma lista de rótulos"""
+    posicoes = {rotulo: codigo for codigo, rotulo in enumerate(cubo['rotulos'][papel])}
+    return [posicoes[valor] for valor in valores if valor in posicoes]
+
+def fatiar_cubo(cubo, inicio=None, fim=None, **filtros):
+    """Restringe o cubo a um período (datas inclusivas) e a valores de dimensões, ex.: categoria=[...], hora=range(8, 18)"""
+    linhas = cubo['linhas']
+    mascara = np.ones(len(linhas), dtype=bool)
+    if cubo['origem'] is not None and (inicio is not None or fim is not None):
+        dia = linhas['dia'].to_numpy()
+        mascara &= dia >= 0
+        if inicio is not None:
+            mascara &= dia >= (np.datetime64(inicio, 'D') - cubo['origem']).astype(np.int64)
+        if fim is not None:
+            mascara &= dia <= (np.datetime64(fim, 'D') - cubo['origem']).astype(np.int64)
+    for dimensao, valores in filtros.items():
+        if valores is None:
+            continue
+        if dimensao in ('categoria', 'solucao', 'status'):
+            valores = _codigos_do_cubo(cubo, dimensao, valores)
+        mascara &= np.isin(_valores_dimensao(cubo, linhas, dimensao), list(valores))
+    return {**cubo, 'linhas': linhas[mascara]}
+
+def consolidar_cubo(cubo, dimensoes, ordenar=True):
+    """Soma o cubo pelas dimensões pedidas (rollup); sem dimensões, devolve o total de chamados"""
+    dimensoes = [dimensoes] if isinstance(dimensoes, str) else list(dimensoes)
+    linhas = cubo['linhas']
+    pesos = linhas['contagem'].to_numpy(dtype=np.int64)
+    if not dimensoes:
+        return int(pesos.sum())
+    valores = [_valores_dimensao(cubo, linhas, dimensao) for dimensao in dimensoes]
+    validos = np.logical_and.reduce([v >= 0 for v in valores])
+    chaves = pd.DataFrame({dimensao: v[validos] for dimensao, v in zip(dimensoes, valores)})
+    chaves['contagem'] = pesos[validos]
+    contagem = chaves.groupby(dimensoes, sort=False)['contagem'].sum().rename('count')
+    nomes = [cubo['colunas'].get(dimensao) or NOMES_DIMENSOES_TEMPO[dimensao] for dimensao in dimensoes]
+    niveis = [_rotulos_dimensao(cubo, dimensao, contagem.index.get_level_values(i).to_numpy())
+              for i, dimensao in enumerate(dimensoes)]
+    contagem.index = pd.MultiIndex.from_arrays(niveis, names=nomes) if len(niveis) > 1 else pd.Index(niveis[0], name=nomes[0])
+    return _ordenar_contagem(contagem) if ordenar else contagem
+
+def top_n_cubo(cubo, dimensao, n=10, por=None):
+    """Os n valores mais frequentes de uma dimensão, no total ou dentro de cada valor de `por` (ex.: soluções por categoria)"""
+    if por is None:
+        return consolidar_cubo(cubo, dimensao).head(n)
+    contagem = consolidar_cubo(cubo, [por, dimensao])
+    # Grupos na ordem do total de `por`; dentro de cada grupo, contagem decrescente
+    totais = consolidar_cubo(cubo, por)
+    ranking = pd.Series(np.arange(len(totais)), index=totais.index)
+    posicao = ranking.reindex(contagem.index.get_level_values(0)).to_numpy()
+    contagem = contagem.iloc[np.argsort(posicao, kind='stable')]
+    return contagem.groupby(level=0, sort=False).head(n)
+
+def _contagem_ponderada(codigos, pesos, rotulos, nome):
+    """Soma as contagens do cubo por código, na ordem de primeira aparição"""
+    validos = codigos >= 0
+    locais, unicos = pd.factorize(codigos[validos])
+    contagens = np.bincount(locais, weights=pesos[validos], minlength=len(unicos)).astype(np.int64)
+    return pd.Series(contagens, index=pd.Index(rotulos[unicos], name=nome), name='count')
+
+def agregados_do_cubo(cubo, inicio=None, fim=None, categorias=None, status=None):
+    """Calcula os mesmos agregados de calcular_agregados a partir do cubo, aplicando filtros de período, categoria e status"""
+    colunas = cubo['colunas']
+    selecao = fatiar_cubo(cubo, inicio, fim, categoria=categorias, status=status)['linhas']
+    pesos = selecao['contagem'].to_numpy(dtype=np.int64)
+    categoria = selecao['categoria'].to_numpy()
+    agregados = {
+        'total': int(pesos.sum()),
+        'categorias': _contagem_ponderada(categoria, pesos, cubo['rotulos']['categoria'], colunas['categoria']),
+        'solucoes': None,
+        'ano_mes': None,
+        'dia_semana': None,
+        'hora': None,
+        'dia_hora': None,
+        'status': None,
+        'sla': None,
+        'categoria_dia': None,
+        'categoria_status': None,
+        'tendencias': None,
+        'frequencia_solucoes': None,
+        'horas_resolucao': None,
+    }
+    if colunas['solucao']:
+        solucao = selecao['solucao'].to_numpy()
+        n_solucoes = len(cubo['rotulos']['solucao'])
+        validos = (categoria >= 0) & (solucao >= 0)
+        locais, pares_unicos = pd.factorize(categoria[validos].astype(np.int64) * n_solucoes + solucao[validos])
+        indice = pd.MultiIndex.from_arrays(
+            [cubo['rotulos']['categoria'][pares_unicos // n_solucoes], cubo['rotulos']['solucao'][pares_unicos % n_solucoes]],
+            names=[colunas['categoria'], colunas['solucao']])
+        agregados['solucoes'] = pd.Series(
+            np.bincount(locais, weights=pesos[validos], minlength=len(pares_unicos)).astype(np.int64), index=indice)
+    if cubo['origem'] is not None:
+        ano, mes, dia_semana = _campos_de_data(cubo, selecao['dia'].to_numpy().astype(np.int64))
+        hora = selecao['hora'].to_numpy().astype(np.int64)
+        validos = ano >= 0
+        if validos.any():
+            ano_inicial = ano[validos].min()
+            serie = _contagem_por_posicao((ano[validos] - ano_inicial) * 12 + mes[validos] - 1, 0, ['Ano', 'Mês'],
+                                          base=12, pesos=pesos[validos])
+            serie.index = serie.index.set_levels([serie.index.levels[0] + ano_inicial, serie.index.levels[1] + 1])
+            agregados['ano_mes'] = serie
+            agregados['dia_semana'] = _contagem_por_posicao(dia_semana[validos], 7, ['Dia_Semana'], pesos=pesos[validos])
+            com_hora = validos & (hora >= 0)
+            agregados['hora'] = _contagem_por_posicao(hora[com_hora], 24, ['Hora'], pesos=pesos[com_hora])
+            agregados['dia_hora'] = _contagem_por_posicao(dia_semana[com_hora] * 24 + hora[com_hora], 7 * 24,
+                                                          ['Dia_Semana', 'Hora'], base=24, pesos=pesos[com_hora])
+        agregados['categoria_dia'] = _categoria_dia_do_cubo(cubo, selecao)
+    if colunas['status']:
+        agregados['status'] = _contagem_ponderada(selecao['status'].to_numpy(), pesos, cubo['rotulos']['status'], colunas['status'])
+        status_linhas = selecao['status'].to_numpy()
+        n_status = len(cubo['rotulos']['status'])
+        validos = (categoria >= 0) & (status_linhas >= 0)
+        locais, pares_unicos = pd.factorize(categoria[validos].astype(np.int64) * n_status + status_linhas[validos])
+        indice = pd.MultiIndex.from_arrays(
+            [cubo['rotulos']['categoria'][pares_unicos // n_status], cubo['rotulos']['status'][pares_unicos % n_status]],
+            names=[colunas['categoria'], colunas['status']])
+        agregados['categoria_status'] = pd.Series(
+            np.bincount(locais, weights=pesos[validos], minlength=len(pares_unicos)).astype(np.int64), index=indice)
+    if inicio is None and fim is None and categorias is None and status is None:
+        # Os percentis de SLA são do conjunto completo: não se recalculam a partir das contagens do cubo
+        agregados['sla'] = cubo.get('sla')
+        agregados['tendencias'] = cubo.get('tendencias')
+    return agregados
 
-def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes):
+def _categoria_dia_do_cubo(cubo, linhas):
+    """Contagem por categoria e data a partir das linhas do cubo"""
+    categoria, dia = linhas['categoria'].to_numpy().astype(np.int64), linhas['dia'].to_numpy().astype(np.int64)
+    validos = (categoria >= 0) & (dia >= 0)
+    if cubo['origem'] is None or not validos.any():
+        return None
+    base = dia[validos].max() + 1
+    locais, unicos = pd.factorize(categoria[validos] * base + dia[validos])
+    contagens = np.bincount(locais, weights=linhas['contagem'].to_numpy()[validos], minlength=len(unicos))
+    return _serie_categoria_dia(cubo['rotulos']['categoria'][unicos // base],
+                                cubo['origem'] + (unicos % base).astype('timedelta64[D]'), contagens,
+                                cubo['colunas']['categoria'])
+
+def matriz_categoria_periodo(categoria_dia, semanal=False, rotulos=None, minimo=MIN_CHAMADOS_TENDENCIA):
+    """Matriz densa categoria × período (dia ou semana iniciada na segunda) das categorias com pelo menos `minimo` chamados"""
+    # Os códigos do MultiIndex evitam materializar e fatorar os rótulos de cada par
+    indice = categoria_dia.index.remove_unused_levels()
+    codigos, unicos = indice.codes[0], np.asarray(indice.levels[0], dtype=object)
+    datas = indice.levels[1].to_numpy().astype('datetime64[D]')
+    contagens = categoria_dia.to_numpy()
+    inicio = datas.min()
+    if semanal:
+        inicio -= (inicio.astype(np.int64) + 3) % 7  # 1970-01-01 foi uma quinta-feira
+    periodos = ((datas - inicio).astype(np.int64) // (7 if semanal else 1))[indice.codes[1]]
+    n_periodos = int(periodos.max()) + 1
+    totais = np.bincount(codigos, weights=contagens, minlength=len(unicos))
+    # As linhas da execução anterior mantêm a posição; categorias novas entram no fim
+    anteriores = list(rotulos) if rotulos is not None else []
+    conhecidas = set(anteriores)
+    aparicao = pd.unique(codigos)  # ordem de primeira aparição, como nas demais contagens (os níveis vêm ordenados)
+    novas = [c for c in unicos[aparicao[totais[aparicao] >= minimo]] if c not in conhecidas]
+    ordem = pd.Index(anteriores + novas, dtype=object)
+    linhas = ordem.get_indexer(unicos)[codigos]
+    validos = linhas >= 0
+    matriz = np.bincount(linhas[validos] * n_periodos + periodos[validos], weights=contagens[validos],
+                         minlength=len(ordem) * n_periodos)
+    return inicio, ordem.to_numpy(), matriz.reshape(len(ordem), n_periodos).astype(np.int32)
+
+def _estatisticas_moveis(contagens, janela, inicio=0, desvio_minimo=DESVIO_MINIMO_TENDENCIA):
+    """Média, desvio e z-score de cada período (colunas a partir de `inicio`) contra os `janela` períodos anteriores"""
+    n_linhas, n_periodos = contagens.shape
+    base = max(inicio - janela, 0)
+    trecho = contagens[:, base:].astype(np.int64)
+    # Somas acumuladas inteiras: cada janela dá exatamente o mesmo valor no cálculo completo e no incremental
+    soma = np.zeros((n_linhas, trecho.shape[1] + 1), np.int64)
+    quadrados = np.zeros_like(soma)
+    np.cumsum(trecho, axis=1, out=soma[:, 1:])
+    np.cumsum(trecho * trecho, axis=1, out=quadrados[:, 1:])
+    periodos = np.arange(inicio, n_periodos)
+    fim, comeco = periodos - base, np.maximum(periodos - janela, base) - base
+    somas = soma[:, fim] - soma[:, comeco]
+    media = somas / janela
+    desvio = np.sqrt((quadrados[:, fim] - quadrados[:, comeco]) * janela - somas * somas) / janela
+    z = (contagens[:, inicio:] - media) / np.maximum(desvio, desvio_minimo)
+    incompletos = periodos < janela  # sem histórico suficiente
+    for matriz in (media, desvio, z):
+        matriz[:, incompletos] = np.nan
+    return media.astype(np.float32), desvio.astype(np.float32), z.astype(np.float32)
+
+def _atualizar_serie_tendencia(categoria_dia, semanal, janela, minimo, anterior=None):
+    """Uma série de tendência (diária ou semanal), reaproveitando da anterior os períodos que não mudaram"""
+    inicio, rotulos, contagens = matriz_categoria_periodo(categoria_dia, semanal,
+                                                          anterior['rotulos'] if anterior else None, minimo)
+    fixos = 0
+    if anterior is not None and anterior['inicio'] == inicio and contagens.shape[1] >= anterior['contagens'].shape[1]:
+        n_linhas, n_periodos = anterior['contagens'].shape
+        # O último período da execução anterior podia estar incompleto: é sempre recalculado
+        if np.array_equal(contagens[:n_linhas, :n_periodos - 1], anterior['contagens'][:, :n_periodos - 1]):
+            fixos = n_periodos - 1
+    media, desvio, z = (np.empty(contagens.shape, np.float32) for _ in range(3))
+    if fixos:
+        n_linhas = len(anterior['rotulos'])
+        for matriz, chave in ((media, 'media'), (desvio, 'desvio'), (z, 'z')):
+            matriz[:n_linhas, :fixos] = anterior[chave][:, :fixos]
+        media[:n_linhas, fixos:], desvio[:n_linhas, fixos:], z[:n_linhas, fixos:] = _estatisticas_moveis(
+            contagens[:n_linhas], janela, fixos)
+        # Categorias que acabaram de atingir o mínimo: série inteira
+        media[n_linhas:], desvio[n_linhas:], z[n_linhas:] = _estatisticas_moveis(contagens[n_linhas:], janela)
+    else:
+        media[:], desvio[:], z[:] = _estatisticas_moveis(contagens, janela)
+    return {'inicio': inicio, 'rotulos': rotulos, 'contagens': contagens, 'media': media, 'desvio': desvio, 'z': z,
+            'periodos_novos': contagens.shape[1] - fixos}
+
+def atualizar_tendencias(categoria_dia, anterior=None, minimo=MIN_CHAMADOS_TENDENCIA):
+    """Séries diária e semanal por categoria com média móvel e z-score; com o resultado anterior, só os períodos novos são calculados"""
+    if categoria_dia is None or categoria_dia.empty:
+        return None
+    configuracao = {'versao': VERSAO_TENDENCIAS, 'janelas': (JANELA_TENDENCIA_DIAS, JANELA_TENDENCIA_SEMANAS),
+                    'minimo': minimo, 'desvio_minimo': DESVIO_MINIMO_TENDENCIA}
+    if anterior is not None and anterior.get('configuracao') != configuracao:
+        anterior = None
+    return {
+        'configuracao': configuracao,
+        'diaria': _atualizar_serie_tendencia(categoria_dia, False, JANELA_TENDENCIA_DIAS, minimo,
+                                             anterior['diaria'] if anterior else None),
+        'semanal': _atualizar_serie_tendencia(categoria_dia, True, JANELA_TENDENCIA_SEMANAS, minimo,
+                                              anterior['semanal'] if anterior else None),
+    }
+
+def alertas_tendencias(tendencias, limiar=LIMIAR_Z_TENDENCIA, minimo=MIN_CHAMADOS_TENDENCIA):
+    """Último dia e última semana de cada categoria, com o z-score e a marcação das que estão em alta"""
+    partes = []
+    for periodo, nome, dias in (('diaria', 'Diário', 1), ('semanal', 'Semanal', 7)):
+        serie = tendencias[periodo]
+        ultimo = serie['contagens'].shape[1] - 1
+        tabela = pd.DataFrame({
+            'Periodo': nome,
+            'Categoria': serie['rotulos'],
+            'Inicio_Periodo': str(serie['inicio'] + np.timedelta64(ultimo * dias, 'D')),
+            'Chamados': serie['contagens'][:, ultimo],
+            'Media_Movel': serie['media'][:, ultimo].astype(np.float64),
+            'Desvio': serie['desvio'][:, ultimo].astype(np.float64),
+            'Z_Score': serie['z'][:, ultimo].astype(np.float64),
+        })
+        tabela['Em_Alta'] = (tabela['Z_Score'] >= limiar) & (tabela['Chamados'] >= minimo)
+        partes.append(tabela.round(2).sort_values('Z_Score', ascending=False, kind='stable', na_position='last'))
+    return pd.concat(partes, ignore_index=True)
+
+def _imprimir_atualizacao_tendencias(tendencias):
+    """Exibe no console quantos períodos das séries de tendência foram (re)calculados"""
+    if tendencias is None:
+        return
+    diaria, semanal = tendencias['diaria'], tendencias['semanal']
+    print(f"📈 Tendências de {len(diaria['rotulos'])} categorias: {diaria['periodos_novos']} de "
+          f"{diaria['contagens'].shape[1]} dias e {semanal['periodos_novos']} de {semanal['contagens'].shape[1]} "
+          f"semanas calculados")
+
+def _arquivo_tendencias(chave):
+    """Caminho das séries de tendência da planilha; só o prefixo da chave, para servirem à próxima versão dela"""
+    return cache_dir / f"{chave.split('-')[0]}.tendencias.v{VERSAO_TENDENCIAS}.pkl"
+
+def _arquivo_cubo(chave):
+    """Caminho do cubo persistido da planilha; a versão do formato invalida cubos de versões anteriores"""
+    return cache_dir / f"{chave}.cubo.v{VERSAO_CUBO}.pkl"
+
+def salvar_cubo(cubo, chave):
+    """Grava o cubo no cache e remove os cubos de versões anteriores da mesma planilha"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    arquivo = _arquivo_cubo(chave)
+    temporario = arquivo.with_suffix('.tmp')
+    pd.to_pickle(cubo, temporario)
+    os.replace(temporario, arquivo)
+    prefixo = chave.split('-')[0]
+    for antigo in cache_dir.glob(f"{prefixo}-*.cubo.*"):
+        if antigo != arquivo:
+            antigo.unlink(missing_ok=True)
+    limpar_cache(manter=[arquivo])
+    return arquivo
+
+def carregar_cubo(chave):
+    """Lê o cubo persistido da planilha; retorna None se não houver"""
+    arquivo = _arquivo_cubo(chave)
+    if not arquivo.exists():
+        return None
+    cubo = pd.read_pickle(arquivo)
+    os.utime(arquivo)  # expiração do cache como LRU
+    return cubo
+
+def chave_conteudo(*partes):
+    """Hash estável das entradas e parâmetros de uma etapa (chaves de cache, números, textos, listas e dicionários)"""
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:24]
+
+def _arquivo_resultado(etapa, chave):
+    """Caminho do resultado de uma etapa no armazém; a versão do formato invalida resultados de versões anteriores"""
+    return cache_dir / f"{etapa}.{chave}.v{VERSAO_RESULTADOS}.resultado.pkl"
+
+def memorizar_etapa(etapa, entradas, calcular, usar_cache=True, exibir=None):
+    """Resultado da etapa: do armazém quando as mesmas entradas já foram calculadas; senão calcula e grava
+
+    O arquivo é endereçado pelo hash das entradas (chave do resultado anterior e parâmetros da etapa), então mudar
+    só um parâmetro de apresentação reaproveita tudo o que vem antes dele. exibir repete no console o resumo que o
+    cálculo imprimiria. A expiração é a do restante do cache (limpar_cache: idade e tamanho, por LRU).
+    """
+    usar_cache = cache_ativo(usar_cache)
+    arquivo = _arquivo_resultado(etapa, chave_conteudo(etapa, entradas)) if usar_cache else None
+    if usar_cache and not ATUALIZAR_CACHE and arquivo.exists():
+        try:
+            resultado = pd.read_pickle(arquivo)
+            os.utime(arquivo)  # expiração do cache como LRU
+            print(f"⚡ Resultado de '{etapa}' reaproveitado do cache")
+            if exibir is not None:
+                exibir(resultado)
+            return resultado
+        except Exception as e:
+            print(f"⚠️ Resultado de '{etapa}' em cache ilegível, recalculando: {e}")
+    resultado = calcular()
+    if usar_cache:
+        # None também é gravado: "sem coluna de fechamento" não precisa reler a planilha na próxima execução
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            temporario = arquivo.with_suffix(f'.{os.getpid()}.tmp')
+            pd.to_pickle(resultado, temporario)
+            os.replace(temporario, arquivo)
+            limpar_cache(manter=[arquivo])
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar o resultado de '{etapa}' no cache: {e}")
+    return resultado
+
+def obter_cubo(caminho=None, usar_cache=True, chave=None, backend=None):
+    """Cubo da planilha: do cache quando ela não mudou; senão carrega, analisa, agrega as linhas e persiste o cubo
+
+    SLA e tendências ficam no armazém de resultados, cada um sob seus próprios parâmetros: mudar a meta de SLA não
+    reconstrói o cubo, e o frame só é carregado se alguma etapa precisar ser recalculada.
+    """
+    usar_cache = cache_ativo(usar_cache)
+    caminhos = caminhos_planilhas(caminho)
+    nome = caminhos[0].name if len(caminhos) == 1 else f"{len(caminhos)} planilhas"
+    configuracao = {'canonicalizar': CANONICALIZAR_CATEGORIAS, 'agrupar_solucoes': AGRUPAR_SOLUCOES_SIMILARES,
+                    'limiar_solucoes': LIMIAR_SIMILARIDADE_SOLUCOES, 'papeis': dict(sorted(PAPEIS_FORCADOS.items())),
+                    'abas': list(ABAS_PLANILHA) if ABAS_PLANILHA else None}
+    parametros_sla = (HORARIO_COMERCIAL, DIAS_UTEIS, list(FERIADOS), META_SLA_HORAS, PERCENTIS_SLA,
+                      RESOLUCAO_SLA_MINUTOS)
+    parametros_tendencias = (JANELA_TENDENCIA_DIAS, JANELA_TENDENCIA_SEMANAS, MIN_CHAMADOS_TENDENCIA,
+                             DESVIO_MINIMO_TENDENCIA)
+    analise = {}
+
+    def analisar():
+        """Carrega e analisa o frame uma única vez, só quando o cubo ou o SLA precisam ser calculados"""
+        if not analise:
+            df = carregar_dados(caminhos, usar_cache=usar_cache)
+            if df is None:
+                return None
+            df, *colunas, _ = analise_chamados(
+                df, canonicalizar=CANONICALIZAR_CATEGORIAS, compactar=COMPACTAR_MEMORIA, copiar=False,
+                agrupar_solucoes=AGRUPAR_SOLUCOES_SIMILARES)
+            if not colunas[0]:
+                return None
+            analise.update(df=df, colunas=colunas)
+        return analise
+
+    cubo = None
+    if usar_cache and caminhos and all(c.exists() for c in caminhos):
+        try:
+            chave = chave or impressao_digital_conjunto(caminhos)
+            cubo = None if ATUALIZAR_CACHE else carregar_cubo(chave)
+            if cubo is not None and cubo.get('configuracao') == configuracao:
+                print(f"⚡ Cubo de agregados carregado do cache: {nome} ({cubo['total']} chamados)")
+                colunas = cubo['colunas']
+                _imprimir_resumo_categorias(colunas['categoria'], consolidar_cubo(cubo, 'categoria'), cubo['total'])
+            else:
+                cubo = None
+        except Exception as e:
+            cubo = None
+            print(f"⚠️ Cubo em cache indisponível, agregando as linhas: {e}")
+    if cubo is None:
+        if analisar() is None:
+            return None
+        cubo = construir_cubo(analise['df'], *analise['colunas'], backend)
+        cubo['configuracao'] = configuracao
+        if usar_cache and chave:
+            try:
+                salvar_cubo(cubo, chave)
+            except Exception as e:
+                print(f"⚠️ Não foi possível gravar o cubo no cache: {e}")
+
+    def calcular_sla():
+        if analisar() is None:
+            return None
+        coluna_categoria, _, coluna_data, coluna_status = analise['colunas']
+        return analisar_sla(analise['df'], coluna_categoria, coluna_status, coluna_data,
+                            analise['df'].attrs.get('coluna_fechamento'))
+
+    # Os resultados derivados do cubo são endereçados pela planilha e pela configuração que o produziu
+    usar_armazem = bool(usar_cache and chave)
+    cubo['sla'] = memorizar_etapa('sla', (chave, configuracao, parametros_sla), calcular_sla, usar_armazem,
+                                  exibir=_imprimir_resumo_sla)
+    cubo['tendencias'] = memorizar_etapa('tendencias', (chave, configuracao, parametros_tendencias),
+                                         lambda: _tendencias_do_cubo(cubo, chave if usar_cache else None), usar_armazem)
+    cubo['chave_resultados'] = (chave_conteudo(chave, configuracao, parametros_sla, parametros_tendencias)
+                                if usar_armazem else None)
+    return cubo
+
+def _tendencias_do_cubo(cubo, chave=None):
+    """Séries de tendência do cubo, continuando as da versão anterior da planilha (cache) pelos períodos novos"""
+    anterior = None
+    if chave and _arquivo_tendencias(chave).exists():
+        try:
+            anterior = pd.read_pickle(_arquivo_tendencias(chave))
+        except Exception as e:
+            print(f"⚠️ Tendências em cache ilegíveis, recalculando: {e}")
+    tendencias = atualizar_tendencias(_categoria_dia_do_cubo(cubo, cubo['linhas']), anterior)
+    _imprimir_atualizacao_tendencias(tendencias)
+    if chave and tendencias is not None:
+        try:
+            arquivo = _arquivo_tendencias(chave)
+            temporario = arquivo.with_suffix('.tmp')
+            pd.to_pickle(tendencias, temporario)
+            os.replace(temporario, arquivo)
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar as tendências no cache: {e}")
+    return tendencias
+
+def _assinatura_linha(linha):
+    """Gera uma assinatura estável para os valores brutos de uma linha da planilha"""
+    return hashlib.sha256(repr(tuple(str(v) for v in linha)).encode('utf-8')).hexdigest()
+
+def _acumular_blocos(caminho, tamanho_bloco, pular_linhas=0, colunas=None, agregados=None, assinatura_fronteira=None):
+    """Lê a planilha em blocos a partir de pular_linhas e soma cada bloco aos agregados"""
+    linhas_lidas = 0
+    marca_dagua = None
+    ultima_assinatura = None
+    for bloco in ler_planilha_em_blocos(caminho, tamanho_bloco, pular_linhas):
+        if assinatura_fronteira is not None:
+            # A primeira linha lida deve ser a última da execução anterior; se mudou, o histórico foi reescrito
+            if _assinatura_linha(bloco.iloc[0]) != assinatura_fronteira:
+                raise ValueError("as linhas já processadas foram alteradas desde a última execução")
+            assinatura_fronteira = None
+            bloco = bloco.iloc[1:]
+            if bloco.empty:
+                continue
+        if colunas is None:
+            # As colunas são identificadas no primeiro bloco e valem para todo o arquivo
+            coluna_data = encontrar_coluna_data(bloco)
+            colunas = (encontrar_coluna_categoria(bloco), encontrar_coluna_solucao(bloco), coluna_data,
+                       encontrar_coluna_status(bloco), encontrar_coluna_fechamento(bloco, coluna_data))
+            if not colunas[0]:
+                print("❌ Não foi possível identificar uma coluna de categoria")
+                return None
+        if any(coluna and coluna not in bloco.columns for coluna in colunas):
+            raise ValueError("as colunas da planilha mudaram desde a última execução")
+        coluna_categoria, coluna_solucao, coluna_data, coluna_status, coluna_fechamento = colunas
+        ultima_assinatura = _assinatura_linha(bloco.iloc[-1])
+        if coluna_data:
+            bloco = processar_datas(bloco, coluna_data)
+            maximo = bloco[coluna_data].max()
+            if pd.notna(maximo) and (marca_dagua is None or maximo > marca_dagua):
+                marca_dagua = maximo
+        if coluna_fechamento:
+            bloco[coluna_fechamento], _ = converter_datas(bloco[coluna_fechamento])
+        parcial = calcular_agregados(bloco, coluna_categoria, coluna_solucao, coluna_status)
+        parcial['horas_resolucao'] = agregar_horas_resolucao(bloco, coluna_categoria, coluna_status, coluna_data,
+                                                             coluna_fechamento)
+        agregados = somar_agregados(agregados, parcial)
+        linhas_lidas += len(bloco)
+        print(f"   ... {agregados['total']} linhas processadas")
+    if assinatura_fronteira is not None:
+        raise ValueError("a planilha tem menos linhas do que na última execução")
+    return colunas, agregados, linhas_lidas, marca_dagua, ultima_assinatura
+
+def _imprimir_resumo_categorias(coluna_categoria, contagem_categorias, total_chamados):
+    """Exibe no console a coluna de categoria e a distribuição das categorias mais frequentes"""
+    print(f"📋 Coluna de categoria identificada: '{coluna_categoria}'")
+    print(f"\n📊 Estatísticas da coluna '{coluna_categoria}':")
+    print(f"   Valores únicos: {len(contagem_categorias)}")
+    print(f"\n📈 Distribuição de categorias (top 10):")
+    for i, (categoria, quantidade) in enumerate(contagem_categorias.head(10).items(), 1):
+        percentual = (quantidade / total_chamados) * 100
+        print(f"   {i}. {categoria}: {quantidade} chamados ({percentual:.1f}%)")
+
+def _imprimir_resumo_agregados(coluna_categoria, coluna_solucao, agregados):
+    """Exibe no console o resumo de categorias e soluções calculado a partir dos agregados"""
+    contagem_categorias = agregados['categorias']
+    _imprimir_resumo_categorias(coluna_categoria, contagem_categorias, agregados['total'])
+    if agregados['solucoes'] is not None:
+        print("\n" + "="*60)
+        print("ANÁLISE DE SOLUÇÕES POR CATEGORIA DE PROBLEMA")
+        print("="*60)
+        imprimir_top_solucoes(agregados['top_solucoes'], contagem_categorias.head(TOP_CATEGORIAS_SOLUCOES).index,
+                              coluna_categoria, coluna_solucao)
+
+def analise_chamados_streaming(caminho=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Realiza a análise de chamados lendo a planilha em blocos e acumulando apenas os agregados"""
+    print("\n" + "="*60)
+    print("ANÁLISE GERAL DE CHAMADOS (LEITURA EM BLOCOS)")
+    print("="*60)
+    caminho = Path(caminho) if caminho else planilha_configurada()
+    if not caminho.exists():
+        print(f"❌ ERRO: O arquivo não foi encontrado em '{caminho}'")
+        return None
+    resultado = _acumular_blocos(caminho, tamanho_bloco)
+    if resultado is None:
+        return None
+    colunas, agregados = resultado[:2]
+    if agregados is None:
+        print("❌ A planilha não possui linhas de dados")
+        return None
+
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status, _ = colunas
+    agregados = normalizar_agregados(agregados, colunas, CANONICALIZAR_CATEGORIAS, AGRUPAR_SOLUCOES_SIMILARES)
+    agregados = finalizar_agregados(agregados, coluna_categoria, coluna_solucao)
+    _imprimir_resumo_agregados(coluna_categoria, coluna_solucao, agregados)
+    return coluna_categoria, coluna_solucao, coluna_data, coluna_status, agregados
+
+def carregar_estado_incremental(caminho_estado=None):
+    """Carrega o estado agregado persistido pela última execução incremental"""
+    caminho_estado = Path(caminho_estado) if caminho_estado else estado_path
+    if not caminho_estado.exists():
+        return None
+    try:
+        estado = pd.read_pickle(caminho_estado)
+    except Exception as e:
+        print(f"⚠️ Estado incremental ilegível, será reconstruído: {e}")
+        return None
+    return estado if estado.get('versao') == VERSAO_ESTADO else None
+
+def salvar_estado_incremental(estado, caminho_estado=None):
+    """Persiste o estado agregado de forma atômica"""
+    caminho_estado = Path(caminho_estado) if caminho_estado else estado_path
+    caminho_estado.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho_estado.with_suffix('.tmp')
+    pd.to_pickle(estado, temporario)
+    os.replace(temporario, caminho_estado)
+
+def analise_chamados_incremental(caminho=None, tamanho_bloco=TAMANHO_BLOCO, reconstruir=False, caminho_estado=None):
+    """Processa apenas os chamados acrescentados desde a última execução e os soma ao estado persistido"""
+    print("\n" + "="*60)
+    print("ANÁLISE GERAL DE CHAMADOS (INCREMENTAL)")
+    print("="*60)
+    caminho = Path(caminho) if caminho else planilha_configurada()
+    if not caminho.exists():
+        print(f"❌ ERRO: O arquivo não foi encontrado em '{caminho}'")
+        return None
+    planilha = str(caminho.resolve())
+    caminho_estado = caminho_estado or estado_path or caminho.parent / ARQUIVO_ESTADO
+    estado = None if reconstruir else carregar_estado_incremental(caminho_estado)
+    if estado is not None and estado['planilha'] != planilha:
+        estado = None
+
+    resultado = None
+    if estado is not None:
+        marca = estado['marca_dagua']
+        print(f"⏩ Marca d'água: {marca['linhas']} linhas processadas, última data {marca['data']}")
+        try:
+            # Relê a última linha já processada para conferir que a planilha só recebeu acréscimos
+            resultado = _acumular_blocos(caminho, tamanho_bloco, max(marca['linhas'] - 1, 0), estado['colunas'],
+                                         estado['agregados'], marca['assinatura'] if marca['linhas'] else None)
+        except ValueError as e:
+            print(f"⚠️ Reconstrução completa necessária: {e}")
+            estado = None
+    if estado is None:
+        print("🔄 Reconstruindo os agregados a partir de todas as linhas...")
+        resultado = _acumular_blocos(caminho, tamanho_bloco)
+    if resultado is None:
+        return None
+    colunas, agregados, linhas_lidas, data_maxima, assinatura = resultado
+    if agregados is None:
+        print("❌ A planilha não possui linhas de dados")
+        return None
+
+    marca_anterior = estado['marca_dagua'] if estado is not None else {'linhas': 0, 'data': None, 'assinatura': None}
+    normalizados = normalizar_agregados(agregados, colunas, CANONICALIZAR_CATEGORIAS, AGRUPAR_SOLUCOES_SIMILARES)
+    # As tendências anteriores só valem se as categorias foram unificadas da mesma forma
+    unificadas = normalizados['categorias_unificadas']
+    anteriores = (estado['tendencias'] if estado is not None and estado.get('categorias_unificadas') == unificadas
+                  else None)
+    tendencias = atualizar_tendencias(normalizados['categoria_dia'], anteriores)
+    _imprimir_atualizacao_tendencias(tendencias)
+    if marca_anterior['data'] is not None and (data_maxima is None or data_maxima < marca_anterior['data']):
+        data_maxima = marca_anterior['data']
+    salvar_estado_incremental({
+        'versao': VERSAO_ESTADO,
+        'planilha': planilha,
+        'colunas': colunas,
+        'agregados': agregados,
+        'tendencias': tendencias,
+        'categorias_unificadas': unificadas,
+        'marca_dagua': {
+            'linhas': marca_anterior['linhas'] + linhas_lidas,
+            'data': data_maxima,
+            'assinatura': assinatura if linhas_lidas else marca_anterior['assinatura'],
+        },
+    }, caminho_estado)
+    print(f"✅ {linhas_lidas} novas linhas incorporadas ao estado incremental")
+
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status, _ = colunas
+    agregados = finalizar_agregados({**normalizados, 'tendencias': tendencias}, coluna_categoria, coluna_solucao)
+    _imprimir_resumo_agregados(coluna_categoria, coluna_solucao, agregados)
+    return coluna_categoria, coluna_solucao, coluna_data, coluna_status, agregados
+
+@instrumentar
+def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes, agregados=None):
     """Cria gráficos interativos para o dashboard"""
+    import plotly.express as px
+    if agregados is None:
+        agregados = agregar_chamados(df, coluna_categoria, None, coluna_status)
+    contagem_categorias = agregados['categorias']
     
     # 1. Gráfico de distribuição de categorias (top 15)
     fig_categorias = px.bar(
@@ -231,9 +2375,9 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
     
     # 3. Gráfico de tendência temporal (se dados de data disponíveis)
     fig_temporal = None
-    if 'Mês' in df.columns and 'Ano' in df.columns:
-        temporal_data = df.groupby(['Ano', 'Mês']).size().reset_index(name='Quantidade')
-        temporal_data['Data'] = pd.to_datetime(temporal_data['Ano'].astype(str) + '-' + temporal_data['Mês'].astype(str))
+    if agregados['ano_mes'] is not None:
+        temporal_data = agregados['ano_mes'].sort_index().reset_index(name='Quantidade')
+        temporal_data['Data'] = pd.to_datetime(pd.DataFrame({'year': temporal_data['Ano'], 'month': temporal_data['Mês'], 'day': 1}))
         
         fig_temporal = px.line(
             temporal_data, 
@@ -251,13 +2395,9 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
     
     # 4. Gráfico de distribuição por dia da semana (se dados de data disponíveis)
     fig_dia_semana = None
-    if 'Dia_Semana' in df.columns:
-        dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dias_portugues = {'Monday': 'Segunda', 'Tuesday': 'Terça', 'Wednesday': 'Quarta', 
-                         'Thursday': 'Quinta', 'Friday': 'Sexta', 'Saturday': 'Sábado', 'Sunday': 'Domingo'}
-        
-        dia_semana_data = df['Dia_Semana'].value_counts().reindex(dias_ordem)
-        dia_semana_data.index = dia_semana_data.index.map(dias_portugues)
+    if agregados['dia_semana'] is not None:
+        dia_semana_data = agregados['dia_semana'].reindex(range(7))
+        dia_semana_data.index = DIAS_SEMANA
         
         fig_dia_semana = px.bar(
             x=dia_semana_data.index,
@@ -275,8 +2415,8 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
     
     # 5. Gráfico de distribuição por hora do dia (se dados disponíveis)
     fig_hora = None
-    if 'Hora' in df.columns:
-        hora_data = df['Hora'].value_counts().sort_index()
+    if agregados['hora'] is not None:
+        hora_data = agregados['hora'].sort_index()
         
         fig_hora = px.bar(
             x=hora_data.index,
@@ -294,8 +2434,8 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
     
     # 6. Gráfico de status (se disponível)
     fig_status = None
-    if coluna_status and coluna_status in df.columns:
-        status_data = df[coluna_status].value_counts()
+    if agregados['status'] is not None:
+        status_data = _ordenar_contagem(agregados['status'])
         
         fig_status = px.pie(
             values=status_data.values,
@@ -312,14 +2452,10 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
     
     # 7. Heatmap de correlação entre hora e dia da semana (se dados disponíveis)
     fig_heatmap = None
-    if 'Hora' in df.columns and 'Dia_Semana' in df.columns:
-        dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dias_portugues = {'Monday': 'Segunda', 'Tuesday': 'Terça', 'Wednesday': 'Quarta', 
-                         'Thursday': 'Quinta', 'Friday': 'Sexta', 'Saturday': 'Sábado', 'Sunday': 'Domingo'}
-        
-        heatmap_data = df.groupby(['Dia_Semana', 'Hora']).size().unstack(fill_value=0)
-        heatmap_data = heatmap_data.reindex(dias_ordem)
-        heatmap_data.index = heatmap_data.index.map(dias_portugues)
+    if agregados['dia_hora'] is not None:
+        heatmap_data = agregados['dia_hora'].unstack(fill_value=0).sort_index(axis=1)
+        heatmap_data = heatmap_data.reindex(range(7))
+        heatmap_data.index = DIAS_SEMANA
         
         fig_heatmap = px.imshow(
             heatmap_data,
@@ -333,6 +2469,37 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
             font_color='#fff'
         )
     
+    # 8. Séries semanais das categorias com maior z-score na última semana, com a média móvel tracejada
+    fig_tendencias = None
+    tendencias = agregados.get('tendencias')
+    if tendencias is not None:
+        semanal = tendencias['semanal']
+        z = np.nan_to_num(semanal['z'][:, -1], nan=-np.inf)
+        linhas = np.argsort(-z, kind='stable')[:TOP_TENDENCIAS_DASHBOARD]
+        janela = slice(max(semanal['contagens'].shape[1] - SEMANAS_GRAFICO_TENDENCIAS, 0), None)
+        semanas = semanal['inicio'] + 7 * np.arange(semanal['contagens'].shape[1])[janela].astype('timedelta64[D]')
+        tendencia_data = pd.concat([
+            pd.DataFrame({'Semana': semanas, 'Categoria': str(semanal['rotulos'][linha]), 'Série': serie,
+                          'Quantidade': valores[linha, janela]})
+            for linha in linhas
+            for serie, valores in (('Chamados', semanal['contagens']), ('Média móvel', semanal['media']))
+        ], ignore_index=True)
+
+        fig_tendencias = px.line(
+            tendencia_data,
+            x='Semana',
+            y='Quantidade',
+            color='Categoria',
+            line_dash='Série',
+            title=f'Chamados por Semana: Categorias com Maior Z-Score (média móvel de {JANELA_TENDENCIA_SEMANAS} semanas)',
+            color_discrete_sequence=px.colors.sequential.Reds[::-1]
+        )
+        fig_tendencias.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='#fff'
+        )
+
     return {
         'categorias': fig_categorias,
         'pizza': fig_pizza,
@@ -340,55 +2507,348 @@ def criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data
         'dia_semana': fig_dia_semana,
         'hora': fig_hora,
         'status': fig_status,
-        'heatmap': fig_heatmap
+        'heatmap': fig_heatmap,
+        'tendencias': fig_tendencias
     }
 
-def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes, graficos):
+def renderizar_tabela_solucoes(top_solucoes, coluna_categoria, coluna_solucao, n_solucoes=TOP_SOLUCOES_DASHBOARD,
+                               limite_texto=100):
+    """Gera o HTML das tabelas de soluções por problema a partir do top-N já calculado"""
+    partes = []
+    for categoria, grupo in top_solucoes.groupby(coluna_categoria, sort=False):
+        textos = grupo[coluna_solucao].head(n_solucoes).astype(str)
+        textos = textos.where(textos.str.len() <= limite_texto, textos.str[:limite_texto] + "...")
+        partes.append(f"<h4>Problema: {escape(str(categoria))}</h4>")
+        partes.append("<table><thead><tr><th>Solução Apresentada</th><th>Quantidade</th></tr></thead><tbody>")
+        partes.extend(f"<tr><td>{escape(texto)}</td><td>{contagem}</td></tr>"
+                      for texto, contagem in zip(textos, grupo['Contagem'].head(n_solucoes)))
+        partes.append("</tbody></table><br>")
+    return ''.join(partes)
+
+def renderizar_tabela_categorias(contagem_categorias, total_chamados, n_categorias=20):
+    """Gera as linhas HTML da tabela geral de categorias"""
+    if contagem_categorias is None:
+        return ''
+    top = contagem_categorias.head(n_categorias)
+    percentuais = top.to_numpy() / total_chamados * 100
+    # Cada linha abre o detalhe da categoria (seção "Detalhes por Categoria") pela posição no ranking
+    return ''.join(f'<tr data-posicao="{posicao}"><td>{escape(str(categoria))}</td><td>{quantidade}</td>'
+                   f'<td>{percentual:.1f}%</td></tr>'
+                   for posicao, (categoria, quantidade, percentual) in enumerate(zip(top.index, top.to_numpy(), percentuais)))
+
+def renderizar_tabela_tendencias(tendencias, limiar=LIMIAR_Z_TENDENCIA):
+    """Gera o HTML da tabela de categorias em alta no último dia e na última semana"""
+    if tendencias is None:
+        return "<p>Dados temporais não disponíveis</p>"
+    em_alta = alertas_tendencias(tendencias, limiar)
+    em_alta = em_alta[em_alta['Em_Alta']]
+    if em_alta.empty:
+        return f"<p>Nenhuma categoria com z-score acima de {limiar:g} no último dia ou na última semana.</p>"
+    linhas = ''.join(
+        f"<tr><td>{escape(periodo)}</td><td>{escape(str(categoria))}</td><td>{inicio}</td><td>{chamados}</td>"
+        f"<td>{media:.1f}</td><td>{z:.1f}</td></tr>"
+        for periodo, categoria, inicio, chamados, media, z in zip(
+            em_alta['Periodo'], em_alta['Categoria'], em_alta['Inicio_Periodo'], em_alta['Chamados'],
+            em_alta['Media_Movel'], em_alta['Z_Score']))
+    return ("<table><thead><tr><th>Período</th><th>Categoria</th><th>Início</th><th>Chamados</th>"
+            f"<th>Média Móvel</th><th>Z-Score</th></tr></thead><tbody>{linhas}</tbody></table>")
+
+def indice_detalhes_categorias(agregados, coluna_categoria, coluna_solucao=None, n_solucoes=TOP_SOLUCOES_DETALHES):
+    """Detalhe de cada categoria ([{categoria, total, soluções, meses, status}]), na ordem do ranking de categorias
+
+    Os detalhes são endereçados pela posição no ranking, e não pelo texto do rótulo: rótulos distintos como 1 e '1'
+    viram o mesmo texto no JSON.
+    """
+    ranking = agregados['categorias'].index
+    detalhes = [{'categoria': str(categoria), 'total': int(total)} for categoria, total in agregados['categorias'].items()]
+    solucoes = agregados['solucoes']
+    if solucoes is not None and coluna_solucao:
+        # A tabela de soluções já vem ordenada por categoria e contagem decrescente
+        top = solucoes.groupby(coluna_categoria, sort=False, observed=True).head(n_solucoes)
+        for posicao, solucao, contagem in zip(ranking.get_indexer(top[coluna_categoria]), top[coluna_solucao].astype(str),
+                                              top['Contagem'].to_numpy()):
+            if posicao >= 0:
+                detalhes[posicao].setdefault('solucoes', []).append([solucao, int(contagem)])
+    categoria_dia = agregados.get('categoria_dia')
+    if categoria_dia is not None and len(categoria_dia):
+        # Matriz densa categoria × mês; cada categoria guarda só o trecho entre o primeiro e o último mês com chamados
+        indice = categoria_dia.index.remove_unused_levels()
+        posicoes = ranking.get_indexer(indice.levels[0])
+        meses = indice.levels[1].to_numpy().astype('datetime64[M]').astype(np.int64)[indice.codes[1]]
+        inicio = meses.min()
+        n_meses = int(meses.max() - inicio) + 1
+        matriz = np.bincount(indice.codes[0].astype(np.int64) * n_meses + (meses - inicio),
+                             weights=categoria_dia.to_numpy(), minlength=len(posicoes) * n_meses)
+        matriz = matriz.astype(np.int64).reshape(len(posicoes), n_meses)
+        for linha, posicao in enumerate(posicoes):
+            com_chamados = np.flatnonzero(matriz[linha])
+            if posicao >= 0 and len(com_chamados):
+                primeiro, ultimo = com_chamados[0], com_chamados[-1]
+                detalhes[posicao]['meses'] = {
+                    'inicio': str(np.datetime64(int(inicio + primeiro), 'M')),
+                    'contagens': matriz[linha, primeiro:ultimo + 1].tolist()}
+    categoria_status = agregados.get('categoria_status')
+    if categoria_status is not None and len(categoria_status):
+        niveis = categoria_status.index
+        ordem = np.lexsort((-categoria_status.to_numpy(), niveis.codes[0]))
+        for posicao, status, contagem in zip(ranking.get_indexer(niveis.get_level_values(0)[ordem]),
+                                             niveis.get_level_values(1)[ordem].astype(str),
+                                             categoria_status.to_numpy()[ordem]):
+            if posicao >= 0:
+                detalhes[posicao].setdefault('status', []).append([status, int(contagem)])
+    return detalhes
+
+def exportar_detalhes_categorias(detalhes, diretorio_saida=None, por_parte=CATEGORIAS_POR_PARTE_DETALHES):
+    """Grava o índice e as partes do detalhe das categorias como scripts .js ao lado do dashboard
+
+    Scripts (e não .json) porque o navegador bloqueia fetch de arquivos locais quando o HTML é aberto do disco;
+    cada parte chama registrarDetalhes ao ser carregada por uma tag <script>.
+    """
+    pasta = Path(diretorio_saida or out_dir) / PASTA_DETALHES
+    pasta.mkdir(parents=True, exist_ok=True)
+    compacto = partial(json.dumps, ensure_ascii=False, separators=(',', ':'))
+    gravados = set()
+    for parte, inicio in enumerate(range(0, len(detalhes), por_parte)):
+        arquivo = pasta / f"parte_{parte:04d}.js"
+        arquivo.write_text(f"registrarDetalhes({parte}, {compacto(detalhes[inicio:inicio + por_parte])});\n",
+                           encoding='utf-8')
+        gravados.add(arquivo)
+    indice = {'por_parte': por_parte, 'categorias': [detalhe['categoria'] for detalhe in detalhes],
+              'totais': [detalhe['total'] for detalhe in detalhes]}
+    (pasta / "indice.js").write_text(f"registrarIndiceDetalhes({compacto(indice)});\n", encoding='utf-8')
+    # Partes de uma execução anterior com mais categorias
+    for antigo in pasta.glob("parte_*.js"):
+        if antigo not in gravados:
+            antigo.unlink(missing_ok=True)
+    print(f"🗂️ Detalhes de {len(detalhes)} categorias ({len(gravados)} partes): {pasta}")
+    return pasta
+
+def _script_detalhes():
+    """Script do detalhe por categoria: carrega a parte da categoria escolhida só quando ela é aberta"""
+    return """
+        <script>
+            const PASTA_DETALHES = '""" + PASTA_DETALHES + """';
+            let indiceDetalhes = null;
+            const partesDetalhes = {};
+            const aguardandoPartes = {};
+            function carregarScript(origem, aoFalhar) {
+                const script = document.createElement('script');
+                script.src = origem;
+                script.onerror = aoFalhar;
+                document.head.appendChild(script);
+            }
+            function avisoDetalhe(texto) {
+                const aviso = document.createElement('p');
+                aviso.textContent = texto;
+                document.getElementById('detalhe-categoria').replaceChildren(aviso);
+            }
+            function registrarIndiceDetalhes(indice) {
+                indiceDetalhes = indice;
+                // A busca é por texto: rótulos que viram o mesmo texto abrem o primeiro do ranking
+                indiceDetalhes.posicoes = new Map();
+                indice.categorias.forEach(function(nome, i) {
+                    if (!indiceDetalhes.posicoes.has(nome)) {
+                        indiceDetalhes.posicoes.set(nome, i);
+                    }
+                });
+                const lista = document.getElementById('lista-categorias');
+                indice.categorias.forEach(function(nome, i) {
+                    const opcao = document.createElement('option');
+                    opcao.value = nome;
+                    opcao.label = indice.totais[i] + ' chamados';
+                    lista.appendChild(opcao);
+                });
+            }
+            function registrarDetalhes(parte, detalhes) {
+                partesDetalhes[parte] = detalhes;
+                (aguardandoPartes[parte] || []).forEach(function(continuar) { continuar(detalhes); });
+                delete aguardandoPartes[parte];
+            }
+            function tabelaDetalhe(titulo, cabecalho, linhas) {
+                const tabela = document.createElement('table');
+                const topo = tabela.createTHead().insertRow();
+                cabecalho.forEach(function(texto) {
+                    const th = document.createElement('th');
+                    th.textContent = texto;
+                    topo.appendChild(th);
+                });
+                const corpo = tabela.createTBody();
+                linhas.forEach(function(valores) {
+                    const linha = corpo.insertRow();
+                    valores.forEach(function(valor) { linha.insertCell().textContent = valor; });
+                });
+                const bloco = document.createElement('div');
+                const h4 = document.createElement('h4');
+                h4.textContent = titulo;
+                bloco.append(h4, tabela);
+                return bloco;
+            }
+            function mostrarDetalhe(detalhe) {
+                const destino = document.getElementById('detalhe-categoria');
+                const titulo = document.createElement('h3');
+                titulo.textContent = detalhe.categoria + ' — ' + detalhe.total + ' chamados';
+                destino.replaceChildren(titulo);
+                if (detalhe.solucoes) {
+                    destino.appendChild(tabelaDetalhe('Soluções mais aplicadas', ['Solução Apresentada', 'Quantidade'], detalhe.solucoes));
+                }
+                if (detalhe.status) {
+                    destino.appendChild(tabelaDetalhe('Chamados por status', ['Status', 'Quantidade'], detalhe.status));
+                }
+                if (detalhe.meses && window.Plotly) {
+                    const partes = detalhe.meses.inicio.split('-').map(Number);
+                    const meses = detalhe.meses.contagens.map(function(_, i) {
+                        const mes = partes[1] - 1 + i;
+                        return (partes[0] + Math.floor(mes / 12)) + '-' + String(mes % 12 + 1).padStart(2, '0');
+                    });
+                    const grafico = document.createElement('div');
+                    destino.appendChild(grafico);
+                    Plotly.newPlot(grafico, [{type: 'bar', x: meses, y: detalhe.meses.contagens, marker: {color: '#e50914'}}],
+                                   {template: TEMPLATE_GRAFICOS, title: {text: 'Chamados por mês'}, height: 350,
+                                    xaxis: {type: 'category'}}, {responsive: true});
+                }
+            }
+            function abrirCategoria(posicao) {
+                if (!indiceDetalhes || !(posicao >= 0 && posicao < indiceDetalhes.categorias.length)) {
+                    return;
+                }
+                const parte = Math.floor(posicao / indiceDetalhes.por_parte);
+                const continuar = function(detalhes) { mostrarDetalhe(detalhes[posicao % indiceDetalhes.por_parte]); };
+                if (partesDetalhes[parte]) {
+                    continuar(partesDetalhes[parte]);
+                } else if (aguardandoPartes[parte]) {
+                    aguardandoPartes[parte].push(continuar);
+                } else {
+                    aguardandoPartes[parte] = [continuar];
+                    avisoDetalhe('Carregando...');
+                    carregarScript(PASTA_DETALHES + '/parte_' + String(parte).padStart(4, '0') + '.js', function() {
+                        delete aguardandoPartes[parte];
+                        avisoDetalhe('Não foi possível carregar o detalhe desta categoria.');
+                    });
+                }
+            }
+            carregarScript(PASTA_DETALHES + '/indice.js', function() {
+                avisoDetalhe('Detalhes não encontrados: a pasta ' + PASTA_DETALHES + ' deve ficar ao lado do dashboard.');
+            });
+            document.getElementById('busca-categoria').addEventListener('change', function(evento) {
+                if (indiceDetalhes && indiceDetalhes.posicoes.has(evento.target.value)) {
+                    abrirCategoria(indiceDetalhes.posicoes.get(evento.target.value));
+                }
+            });
+            document.querySelectorAll('tr[data-posicao]').forEach(function(linha) {
+                linha.addEventListener('click', function() {
+                    abrirCategoria(Number(linha.dataset.posicao));
+                    document.getElementById('detalhes-categorias').scrollIntoView({behavior: 'smooth'});
+                });
+            });
+        </script>
+    """
+
+def _arredondar(valor, casas_decimais):
+    """Arredonda recursivamente os números de ponto flutuante de uma figura serializada"""
+    if isinstance(valor, dict):
+        return {chave: _arredondar(item, casas_decimais) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_arredondar(item, casas_decimais) for item in valor]
+    if isinstance(valor, np.ndarray) and valor.dtype.kind == 'f':
+        return np.round(valor, casas_decimais)
+    if isinstance(valor, float):
+        return round(valor, casas_decimais)
+    return valor
+
+def _figura_compacta(fig, casas_decimais=CASAS_DECIMAIS_GRAFICOS):
+    """Serializa a figura em JSON sem o template padrão (enviado uma única vez) e com números arredondados"""
+    import plotly.io as pio
+    dados = fig.to_plotly_json()
+    dados['layout'].pop('template', None)
+    # "</" fecharia a tag <script> que guarda o JSON
+    return pio.json.to_json_plotly(_arredondar(dados, casas_decimais)).replace('</', '<\\/')
+
+def _html_grafico(fig, div_id):
+    """Gera o contêiner do gráfico e o JSON da figura, desenhada só quando entra na área visível"""
+    if fig is None:
+        return ""
+    return (f'<div id="{div_id}" class="grafico" data-figura="{div_id}-dados"></div>'
+            f'<script type="application/json" id="{div_id}-dados">{_figura_compacta(fig)}</script>')
+
+def _script_plotly(modo_plotly=None):
+    """Carrega o plotly.js uma única vez: embutido (uso offline) ou de uma URL fixa da CDN (padrão: MODO_PLOTLY)"""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+    modo_plotly = modo_plotly or MODO_PLOTLY
+    if modo_plotly == 'inline':
+        return f"<script>{get_plotlyjs()}</script>"
+    return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+
+def _script_graficos():
+    """Script que desenha cada gráfico ao entrar na tela, com o template do Plotly compartilhado"""
+    import plotly.io as pio
+    template = pio.json.to_json_plotly(pio.templates[pio.templates.default]).replace('</', '<\\/')
+    return """
+        <script>
+            const TEMPLATE_GRAFICOS = """ + template + """;
+            function desenharGrafico(div) {
+                const figura = JSON.parse(document.getElementById(div.dataset.figura).textContent);
+                figura.layout.template = TEMPLATE_GRAFICOS;
+                Plotly.newPlot(div, figura.data, figura.layout, {responsive: true});
+            }
+            const graficos = document.querySelectorAll('.grafico[data-figura]');
+            if ('IntersectionObserver' in window) {
+                const observador = new IntersectionObserver(function(entradas) {
+                    entradas.forEach(function(entrada) {
+                        if (entrada.isIntersecting) {
+                            observador.unobserve(entrada.target);
+                            desenharGrafico(entrada.target);
+                        }
+                    });
+                }, {rootMargin: '200px'});
+                graficos.forEach(function(grafico) { observador.observe(grafico); });
+            } else {
+                graficos.forEach(desenharGrafico);
+            }
+        </script>
+    """
+
+@instrumentar
+def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes, graficos, agregados=None, modo_plotly=None,
+                               diretorio_saida=None, abrir_navegador=ABRIR_NAVEGADOR):
     """Cria um dashboard interativo no estilo Netflix para análise de chamados"""
-    total_chamados = len(df)
+    total_chamados = agregados['total'] if agregados is not None else len(df)
+    if agregados is not None:
+        contagem_categorias, df_solucoes = agregados['categorias'], agregados['solucoes']
     total_categorias = len(contagem_categorias) if contagem_categorias is not None else 0
     
     # Preparar dados para tabela de soluções
-    tabela_solucoes_html = ""
     if df_solucoes is not None and coluna_solucao and coluna_solucao in df_solucoes.columns:
-        col_solucao_nome = coluna_solucao
-        top_categorias_dash = df[coluna_categoria].value_counts().nlargest(5).index
-        
-        for categoria in top_categorias_dash:
-            dados_categoria = df_solucoes[df_solucoes[coluna_categoria] == categoria].nlargest(5, 'Contagem')
-            if not dados_categoria.empty:
-                tabela_solucoes_html += f"<h4>Problema: {categoria}</h4>"
-                tabela_solucoes_html += "<table><thead><tr><th>Solução Apresentada</th><th>Quantidade</th></tr></thead><tbody>"
-                for _, row in dados_categoria.iterrows():
-                    solucao_truncada = row[col_solucao_nome][:100] + "..." if len(str(row[col_solucao_nome])) > 100 else row[col_solucao_nome]
-                    tabela_solucoes_html += f"<tr><td>{solucao_truncada}</td><td>{row['Contagem']}</td></tr>"
-                tabela_solucoes_html += "</tbody></table><br>"
+        top_solucoes = agregados.get('top_solucoes') if agregados is not None else None
+        if top_solucoes is None:
+            top_solucoes = top_solucoes_por_categoria(df_solucoes, contagem_categorias, coluna_categoria)
+        tabela_solucoes_html = renderizar_tabela_solucoes(top_solucoes, coluna_categoria, coluna_solucao)
     else:
         tabela_solucoes_html = "<p>Não foi possível gerar a análise de soluções por categoria.</p>"
 
-    # Converter gráficos para HTML
-    grafico_categorias_html = graficos['categorias'].to_html(include_plotlyjs='cdn', div_id="categoria-chart")
-    grafico_pizza_html = graficos['pizza'].to_html(include_plotlyjs=False, div_id="pizza-chart")
-    
-    grafico_temporal_html = ""
-    if graficos['temporal']:
-        grafico_temporal_html = graficos['temporal'].to_html(include_plotlyjs=False, div_id="temporal-chart")
-    
-    grafico_dia_semana_html = ""
-    if graficos['dia_semana']:
-        grafico_dia_semana_html = graficos['dia_semana'].to_html(include_plotlyjs=False, div_id="dia-semana-chart")
-    
-    grafico_hora_html = ""
-    if graficos['hora']:
-        grafico_hora_html = graficos['hora'].to_html(include_plotlyjs=False, div_id="hora-chart")
-    
-    grafico_status_html = ""
-    if graficos['status']:
-        grafico_status_html = graficos['status'].to_html(include_plotlyjs=False, div_id="status-chart")
-    
-    grafico_heatmap_html = ""
-    if graficos['heatmap']:
-        grafico_heatmap_html = graficos['heatmap'].to_html(include_plotlyjs=False, div_id="heatmap-chart")
+    # Converter gráficos em JSON compacto; cada um só é desenhado quando aparece na tela
+    grafico_categorias_html = _html_grafico(graficos['categorias'], "categoria-chart")
+    grafico_pizza_html = _html_grafico(graficos['pizza'], "pizza-chart")
+    grafico_temporal_html = _html_grafico(graficos['temporal'], "temporal-chart")
+    grafico_dia_semana_html = _html_grafico(graficos['dia_semana'], "dia-semana-chart")
+    grafico_hora_html = _html_grafico(graficos['hora'], "hora-chart")
+    grafico_status_html = _html_grafico(graficos['status'], "status-chart")
+    grafico_heatmap_html = _html_grafico(graficos['heatmap'], "heatmap-chart")
+    grafico_tendencias_html = _html_grafico(graficos.get('tendencias'), "tendencias-chart")
+    tabela_tendencias_html = renderizar_tabela_tendencias(agregados.get('tendencias') if agregados is not None else None)
+
+    # Detalhe de todas as categorias, fora do HTML: só a parte da categoria aberta é carregada
+    detalhes_html = "<p>Detalhes por categoria não disponíveis</p>"
+    if agregados is not None:
+        try:
+            exportar_detalhes_categorias(indice_detalhes_categorias(agregados, coluna_categoria, coluna_solucao),
+                                         diretorio_saida)
+            detalhes_html = ('<input id="busca-categoria" class="filter-item" list="lista-categorias" '
+                             'placeholder="Buscar categoria..." autocomplete="off">'
+                             '<datalist id="lista-categorias"></datalist>'
+                             '<div id="detalhe-categoria"><p>Escolha uma categoria na busca ou clique em uma linha '
+                             'da tabela de categorias.</p></div>')
+        except Exception as e:
+            print(f"⚠️ Não foi possível gravar os detalhes por categoria: {e}")
 
     html_content = f"""
     <!DOCTYPE html>
@@ -397,7 +2857,6 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Dashboard de Chamados</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
         <style>
             :root {{
                 --netflix-red: #e50914;
@@ -506,6 +2965,10 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
                 box-shadow: 0 4px 12px rgba(0,0,0,0.5); 
             }}
             
+            .grafico {{
+                min-height: 450px;
+            }}
+            
             .chart-title {{
                 font-size: 1.2rem;
                 margin-bottom: 15px;
@@ -532,6 +2995,16 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
             tr:hover {{ 
                 background-color: var(--netflix-gray); 
             }}
+
+            tr[data-posicao] {{
+                cursor: pointer;
+            }}
+
+            #busca-categoria {{
+                width: 100%;
+                max-width: 500px;
+                cursor: text;
+            }}
             
             h1 {{ 
                 text-align: center; 
@@ -632,6 +3105,13 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
                 <div class="chart-title">Heatmap: Chamados por Dia da Semana e Hora</div>
                 {grafico_heatmap_html if grafico_heatmap_html else "<p>Dados insuficientes para heatmap</p>"}
             </div>
+
+            <h2 class="section-title">Tendências e Categorias em Alta</h2>
+            <div class="chart-container">
+                <div class="chart-title">Categorias com z-score acima de {LIMIAR_Z_TENDENCIA:g} no último período</div>
+                {tabela_tendencias_html}
+                {grafico_tendencias_html}
+            </div>
             
             <h2 class="section-title">Análise de Soluções por Problema</h2>
             <div class="chart-container">
@@ -639,17 +3119,19 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
                 {tabela_solucoes_html}
             </div>
 
+            <h2 class="section-title" id="detalhes-categorias">Detalhes por Categoria</h2>
+            <div class="chart-container">
+                <div class="chart-title">Soluções, evolução mensal e status de cada uma das {total_categorias} categorias</div>
+                {detalhes_html}
+            </div>
+
             <h2 class="section-title">Top 20 Categorias de Problemas (Geral)</h2>
             <div class="chart-container">
                 <table>
                     <thead><tr><th>Categoria</th><th>Quantidade</th><th>Percentual</th></tr></thead>
                     <tbody>
     """
-    if contagem_categorias is not None:
-        for categoria, quantidade in contagem_categorias.head(20).items():
-            percentual = (quantidade / total_chamados) * 100
-            # CORREÇÃO: trocar 'quantitude' por 'quantidade'
-            html_content += f"<tr><td>{categoria}</td><td>{quantidade}</td><td>{percentual:.1f}%</td></tr>"
+    html_content += renderizar_tabela_categorias(contagem_categorias, total_chamados)
     html_content += """
                     </tbody>
                 </table>
@@ -669,85 +3151,543 @@ def criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data
                 // Em uma implementação real, os gráficos seriam redimensionados
             }});
         </script>
+    """
+    html_content += _script_plotly(modo_plotly) + _script_graficos()
+    if agregados is not None and 'busca-categoria' in detalhes_html:
+        html_content += _script_detalhes()
+    html_content += """
     </body>
     </html>
     """
     
-    dashboard_path = out_dir / "dashboard_interativo_chamados.html"
+    dashboard_path = Path(diretorio_saida or out_dir) / "dashboard_interativo_chamados.html"
     with open(dashboard_path, 'w', encoding='utf-8') as f:
         f.write(html_content)
     print(f"\n✅ Dashboard interativo salvo em: {dashboard_path}")
+    if not abrir_navegador:
+        return dashboard_path
     try:
+        import webbrowser
         webbrowser.open(str(dashboard_path))
     except Exception as e:
         print(f"ℹ️ Não foi possível abrar o navegador. Abra manualmente o arquivo: {dashboard_path}")
     return dashboard_path
 
-def exportar_analises(contagem_categorias, df_solucoes):
-    """Exporta estatísticas gerais e por categoria para um único arquivo Excel com abas."""
-    excel_path = out_dir / "analise_completa_chamados.xlsx"
-    try:
-        with pd.ExcelWriter(excel_path, engine='xlsxwriter') as writer:
-            # Aba 1: Estatísticas Gerais
-            if contagem_categorias is not None:
-                df_estatisticas = pd.DataFrame({
-                    'Categoria': contagem_categorias.index,
-                    'Quantidade': contagem_categorias.values,
-                    'Percentual': (contagem_categorias.values / contagem_categorias.sum() * 100).round(2)
-                })
-                df_estatisticas.to_excel(writer, sheet_name='Geral_Por_Categoria', index=False)
-
-            # Aba 2: Soluções por Categoria
-            if df_solucoes is not None:
-                df_solucoes.to_excel(writer, sheet_name='Solucoes_Por_Categoria', index=False)
-
-        print(f"✅ Análises exportadas para: {excel_path}")
-        return excel_path
-    except Exception as e:
-        print(f"❌ Erro ao exportar análises para Excel: {e}")
-        return None
+def tabelas_exportacao(contagem_categorias, df_solucoes, agregados=None):
+    """Tabelas exportadas ({aba: DataFrame}): categorias, soluções e, com os agregados, os recortes temporais e de status"""
+    tabelas = {}
+    if contagem_categorias is not None:
+        tabelas['Geral_Por_Categoria'] = pd.DataFrame({
+            'Categoria': contagem_categorias.index,
+            'Quantidade': contagem_categorias.values,
+            'Percentual': (contagem_categorias.values / contagem_categorias.sum() * 100).round(2)
+        })
+    if df_solucoes is not None:
+        tabelas['Solucoes_Por_Categoria'] = df_solucoes
+    if agregados is None:
+        return tabelas
+    # Os mesmos recortes dos gráficos do dashboard, já calculados nos agregados
+    if agregados['ano_mes'] is not None:
+        tabelas['Evolucao_Mensal'] = agregados['ano_mes'].sort_index().reset_index(name='Quantidade')
+    if agregados['dia_semana'] is not None:
+        dias = agregados['dia_semana'].reindex(range(7), fill_value=0)
+        tabelas['Por_Dia_Semana'] = pd.DataFrame({'Dia_Semana': DIAS_SEMANA, 'Quantidade': dias.values})
+    if agregados['hora'] is not None:
+        tabelas['Por_Hora'] = agregados['hora'].sort_index().reset_index(name='Quantidade')
+    if agregados['dia_hora'] is not None:
+        matriz = agregados['dia_hora'].unstack(fill_value=0).reindex(index=range(7), columns=range(24), fill_value=0)
+        matriz.index = pd.Index(DIAS_SEMANA, name='Dia_Semana')
+        tabelas['Dia_Semana_Hora'] = matriz.reset_index()
+    if agregados['status'] is not None:
+        status = _ordenar_contagem(agregados['status'])
+        tabelas['Por_Status'] = pd.DataFrame({
+            'Status': status.index,
+            'Quantidade': status.values,
+            'Percentual': (status.values / status.sum() * 100).round(2)
+        })
+    sla = agregados.get('sla')  # estados incrementais antigos não têm a chave
+    if sla is not None:
+        tabelas['SLA_Por_Categoria'] = sla['categoria']
+        if sla['status'] is not None:
+            tabelas['SLA_Por_Status'] = sla['status']
+    if agregados.get('tendencias') is not None:
+        tabelas['Tendencias'] = alertas_tendencias(agregados['tendencias'])
+    return tabelas
 
-# Executar a análise completa
-if __name__ == "__main__":
-    print("🔍 Iniciando análise de chamados...")
-    print("=" * 50)
+def _escrever_aba_excel(workbook, nome, tabela, formato_cabecalho, linhas_max=LINHAS_MAX_ABA_EXCEL, coluna_destaque=None,
+                        formato_destaque=None, linhas_por_lote=LINHAS_POR_LOTE_EXCEL):
+    """Escreve a tabela linha a linha (ordem exigida pelo constant_memory), dividindo-a em abas nome, nome_2, ...
+
+    Com coluna_destaque (booleana), as linhas verdadeiras recebem formato_destaque por formatação condicional.
+    """
+    cabecalho = [str(coluna) for coluna in tabela.columns]
+    abas = []
+    for inicio in range(0, max(len(tabela), 1), linhas_max):
+        aba = nome if inicio == 0 else f"{nome}_{len(abas) + 1}"
+        planilha = workbook.add_worksheet(aba)
+        planilha.write_row(0, 0, cabecalho, formato_cabecalho)
+        fim = min(inicio + linhas_max, len(tabela))
+        for lote_inicio in range(inicio, fim, linhas_por_lote):
+            # Só um lote por vez vira tipos nativos, com nulos vazios como no to_excel do pandas
+            lote = tabela.iloc[lote_inicio:min(lote_inicio + linhas_por_lote, fim)].astype(object)
+            lote = lote.where(lote.notna(), None)
+            for linha, valores in enumerate(lote.itertuples(index=False, name=None), lote_inicio - inicio + 1):
+                planilha.write_row(linha, 0, valores)
+        if coluna_destaque is not None and fim > inicio:
+            from xlsxwriter.utility import xl_col_to_name
+            letra = xl_col_to_name(tabela.columns.get_loc(coluna_destaque))
+            planilha.conditional_format(1, 0, fim - inicio, len(cabecalho) - 1,
+                                        {'type': 'formula', 'criteria': f'=${letra}2=TRUE', 'format': formato_destaque})
+        abas.append(aba)
+    if len(abas) > 1:
+        print(f"⚠️ '{nome}' tem {len(tabela):,} linhas, acima do limite do Excel: dividida nas abas {', '.join(abas)}")
+    return abas
+
+def _exportar_tabela_extra(tabela, caminho, formato):
+    """Grava a tabela completa em CSV compactado ou Parquet, ao lado do Excel"""
+    if formato == 'csv.gz':
+        tabela.to_csv(caminho, index=False, compression='gzip')
+    elif formato == 'parquet':
+        tabela.rename(columns=str).to_parquet(caminho, index=False)
+    else:
+        raise ValueError(f"Formato de tabela desconhecido: {formato!r} (use 'csv.gz' ou 'parquet')")
+    return caminho
+
+@instrumentar
+def exportar_analises(contagem_categorias, df_solucoes, agregados=None, diretorio_saida=None,
+                      formatos=FORMATOS_EXPORTACAO, memoria_constante=EXCEL_MEMORIA_CONSTANTE):
+    """Exporta estatísticas gerais, por categoria, temporais e de status para um único arquivo Excel com abas."""
+    if agregados is not None:
+        contagem_categorias, df_solucoes = agregados['categorias'], agregados['solucoes']
+    pasta = Path(diretorio_saida or out_dir)
+    tabelas = tabelas_exportacao(contagem_categorias, df_solucoes, agregados)
+    excel_path = None
+    if 'xlsx' in formatos:
+        excel_path = pasta / "analise_completa_chamados.xlsx"
+        try:
+            import xlsxwriter
+            workbook = xlsxwriter.Workbook(str(excel_path), {'constant_memory': memoria_constante})
+            try:
+                # Mesmo estilo de cabeçalho do to_excel do pandas
+                formato_cabecalho = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+                formato_destaque = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
+                for nome, tabela in tabelas.items():
+                    coluna_destaque = 'Em_Alta' if 'Em_Alta' in tabela.columns else None
+                    _escrever_aba_excel(workbook, nome, tabela, formato_cabecalho, coluna_destaque=coluna_destaque,
+                                        formato_destaque=formato_destaque)
+            finally:
+                workbook.close()
+            print(f"✅ Análises exportadas para: {excel_path}")
+        except Exception as e:
+            # Sem o Excel (ex.: xlsxwriter ausente), os demais formatos pedidos ainda são gravados
+            print(f"❌ Erro ao exportar análises para Excel: {e}")
+            excel_path = None
+
+    exportadas = False
+    for formato in formatos:
+        if formato == 'xlsx':
+            continue
+        try:
+            for nome, tabela in tabelas.items():
+                _exportar_tabela_extra(tabela, pasta / f"analise_{nome.lower()}.{formato}", formato)
+            print(f"✅ Tabelas completas em {formato} exportadas para: {pasta}")
+            exportadas = True
+        except Exception as e:
+            print(f"⚠️ Não foi possível exportar as tabelas em {formato}: {e}")
+    return excel_path or (pasta if exportadas else None)
+
+def executar_em_paralelo(tarefas, max_tarefas=MAX_TAREFAS_PARALELAS, processos=False, inicializador=None):
+    """Executa tarefas independentes ({nome: função sem argumentos}) numa pool, medindo o tempo de cada uma"""
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    def cronometrada(funcao):
+        inicio = time.perf_counter()
+        try:
+            return {'resultado': funcao(), 'erro': None, 'tempo': time.perf_counter() - inicio}
+        except Exception as e:
+            return {'resultado': None, 'erro': e, 'tempo': time.perf_counter() - inicio}
+
+    resultados = {}
+    if processos:
+        # Em processos a função precisa ser serializável (partial de funções do módulo); o tempo inclui a espera na fila.
+        # O inicializador repassa aos processos a configuração feita em tempo de execução (caminhos, papéis)
+        with ProcessPoolExecutor(max_workers=max_tarefas, initializer=inicializador) as pool:
+            futuros = {nome: (pool.submit(funcao), time.perf_counter()) for nome, funcao in tarefas.items()}
+            for nome, (futuro, inicio) in futuros.items():
+                try:
+                    resultados[nome] = {'resultado': futuro.result(), 'erro': None, 'tempo': time.perf_counter() - inicio}
+                except Exception as e:
+                    resultados[nome] = {'resultado': None, 'erro': e, 'tempo': time.perf_counter() - inicio}
+    else:
+        with ThreadPoolExecutor(max_workers=max_tarefas) as pool:
+            futuros = {nome: pool.submit(cronometrada, funcao) for nome, funcao in tarefas.items()}
+            resultados = {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    # Uma saída com erro (ex.: xlsxwriter ausente) não impede as demais de serem concluídas
+    for nome, resultado in resultados.items():
+        if resultado['erro'] is not None:
+            print(f"❌ Etapa '{nome}' falhou após {resultado['tempo']:.2f}s: {resultado['erro']}")
+        else:
+            print(f"⏱️ Etapa '{nome}' concluída em {resultado['tempo']:.2f}s")
+    return resultados
+
+def _gerar_dashboard(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias,
+                     df_solucoes_agrupadas, agregados=None, diretorio_saida=None, abrir_navegador=ABRIR_NAVEGADOR,
+                     modo_plotly=None):
+    """Cria os gráficos interativos e, em seguida, o dashboard que os contém"""
+    print("\n📊 Criando gráficos interativos...")
+    graficos = criar_graficos_interativos(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes_agrupadas, agregados)
+    print("\n🎨 Criando dashboard interativo...")
+    return criar_dashboard_interativo(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias,
+                                      df_solucoes_agrupadas, graficos, agregados, modo_plotly=modo_plotly,
+                                      diretorio_saida=diretorio_saida, abrir_navegador=abrir_navegador)
+
+def gerar_saidas(df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes_agrupadas, agregados=None,
+                 diretorio_saida=None, abrir_navegador=ABRIR_NAVEGADOR, etapas=ETAPAS_SAIDA, formatos=FORMATOS_EXPORTACAO):
+    """Gera os gráficos, o dashboard e a planilha de análises a partir dos resultados"""
+    # Dashboard (gráficos + HTML) e Excel não dependem um do outro: rodam ao mesmo tempo
+    tarefas = {
+        'dashboard': partial(_gerar_dashboard, df, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias,
+                             df_solucoes_agrupadas, agregados, diretorio_saida, abrir_navegador),
+        'excel': partial(exportar_analises, contagem_categorias, df_solucoes_agrupadas, agregados, diretorio_saida, formatos),
+    }
+    tarefas = {nome: tarefa for nome, tarefa in tarefas.items() if nome in etapas}
+    if len(tarefas) > 1:
+        print("\n🚀 Gerando dashboard e planilha de análises em paralelo...")
+    resultados = executar_em_paralelo(tarefas, max_tarefas=1 if PERFILAR_ETAPAS else MAX_TAREFAS_PARALELAS)  # cProfile só perfila uma thread por vez
+    dashboard_path, excel_path = (resultados.get(nome, {}).get('resultado') for nome in ('dashboard', 'excel'))
     
-    df = carregar_dados()
+    total_chamados = agregados['total'] if agregados is not None else len(df)
+    print(f"\n🎉 Análise concluída com sucesso!")
+    if dashboard_path:
+        print(f"📊 Dashboard interativo: {dashboard_path}")
+    if excel_path:
+        print(f"📋 Planilha com análises: {excel_path}")
     
-    if df is not None:
-        df_clean, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias = analise_chamados(df)
-        
-        # Encontrar a coluna de solução e rodar a análise agrupada
-        if coluna_solucao:
-            print(f"📋 Coluna de solução identificada: '{coluna_solucao}'")
-            df_solucoes_agrupadas = analisar_solucoes_por_categoria(df_clean, coluna_categoria, coluna_solucao)
+    print(f"\n📈 RESUMO FINAL:")
+    print(f"   • Total de chamados: {total_chamados}")
+    print(f"   • Categorias diferentes: {len(contagem_categorias)}")
+    print(f"   • Categoria mais frequente: '{contagem_categorias.index[0]}' ({contagem_categorias.values[0]} chamados)")
+    if agregados is not None and agregados.get('tendencias') is not None:
+        alertas = alertas_tendencias(agregados['tendencias'])
+        em_alta = alertas.loc[alertas['Em_Alta'], ['Periodo', 'Categoria', 'Z_Score']]
+        print(f"   • Categorias em alta (z ≥ {LIMIAR_Z_TENDENCIA:g}): " + (', '.join(
+            f"'{categoria}' ({periodo.lower()}, z {z:.1f})" for periodo, categoria, z in em_alta.itertuples(index=False))
+            or "nenhuma"))
+    salvar_relatorio_etapas(diretorio_saida)
+    return dashboard_path, excel_path
+
+def processar_planilha(caminho=None, diretorio_saida=None, abrir_navegador=ABRIR_NAVEGADOR, etapas=ETAPAS_SAIDA,
+                       formatos=FORMATOS_EXPORTACAO):
+    """Executa o fluxo completo (carga, análise e saídas) para uma planilha"""
+    reiniciar_medicoes()
+    # Todas as contagens saem do cubo: construído uma vez por versão da planilha e reaproveitado nas execuções seguintes
+    cubo = obter_cubo(caminho, usar_cache=USAR_CUBO)
+    if cubo is None:
+        print("❌ Análise interrompida. Não foi possível carregar os dados ou identificar a coluna de categoria.")
+        return None
+    diretorio_saida = _pasta_saida(diretorio_saida, caminho)
+    colunas = cubo['colunas']
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status = (
+        colunas['categoria'], colunas['solucao'], colunas['data'], colunas['status'])
+    # Tabelas derivadas do cubo (contagens, soluções, séries temporais): reaproveitadas enquanto cubo e cortes não mudam
+    cortes = (TOP_SOLUCOES_CONSOLE, TOP_SOLUCOES_DASHBOARD, TOP_CATEGORIAS_SOLUCOES)
+    agregados = memorizar_etapa(
+        'agregados', (cubo.get('chave_resultados'), cortes),
+        lambda: finalizar_agregados(agregados_do_cubo(cubo), coluna_categoria, coluna_solucao),
+        usar_cache=cubo.get('chave_resultados') is not None)
+
+    # Encontrar a coluna de solução e rodar a análise agrupada
+    if coluna_solucao:
+        print(f"📋 Coluna de solução identificada: '{coluna_solucao}'")
+        df_solucoes_agrupadas = analisar_solucoes_por_categoria(None, coluna_categoria, coluna_solucao, agregados)
+    else:
+        print("❌ Não foi possível identificar uma coluna de solução.")
+        df_solucoes_agrupadas = None
+
+    return gerar_saidas(None, coluna_categoria, coluna_solucao, coluna_data, coluna_status, agregados['categorias'],
+                        df_solucoes_agrupadas, agregados, diretorio_saida, abrir_navegador, etapas, formatos)
+
+def _pasta_saida(diretorio_saida=None, caminho=None):
+    """Pasta das saídas: a informada, a configurada ou, sem nenhuma delas, a pasta da (primeira) planilha"""
+    if diretorio_saida or out_dir:
+        return Path(diretorio_saida or out_dir)
+    return caminhos_planilhas(caminho)[0].parent
+
+def _pastas_por_planilha(caminhos, base):
+    """Pasta de saída de cada planilha ({nome: (caminho, pasta)}), uma subpasta por nome de arquivo"""
+    pastas = {}
+    for caminho in caminhos:
+        nome = Path(caminho).stem
+        if nome in pastas:
+            nome = f"{nome}_{len(pastas) + 1}"
+        pastas[nome] = (caminho, Path(base) / nome)
+    return pastas
+
+def processar_planilhas_em_paralelo(caminhos, diretorio_saida=None, max_tarefas=MAX_TAREFAS_PARALELAS,
+                                    etapas=ETAPAS_SAIDA, formatos=FORMATOS_EXPORTACAO):
+    """Processa várias planilhas (uma por equipe) em processos separados, cada uma com sua própria pasta de saída"""
+    tarefas = {}
+    for nome, (caminho, pasta) in _pastas_por_planilha(caminhos, _pasta_saida(diretorio_saida, caminhos)).items():
+        pasta.mkdir(parents=True, exist_ok=True)
+        tarefas[nome] = partial(processar_planilha, caminho, pasta, False, etapas, formatos)
+
+    print(f"🚀 Processando {len(tarefas)} planilhas em paralelo...")
+    inicializador = partial(configurar_execucao, path, out_dir, cache_dir, dict(PAPEIS_FORCADOS), ABAS_PLANILHA, USAR_CACHE,
+                            AGRUPAR_SOLUCOES_SIMILARES, ATUALIZAR_CACHE, BACKEND_AGREGACAO, PERSISTIR_PAPEIS,
+                            MODO_PLOTLY)
+    resultados = executar_em_paralelo(tarefas, max_tarefas, processos=True, inicializador=inicializador)
+    for nome, resultado in resultados.items():
+        if resultado['resultado']:
+            dashboard_path, excel_path = resultado['resultado']
+            print(f"   • {nome}: {dashboard_path or '-'} | {excel_path or '-'}")
         else:
-            print("❌ Não foi possível identificar uma coluna de solução.")
-            df_solucoes_agrupadas = None
+            print(f"   • {nome}: sem saídas")
+    return resultados
 
-        if coluna_categoria and contagem_categorias is not None:
-            # Criar gráficos interativos
-            print("\n📊 Criando gráficos interativos...")
-            graficos = criar_graficos_interativos(df_clean, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes_agrupadas)
-            
-            # Criar dashboard interativo
-            print("\n🎨 Criando dashboard interativo...")
-            dashboard_path = criar_dashboard_interativo(df_clean, coluna_categoria, coluna_solucao, coluna_data, coluna_status, contagem_categorias, df_solucoes_agrupadas, graficos)
-            
-            # Exportar análises para Excel
-            print("\n💾 Exportando análises para Excel...")
-            excel_path = exportar_analises(contagem_categorias, df_solucoes_agrupadas)
-            
-            print(f"\n🎉 Análise concluída com sucesso!")
-            print(f"📊 Dashboard interativo: {dashboard_path}")
-            if excel_path:
-                print(f"📋 Planilha com análises: {excel_path}")
-            
-            print(f"\n📈 RESUMO FINAL:")
-            print(f"   • Total de chamados: {len(df_clean)}")
-            print(f"   • Categorias diferentes: {len(contagem_categorias)}")
-            print(f"   • Categoria mais frequente: '{contagem_categorias.index[0]}' ({contagem_categorias.values[0]} chamados)")
+def processar_planilha_em_blocos(caminho=None, incremental=False, reconstruir=False, diretorio_saida=None,
+                                 abrir_navegador=ABRIR_NAVEGADOR, etapas=ETAPAS_SAIDA, formatos=FORMATOS_EXPORTACAO):
+    """Executa o fluxo lendo a planilha em blocos (streaming ou incremental) e gera as saídas dos agregados"""
+    reiniciar_medicoes()
+    if incremental:
+        caminho_estado = Path(diretorio_saida) / ARQUIVO_ESTADO if diretorio_saida else None
+        resultado = analise_chamados_incremental(caminho, reconstruir=reconstruir, caminho_estado=caminho_estado)
+    else:
+        resultado = analise_chamados_streaming(caminho)
+    if resultado is None:
+        print("❌ Análise interrompida. Não foi possível carregar os dados.")
+        return None
+    diretorio_saida = _pasta_saida(diretorio_saida, caminho)
+    coluna_categoria, coluna_solucao, coluna_data, coluna_status, agregados = resultado
+    return gerar_saidas(None, coluna_categoria, coluna_solucao, coluna_data, coluna_status, agregados['categorias'],
+                        agregados['solucoes'], agregados, diretorio_saida, abrir_navegador, etapas, formatos)
+
+def configurar_execucao(caminho=None, diretorio_saida=None, diretorio_cache=None, papeis=None, abas=None,
+                        usar_cache=True, agrupar_solucoes=AGRUPAR_SOLUCOES_SIMILARES, atualizar_cache=False,
+                        backend=None, persistir_papeis=None, modo_plotly=None):
+    """Aponta a planilha padrão, a pasta de saída, o cache, os papéis forçados e as abas lidas (linha de comando e processos filhos)"""
+    global path, out_dir, cache_dir, estado_path, ABAS_PLANILHA, USAR_CACHE, AGRUPAR_SOLUCOES_SIMILARES, ATUALIZAR_CACHE
+    global BACKEND_AGREGACAO, PERSISTIR_PAPEIS, MODO_PLOTLY
+    if caminho:
+        path = Path(caminho)
+        out_dir = path.parent
+    if diretorio_saida:
+        out_dir = Path(diretorio_saida)
+    cache_dir = Path(diretorio_cache) if diretorio_cache else (out_dir / "cache_chamados" if out_dir else None)
+    estado_path = out_dir / ARQUIVO_ESTADO if out_dir else None
+    PERSISTIR_PAPEIS = bool(diretorio_cache) if persistir_papeis is None else persistir_papeis
+    PAPEIS_FORCADOS.clear()
+    PAPEIS_FORCADOS.update(papeis or {})
+    ABAS_PLANILHA = list(abas) if abas else None
+    USAR_CACHE = usar_cache
+    AGRUPAR_SOLUCOES_SIMILARES = agrupar_solucoes
+    ATUALIZAR_CACHE = atualizar_cache
+    if backend:
+        BACKEND_AGREGACAO = backend
+    if modo_plotly:
+        MODO_PLOTLY = modo_plotly
+
+def configurar_exibicao():
+    """Opções de exibição do pandas no console, aplicadas ao rodar o script e não na importação do módulo"""
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', 1000)
+    pd.set_option('display.max_rows', 100)
+
+def expandir_planilhas(padroes):
+    """Caminhos das planilhas a partir de caminhos, pastas ou padrões glob, na ordem dada e sem repetições"""
+    import glob
+    caminhos = []
+    for padrao in padroes:
+        if any(caractere in padrao for caractere in '*?['):
+            caminhos.extend(Path(c) for c in sorted(glob.glob(padrao, recursive=True)))
+        elif Path(padrao).is_dir():
+            # Arquivos temporários do Excel ("~$...") ficam de fora
+            caminhos.extend(c for c in sorted(Path(padrao).iterdir())
+                            if c.suffix.lower() in EXTENSOES_PLANILHA and not c.name.startswith('~$'))
         else:
-            print("❌ Não foi possível realizar a análise de categorias")
+            caminhos.append(Path(padrao))
+    return list(dict.fromkeys(caminhos))
+
+def main(argv=None):
+    """Linha de comando: analisa uma ou mais planilhas e grava as saídas escolhidas; retorna o código de saída"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Análise de chamados do suporte: dashboard interativo e planilha de análises")
+    parser.add_argument('planilhas', nargs='*',
+                        help="caminhos, pastas ou padrões glob (ex.: 'dados/*.xlsx'); padrão: $ANALISE_CHAMADOS_PLANILHA")
+    parser.add_argument('--consolidar', action='store_true',
+                        help="analisa todas as planilhas como um único conjunto (ex.: uma pasta de trabalho por mês), "
+                             "em vez de uma análise por planilha")
+    parser.add_argument('--abas', nargs='+', metavar='ABA', default=ABAS_PLANILHA,
+                        help="abas lidas de cada pasta de trabalho (padrão: todas as abas com colunas de chamados)")
+    parser.add_argument('-o', '--saida', type=Path, help="pasta de saída (padrão: a pasta da planilha)")
+    parser.add_argument('--cache', type=Path, help="pasta de cache (padrão: cache_chamados dentro da pasta de saída)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="não lê nem grava cache (planilha, papéis das colunas, cubo e resultados das etapas)")
+    parser.add_argument('--atualizar-cache', action='store_true',
+                        help="ignora o cache existente: relê o Excel e recalcula cubo e resultados, regravando o cache")
+    parser.add_argument('--backend', choices=BACKENDS_AGREGACAO, default=BACKEND_AGREGACAO,
+                        help="motor das contagens por combinação (duckdb: multithread e com despejo em disco)")
+    parser.add_argument('--plotly', choices=MODOS_PLOTLY, default=MODO_PLOTLY,
+                        help="plotly.js do dashboard: da CDN (arquivo leve) ou embutido no HTML (abre sem internet)")
+    parser.add_argument('--formatos', nargs='+', choices=['xlsx', 'csv.gz', 'parquet'], default=list(FORMATOS_EXPORTACAO),
+                        help="formatos das tabelas de análise")
+    parser.add_argument('--agrupar-solucoes', action='store_true', default=AGRUPAR_SOLUCOES_SIMILARES,
+                        help="agrupa soluções quase iguais antes de contar (reescreve os textos nas saídas)")
+    parser.add_argument('--apenas', nargs='+', choices=ETAPAS_SAIDA, default=list(ETAPAS_SAIDA),
+                        help="gera só estas saídas")
+    for papel in (*PALAVRAS_CHAVE_PAPEIS, 'fechamento'):
+        parser.add_argument(f'--coluna-{papel}', metavar='COLUNA', help=f"coluna de {papel}, no lugar da detecção automática")
+    parser.add_argument('--sem-navegador', action='store_true', help="não abre o dashboard no navegador (execução sem tela)")
+    modos = parser.add_mutually_exclusive_group()
+    modos.add_argument('--streaming', action='store_true', default=MODO_STREAMING, help="lê a planilha em blocos")
+    modos.add_argument('--incremental', action='store_true', default=MODO_INCREMENTAL,
+                       help="processa só as linhas novas desde a última execução")
+    parser.add_argument('--reconstruir-estado', action='store_true', default=RECONSTRUIR_ESTADO,
+                        help="descarta o estado incremental e reprocessa todas as linhas")
+    parser.add_argument('--max-tarefas', type=int, default=MAX_TAREFAS_PARALELAS,
+                        help="planilhas processadas ao mesmo tempo")
+    args = parser.parse_args(argv)
+    if args.consolidar and (args.streaming or args.incremental):
+        parser.error("--consolidar não se aplica à leitura em blocos (--streaming/--incremental)")
+
+    if args.planilhas:
+        caminhos = expandir_planilhas(args.planilhas)
+        if not caminhos:
+            print(f"❌ Nenhuma planilha encontrada para: {' '.join(args.planilhas)}")
+            return 2
     else:
-        print("❌ Análise interrompida. Não foi possível carregar os dados.")
\ No newline at end of file
+        caminhos = [Path(c) for c in PLANILHAS_EQUIPES] or ([path] if path else [])
+        if not caminhos:
+            parser.error("informe a planilha a analisar (argumento ou variável de ambiente ANALISE_CHAMADOS_PLANILHA)")
+    papeis = {papel: getattr(args, f'coluna_{papel}') for papel in (*PALAVRAS_CHAVE_PAPEIS, 'fechamento')
+              if getattr(args, f'coluna_{papel}')}
+    configurar_execucao(caminhos[0], args.saida, args.cache, papeis, args.abas, not args.sem_cache,
+                        args.agrupar_solucoes, args.atualizar_cache, args.backend, modo_plotly=args.plotly)
+    configurar_exibicao()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    abrir_navegador = ABRIR_NAVEGADOR and not args.sem_navegador
+    opcoes = {'etapas': tuple(args.apenas), 'formatos': tuple(args.formatos)}
+
+    print("🔍 Iniciando análise de chamados...")
+    print("=" * 50)
+    if args.streaming or args.incremental:
+        if len(caminhos) == 1:
+            pastas = {caminhos[0].stem: (caminhos[0], out_dir)}
+        else:
+            pastas = _pastas_por_planilha(caminhos, out_dir)
+            for _, pasta in pastas.values():
+                pasta.mkdir(parents=True, exist_ok=True)
+        resultados = [processar_planilha_em_blocos(caminho, args.incremental, args.reconstruir_estado, pasta,
+                                                   abrir_navegador and len(caminhos) == 1, **opcoes)
+                      for caminho, pasta in pastas.values()]
+    elif args.consolidar:
+        resultados = [processar_planilha(caminhos, out_dir, abrir_navegador, **opcoes)]
+    elif len(caminhos) > 1:
+        resultados = [r['resultado'] for r in processar_planilhas_em_paralelo(caminhos, out_dir, args.max_tarefas,
+                                                                                **opcoes).values()]
+    else:
+        resultados = [processar_planilha(caminhos[0], out_dir, abrir_navegador, **opcoes)]
+    return 0 if all(resultado is not None for resultado in resultados) else 1
+
+def _executando_no_streamlit():
+    """Indica se o módulo está sendo executado por `streamlit run`; a linha de comando não chega a importar o streamlit"""
+    if 'streamlit' not in sys.modules:
+        return False
+    from streamlit.runtime import exists
+    return exists()
+
+def _impressao_por_estado(caminho, mtime_ns, tamanho):
+    """Impressão digital da planilha; mtime e tamanho entram só na chave do cache do Streamlit"""
+    return impressao_digital_planilha(caminho)
+
+def _cubo_da_planilha(caminho, impressao):
+    """Cubo do app, do disco ou construído a partir das linhas (a impressão digital é a chave do cache)"""
+    return obter_cubo(caminho, usar_cache=USAR_CUBO, chave=impressao)
+
+def _agregados_filtrados(_cubo, impressao, inicio=None, fim=None, categorias=None, status=None):
+    """Agregados finalizados do cubo para um filtro; o Streamlit não faz hash de `_cubo`, só da impressão e dos filtros"""
+    colunas = _cubo['colunas']
+    agregados = agregados_do_cubo(_cubo, inicio, fim, categorias, status)
+    return finalizar_agregados(agregados, colunas['categoria'], colunas['solucao'])
+
+def app_streamlit():
+    """Dashboard Streamlit com filtros de período, categoria e status recalculados sobre o cubo pré-agregado"""
+    import streamlit as st
+
+    st.set_page_config(page_title="Análise de Chamados", page_icon="📊", layout="wide")
+    st.title("📊 Análise de Chamados de Suporte")
+    reiniciar_medicoes()  # o processo do app é longo: não acumula medições entre interações
+
+    texto = st.sidebar.text_input("Planilha", str(path) if path else "")
+    if not texto:
+        st.info("👈 Informe o caminho da planilha na barra lateral")
+        return
+    caminho = Path(texto)
+    if not caminho.exists():
+        st.error(f"❌ O arquivo não foi encontrado em '{caminho}'")
+        return
+    if caminho != path:
+        configurar_execucao(caminho)  # cache e saídas na pasta da planilha escolhida
+    info = caminho.stat()
+    impressao = st.cache_data(show_spinner=False)(_impressao_por_estado)(str(caminho), info.st_mtime_ns, info.st_size)
+    # O cubo é compartilhado entre as sessões dos analistas; o recálculo só acontece quando a planilha muda
+    cubo = st.cache_resource(max_entries=2, show_spinner="Carregando e agregando a planilha...")(_cubo_da_planilha)(
+        str(caminho), impressao)
+    if cubo is None:
+        st.error("❌ Não foi possível carregar os dados ou identificar a coluna de categoria.")
+        return
+    filtrar = st.cache_data(max_entries=64, show_spinner=False)(_agregados_filtrados)
+    completo = filtrar(cubo, impressao)
+    colunas = cubo['colunas']
+
+    # Filtros
+    inicio = fim = None
+    if cubo['origem'] is not None:
+        dias = cubo['linhas']['dia']
+        primeiro = pd.Timestamp(cubo['origem'] + np.timedelta64(int(dias[dias >= 0].min()), 'D')).date()
+        ultimo = pd.Timestamp(cubo['origem'] + np.timedelta64(int(dias.max()), 'D')).date()
+        periodo = st.sidebar.date_input("Período", (primeiro, ultimo), min_value=primeiro, max_value=ultimo)
+        if isinstance(periodo, (tuple, list)) and len(periodo) == 2 and tuple(periodo) != (primeiro, ultimo):
+            inicio, fim = periodo
+    categorias = st.sidebar.multiselect("Categorias", list(completo['categorias'].index)) or None
+    status = None
+    if completo['status'] is not None:
+        status = st.sidebar.multiselect("Status", list(completo['status'].index)) or None
+
+    agregados = filtrar(cubo, impressao, inicio, fim,
+                        tuple(categorias) if categorias else None, tuple(status) if status else None)
+    if agregados['total'] == 0:
+        st.warning("⚠️ Nenhum chamado no filtro selecionado.")
+        return
+
+    contagem_categorias = agregados['categorias']
+    metricas = st.columns(4)
+    metricas[0].metric("Total de Chamados", f"{agregados['total']:,}")
+    metricas[1].metric("Categorias Únicas", len(contagem_categorias))
+    metricas[2].metric("Categoria Mais Frequente", str(contagem_categorias.index[0]), f"{contagem_categorias.iloc[0]:,} chamados",
+                       delta_color="off")
+    metricas[3].metric("Menor Categoria", f"{contagem_categorias.min():,}")
+
+    graficos = criar_graficos_interativos(None, colunas['categoria'], colunas['solucao'], colunas['data'], colunas['status'],
+                                          contagem_categorias, agregados['solucoes'], agregados)
+    figuras = [fig for fig in graficos.values() if fig is not None]
+    for par in range(0, len(figuras), 2):
+        for coluna, fig in zip(st.columns(2), figuras[par:par + 2]):
+            # As figuras usam fonte branca para o dashboard escuro: no app segue o tema do Streamlit
+            fig.update_layout(font_color=None)
+            coluna.plotly_chart(fig)
+
+    if agregados['top_solucoes'] is not None:
+        st.subheader("🔧 Soluções mais comuns por categoria")
+        st.dataframe(agregados['top_solucoes'], hide_index=True)
+    if agregados['tendencias'] is not None:
+        alertas = alertas_tendencias(agregados['tendencias'])
+        st.subheader(f"📈 Categorias em alta (z-score ≥ {LIMIAR_Z_TENDENCIA:g})")
+        st.dataframe(alertas[alertas['Em_Alta']], hide_index=True)
+    st.subheader("📋 Categorias")
+    st.dataframe(contagem_categorias.rename('Quantidade').reset_index(), hide_index=True)
+
+# Executar a análise completa
+if __name__ == "__main__" and _executando_no_streamlit():
+    app_streamlit()
+elif __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analise2
+
+
+ARQUIVO_RESULTADOS = Path(__file__).with_name("bench_resultados.jsonl")
+
+PROBLEMAS_BASE = ['Impressão', 'Rede', 'Senha', 'E-mail', 'Acesso ao Sistema', 'Lentidão', 'Configuração',
+                  'Instalação de Software', 'Telefonia', 'Backup', 'Vídeo Conferência', 'Permissão de Pasta']
+SOLUCOES_BASE = ['Reinicialização do serviço', 'Reconfiguração do equipamento', 'Troca de senha',
+                 'Atualização do driver', 'Orientação ao usuário', 'Liberação de acesso', 'Substituição de peça',
+                 'Reinstalação da aplicação', 'Limpeza de cache', 'Escalado para o fornecedor']
+STATUS_BASE = ['Fechado', 'Resolvido', 'Aberto', 'Em andamento', 'Cancelado']
+
+
+def _cronometrar(funcao, *args, repeticoes=3, preparar=None, **kwargs):
+    """Executa a função algumas vezes e retorna o melhor tempo (s) e o último resultado"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        if preparar is not None:
+            args = preparar()  # preparo fora da medição (ex.: cópia de um frame que a função altera)
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def benchmark_normalizacao(n_linhas=1_000_000, n_distintos=500, semente=42):
+    """Compara normalizar_texto aplicado linha a linha com normalizar_coluna em uma coluna grande"""
+    rng = np.random.default_rng(semente)
+    bases = [f"Categoria {i} de Atendimento Técnico" for i in range(n_distintos)]
+    variantes = bases + [b.upper() + " " for b in bases] + [b.replace('é', 'e') + "!" for b in bases]
+    serie = pd.Series(rng.choice(np.array(variantes, dtype=object), n_linhas))
+
+    print(f"\n⏱️ Normalização de {n_linhas:,} linhas ({len(variantes)} valores distintos)")
+    t_linha, _ = _cronometrar(lambda s: s.map(analise2.normalizar_texto), serie, repeticoes=1)
+    t_coluna, _ = _cronometrar(analise2.normalizar_coluna, serie)
+    print(f"   normalizar_texto (por linha): {t_linha:.3f}s")
+    print(f"   normalizar_coluna (vetorizado): {t_coluna:.3f}s  ({t_linha / t_coluna:.0f}x)")
+
+    # Pior caso para a memoização: todos os valores distintos
+    distintos = pd.Series([f"Solução nº {i} aplicada" for i in range(n_linhas)])
+    print(f"\n⏱️ Normalização de {n_linhas:,} linhas (todas distintas)")
+    t_linha, _ = _cronometrar(lambda s: s.map(analise2.normalizar_texto), distintos, repeticoes=1)
+    t_coluna, _ = _cronometrar(analise2.normalizar_coluna, distintos, repeticoes=1)
+    print(f"   normalizar_texto (por linha): {t_linha:.3f}s")
+    print(f"   normalizar_coluna (vetorizado): {t_coluna:.3f}s  ({t_linha / t_coluna:.1f}x)")
+
+
+def _rotulos(bases, quantidade):
+    """Gera `quantidade` rótulos distintos a partir de uma lista de nomes base"""
+    return [base if i < len(bases) else f"{base} {i // len(bases) + 1}"
+            for i, base in ((i, bases[i % len(bases)]) for i in range(quantidade))]
+
+
+def _sorteio_zipf(rng, n_valores, tamanho, assimetria):
+    """Sorteia índices em [0, n_valores) com frequência proporcional a 1 / posição ** assimetria"""
+    pesos = 1.0 / np.arange(1, n_valores + 1) ** assimetria
+    return rng.choice(n_valores, size=tamanho, p=pesos / pesos.sum())
+
+
+def _com_variantes(rotulos, codigos, taxa_variantes, rng):
+    """Troca uma fração das linhas por grafias variantes do mesmo rótulo (sem acento, caixa, espaços)"""
+    sem_acento = [unicodedata.normalize('NFKD', r).encode('ascii', 'ignore').decode('ascii') for r in rotulos]
+    grafias = np.array([rotulos,
+                        [r.lower() for r in rotulos],
+                        [r.upper() for r in rotulos],
+                        [r + " " for r in rotulos],
+                        sem_acento], dtype=object)
+    tipos = np.where(rng.random(len(codigos)) < taxa_variantes, rng.integers(1, len(grafias), len(codigos)), 0)
+    return grafias[tipos, codigos]
+
+
+def gerar_chamados_sinteticos(n_linhas=100_000, n_categorias=60, n_solucoes=400, assimetria=1.1,
+                              data_inicio='2020-01-01', data_fim='2025-01-01', taxa_ausentes=0.02,
+                              taxa_variantes=0.05, formato_data=None, semente=42):
+    """Gera uma planilha de chamados com a mesma forma da real, com distribuição de Zipf nas categorias e soluções"""
+    rng = np.random.default_rng(semente)
+    categorias = _sorteio_zipf(rng, n_categorias, n_linhas, assimetria)
+    # Cada categoria tem seu próprio ranking de soluções: a mais comum muda de uma categoria para outra
+    solucoes = (categorias * 7 + _sorteio_zipf(rng, n_solucoes, n_linhas, assimetria)) % n_solucoes
+    status = _sorteio_zipf(rng, len(STATUS_BASE), n_linhas, 1.5)
+
+    inicio, fim = np.datetime64(data_inicio, 'm'), np.datetime64(data_fim, 'm')
+    abertura = inicio + rng.integers(0, int((fim - inicio) / np.timedelta64(1, 'm')), n_linhas).astype('timedelta64[m]')
+    fechamento = abertura + (rng.exponential(16 * 60, n_linhas)).astype('timedelta64[m]')
+    fechamento[np.isin(status, [2, 3])] = np.datetime64('NaT')  # Aberto / Em andamento
+
+    df = pd.DataFrame({
+        'Nº': np.arange(1, n_linhas + 1),
+        'Data de Abertura': abertura,
+        'Problema Informado': _com_variantes(_rotulos(PROBLEMAS_BASE, n_categorias), categorias, taxa_variantes, rng),
+        'Descrição': np.array(["Usuário relata falha ao utilizar o recurso", "Chamado aberto por telefone",
+                               "Problema recorrente no setor"], dtype=object)[rng.integers(0, 3, n_linhas)],
+        'Solução Apresentada': np.array(_rotulos(SOLUCOES_BASE, n_solucoes), dtype=object)[solucoes],
+        'Status': np.array(STATUS_BASE, dtype=object)[status],
+        'Data de Fechamento': fechamento,
+    })
+    for coluna in ('Data de Abertura', 'Problema Informado', 'Solução Apresentada', 'Status'):
+        ausentes = rng.random(n_linhas) < taxa_ausentes
+        df.loc[ausentes, coluna] = None if df[coluna].dtype == object else pd.NaT
+    if formato_data:
+        df['Data de Abertura'] = df['Data de Abertura'].dt.strftime(formato_data)
+    return df
+
+
+def _frame_sintetico(n_linhas, n_categorias=300, n_solucoes=2000, semente=42):
+    """Gera um conjunto de chamados sem ausências nem variantes, já com os campos de processar_datas"""
+    df = gerar_chamados_sinteticos(n_linhas, n_categorias, n_solucoes, assimetria=0, taxa_ausentes=0,
+                                   taxa_variantes=0, semente=semente)
+    df = df.rename(columns={'Problema Informado': 'Categoria'})[['Data de Abertura', 'Categoria', 'Solução Apresentada', 'Status']]
+    return analise2.processar_datas(df, 'Data de Abertura')
+
+
+def _agregacao_anterior(df, col_categoria, col_solucao, col_status):
+    """Reproduz as varreduras separadas feitas antes do motor de agregação"""
+    df[col_categoria].value_counts()                                   # analise_chamados
+    df.groupby(col_categoria)[col_solucao].value_counts()              # analisar_solucoes_por_categoria
+    df[col_categoria].value_counts().nlargest(5)
+    df.groupby(['Ano', 'Mês']).size()                                  # criar_graficos_interativos
+    df['Dia_Semana'].value_counts()
+    df['Hora'].value_counts().sort_index()
+    df[col_status].value_counts()
+    df.groupby(['Dia_Semana', 'Hora']).size().unstack(fill_value=0)
+    df[col_categoria].value_counts().nlargest(5)                       # criar_dashboard_interativo
+
+
+def benchmark_agregacao(n_linhas=3_000_000):
+    """Compara as varreduras separadas por gráfico com o motor único agregar_chamados"""
+    df = _frame_sintetico(n_linhas)
+    colunas = ('Categoria', 'Solução Apresentada', 'Status')
+    print(f"\n⏱️ Agregação de {n_linhas:,} chamados")
+    t_anterior, _ = _cronometrar(_agregacao_anterior, df, *colunas)
+    t_motor, _ = _cronometrar(analise2.agregar_chamados, df, *colunas)
+    print(f"   varreduras separadas: {t_anterior:.3f}s")
+    print(f"   agregar_chamados:     {t_motor:.3f}s  ({t_anterior / t_motor:.1f}x)")
+
+
+def _top_solucoes_anterior(df_solucoes, contagem_categorias, col_categoria, n_solucoes, n_categorias):
+    """Reproduz o laço anterior: uma máscara booleana e um nlargest por categoria"""
+    return [df_solucoes[df_solucoes[col_categoria] == categoria].nlargest(n_solucoes, 'Contagem')
+            for categoria in contagem_categorias.nlargest(n_categorias).index]
+
+
+def benchmark_top_solucoes(n_linhas=2_000_000, n_categorias=50):
+    """Compara o laço por categoria com top_solucoes_por_categoria"""
+    df = _frame_sintetico(n_linhas, n_categorias=2000, n_solucoes=5000)
+    agregados = analise2.agregar_chamados(df, 'Categoria', 'Solução Apresentada')
+    args = (agregados['solucoes'], agregados['categorias'], 'Categoria', 5, n_categorias)
+    print(f"\n⏱️ Top 5 soluções de {n_categorias} categorias ({len(agregados['solucoes']):,} pares categoria × solução)")
+    t_anterior, _ = _cronometrar(_top_solucoes_anterior, *args)
+    t_vetorizado, _ = _cronometrar(analise2.top_solucoes_por_categoria, *args)
+    print(f"   laço por categoria:          {t_anterior:.3f}s")
+    print(f"   top_solucoes_por_categoria:  {t_vetorizado:.3f}s  ({t_anterior / t_vetorizado:.1f}x)")
+
+
+def benchmark_dashboard(n_linhas=1_000_000):
+    """Compara o tamanho do dashboard antes e depois do JSON compacto e os scripts que bloqueiam o <head>
+
+    Só mede bytes: o tempo até a primeira pintura depende de um navegador, que este benchmark não abre.
+    """
+    import re
+    import tempfile
+    import webbrowser
+    from plotly.offline import get_plotlyjs
+
+    df = _frame_sintetico(n_linhas)
+    colunas = ('Categoria', 'Solução Apresentada', 'Data de Abertura', 'Status')
+    agregados = analise2.agregar_chamados(df, colunas[0], colunas[1], colunas[3])
+    graficos = analise2.criar_graficos_interativos(df, *colunas, agregados['categorias'], agregados['solucoes'], agregados)
+
+    # Antes: um to_html completo por figura, mais o plotly.js no <head>
+    anterior = sum(len(fig.to_html(include_plotlyjs=False).encode('utf-8')) for fig in graficos.values() if fig)
+    plotlyjs = len(get_plotlyjs().encode('utf-8'))
+    print(f"\n⏱️ Dashboard com {n_linhas:,} chamados")
+    print(f"   antes:  {anterior / 1024:,.0f} KB de figuras + {plotlyjs / 1024:,.0f} KB de plotly.js")
+
+    abrir_original, saida_original = webbrowser.open, analise2.out_dir
+    webbrowser.open = lambda *args, **kwargs: False
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            analise2.out_dir = Path(pasta)
+            for modo in ('cdn', 'inline'):
+                caminho = analise2.criar_dashboard_interativo(df, *colunas, agregados['categorias'], agregados['solucoes'],
+                                                              graficos, agregados, modo_plotly=modo)
+                html = caminho.read_text(encoding='utf-8')
+                cabecalho = html[:max(html.find('</head>'), 0)]
+                # Scripts no <head> sem defer/async seguram a análise do restante da página
+                bloqueantes = [tag for tag in re.findall(r'<script\b[^>]*>', cabecalho)
+                               if not re.search(r'\b(defer|async)\b', tag)]
+                print(f"   depois ({modo}): {caminho.stat().st_size / 1024:,.0f} KB no arquivo, "
+                      f"{len(bloqueantes)} script(s) bloqueante(s) no <head>")
+    finally:
+        webbrowser.open, analise2.out_dir = abrir_original, saida_original
+
+
+def benchmark_detalhes_categorias(n_linhas=1_000_000, n_categorias=5000):
+    """Compara embutir o detalhe de todas as categorias no HTML com as partes .js carregadas sob demanda"""
+    df = _frame_sintetico(n_linhas, n_categorias=n_categorias, n_solucoes=5000)
+    colunas = ('Categoria', 'Solução Apresentada', 'Status')
+    with contextlib.redirect_stdout(io.StringIO()):
+        agregados = analise2.agregar_chamados(df, *colunas)
+    print(f"\n⏱️ Detalhe por categoria de {n_linhas:,} chamados ({len(agregados['categorias']):,} categorias)")
+    t_indice, detalhes = _cronometrar(analise2.indice_detalhes_categorias, agregados, colunas[0], colunas[1])
+    embutido = len(json.dumps(detalhes, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        t_exportar, destino = _cronometrar(analise2.exportar_detalhes_categorias, detalhes, pasta, repeticoes=1)
+        indice = (destino / "indice.js").stat().st_size
+        maior_parte = max(f.stat().st_size for f in destino.glob("parte_*.js"))
+    print(f"   indice_detalhes_categorias: {t_indice:.3f}s, exportação: {t_exportar:.3f}s")
+    print(f"   tudo embutido no HTML:          {embutido / 1024:,.0f} KB")
+    print(f"   índice + maior parte carregada: {(indice + maior_parte) / 1024:,.0f} KB")
+
+
+def benchmark_cubo(n_linhas=1_000_000):
+    """Compara refiltrar o frame e reagregar com recalcular os agregados a partir do cubo (filtros do app Streamlit)"""
+    df = _frame_sintetico(n_linhas, n_categorias=300, n_solucoes=2000)
+    colunas = ('Categoria', 'Solução Apresentada', 'Data de Abertura', 'Status')
+    cubo = analise2.construir_cubo(df, *colunas)
+    categorias = df['Categoria'].value_counts().index[:10].tolist()
+    filtro = ('2021-01-01', '2022-06-30', categorias, ['Fechado', 'Aberto'])
+
+    def reagregar():
+        datas = df['Data de Abertura']
+        mascara = ((datas >= filtro[0]) & (datas < pd.Timestamp(filtro[1]) + pd.Timedelta(days=1))
+                   & df['Categoria'].isin(filtro[2]) & df['Status'].isin(filtro[3]))
+        return analise2.agregar_chamados(df[mascara], colunas[0], colunas[1], colunas[3])
+
+    print(f"\n⏱️ Filtro de período, categoria e status sobre {n_linhas:,} chamados (cubo com {len(cubo['linhas']):,} linhas)")
+    t_frame, _ = _cronometrar(reagregar)
+    t_cubo, _ = _cronometrar(lambda: analise2.finalizar_agregados(analise2.agregados_do_cubo(cubo, *filtro), colunas[0], colunas[1]))
+    print(f"   filtrar o frame e reagregar: {t_frame:.3f}s")
+    print(f"   agregados_do_cubo:           {t_cubo:.3f}s  ({t_frame / t_cubo:.1f}x)")
+
+
+def benchmark_resultados(n_linhas=1_000_000):
+    """Compara derivar os agregados do cubo a cada execução com reaproveitá-los do armazém de resultados"""
+    df = _frame_sintetico(n_linhas, n_categorias=500, n_solucoes=5000)
+    colunas = ('Categoria', 'Solução Apresentada', 'Data de Abertura', 'Status')
+    with contextlib.redirect_stdout(io.StringIO()):
+        cubo = analise2.construir_cubo(df, *colunas)
+    derivar = lambda: analise2.finalizar_agregados(analise2.agregados_do_cubo(cubo), colunas[0], colunas[1])
+    cache_original = analise2.cache_dir
+    print(f"\n⏱️ Agregados de {n_linhas:,} chamados (cubo com {len(cubo['linhas']):,} linhas)")
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        analise2.cache_dir = Path(pasta)
+        try:
+            t_derivar, _ = _cronometrar(derivar)
+            analise2.memorizar_etapa('agregados', ('bench', n_linhas), derivar)
+            t_armazem, _ = _cronometrar(analise2.memorizar_etapa, 'agregados', ('bench', n_linhas), derivar)
+        finally:
+            analise2.cache_dir = cache_original
+    print(f"   agregados_do_cubo + finalizar: {t_derivar:.3f}s")
+    print(f"   memorizar_etapa (armazém):     {t_armazem:.3f}s  ({t_derivar / t_armazem:.1f}x)")
+
+
+def benchmark_exportacao(n_linhas=200_000):
+    """Compara o to_excel do pandas com a escrita em fluxo (constant_memory) de exportar_analises"""
+    df = pd.DataFrame({'Categoria': [f"Categoria {i % 3000}" for i in range(n_linhas)],
+                       'Solução Apresentada': [f"Solução {i}" for i in range(n_linhas)],
+                       'Contagem': np.arange(n_linhas, 0, -1)})
+    print(f"\n⏱️ Exportação Excel de {n_linhas:,} pares categoria × solução")
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        t_anterior, _ = _cronometrar(df.to_excel, Path(pasta) / "anterior.xlsx", index=False, engine='xlsxwriter',
+                                     repeticoes=1)
+        t_fluxo, _ = _cronometrar(analise2.exportar_analises, None, df, None, pasta, repeticoes=1)
+    print(f"   to_excel:          {t_anterior:.3f}s")
+    print(f"   exportar_analises: {t_fluxo:.3f}s  ({t_anterior / t_fluxo:.1f}x)")
+
+
+def benchmark_leitura_planilhas(n_pastas=6, n_linhas=20_000):
+    """Compara ler as pastas de trabalho uma a uma com a leitura em paralelo de carregar_dados e com a volta pelo cache"""
+    df = gerar_chamados_sinteticos(n_linhas, taxa_ausentes=0, taxa_variantes=0)
+    metade = n_linhas // 2
+    cache_original = analise2.cache_dir
+    print(f"\n⏱️ Leitura de {n_pastas} pastas de trabalho com 2 abas de {metade:,} chamados")
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n_pastas):
+            with pd.ExcelWriter(Path(pasta) / f"chamados_{i:02d}.xlsx") as escritor:
+                df.iloc[:metade].to_excel(escritor, sheet_name='Equipe A', index=False)
+                # Segunda equipe com outro cabeçalho para a categoria: alinhada pela detecção de papéis
+                df.iloc[metade:].rename(columns={'Problema Informado': 'Tipo de Problema'}).to_excel(
+                    escritor, sheet_name='Equipe B', index=False)
+        arquivos = sorted(Path(pasta).glob('*.xlsx'))
+        analise2.cache_dir = Path(pasta) / 'cache'
+        try:
+            t_serial, _ = _cronometrar(lambda: [pd.read_excel(a, sheet_name=None) for a in arquivos], repeticoes=1)
+            t_paralelo, _ = _cronometrar(analise2.carregar_dados, pasta, repeticoes=1)
+            t_cache, _ = _cronometrar(analise2.carregar_dados, pasta, repeticoes=1)
+        finally:
+            analise2.cache_dir = cache_original
+    print(f"   read_excel uma a uma:         {t_serial:.3f}s")
+    print(f"   carregar_dados (em paralelo): {t_paralelo:.3f}s  ({t_serial / t_paralelo:.1f}x)")
+    print(f"   carregar_dados (cache):       {t_cache:.3f}s  ({t_serial / t_cache:.1f}x)")
+
+
+def benchmark_sla(n_linhas=3_000_000, n_categorias=300, semente=42):
+    """Compara os percentis de SLA por groupby().quantile() com percentis_por_grupo, após as horas úteis vetorizadas"""
+    rng = np.random.default_rng(semente)
+    abertura = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n_linhas), unit='s')
+    fechamento = abertura + pd.to_timedelta(rng.exponential(3 * 86400, n_linhas).astype(np.int64), unit='s')
+    fechamento = fechamento.where(rng.random(n_linhas) > 0.02)  # chamados ainda abertos
+    categorias = pd.Series(_rotulos(['Categoria'], n_categorias)).take(_sorteio_zipf(rng, n_categorias, n_linhas, 1.1))
+    print(f"\n⏱️ SLA em horas úteis de {n_linhas:,} chamados")
+
+    t_horas, horas = _cronometrar(analise2.horas_uteis, abertura.to_numpy(), fechamento.to_numpy())
+
+    serie = pd.Series(horas, index=categorias.to_numpy())
+    t_anterior, _ = _cronometrar(lambda: serie.groupby(level=0).quantile([0.5, 0.9, 0.99]).unstack())
+    t_atual, _ = _cronometrar(analise2.percentis_por_grupo, *analise2._fatorar(categorias), horas, 'Categoria')
+    print(f"   horas_uteis:              {t_horas:.3f}s")
+    print(f"   groupby().quantile():     {t_anterior:.3f}s")
+    print(f"   percentis_por_grupo:      {t_atual:.3f}s  ({t_anterior / t_atual:.1f}x)")
+
+
+def benchmark_tendencias(n_linhas=5_000_000, n_categorias=500, anos=10, dias_novos=1, semente=42):
+    """Séries de tendência recalculadas por inteiro e atualizadas só com o último dia (execução noturna)"""
+    rng = np.random.default_rng(semente)
+    datas = np.datetime64('2015-01-01') + rng.integers(0, anos * 365, n_linhas).astype('timedelta64[D]')
+    categorias = np.array(_rotulos(['Categoria'], n_categorias), dtype=object)[_sorteio_zipf(rng, n_categorias, n_linhas, 1.1)]
+    categoria_dia = pd.Series(1, index=pd.MultiIndex.from_arrays([categorias, pd.DatetimeIndex(datas)])).groupby(
+        level=[0, 1], sort=False).sum()
+    corte = datas.max() - np.timedelta64(dias_novos - 1, 'D')
+    anterior = analise2.atualizar_tendencias(categoria_dia[categoria_dia.index.get_level_values(1) < corte])
+    print(f"\n⏱️ Tendências de {n_categorias} categorias em {anos} anos ({len(categoria_dia):,} pares categoria × dia)")
+
+    t_completo, _ = _cronometrar(analise2.atualizar_tendencias, categoria_dia)
+    t_incremental, _ = _cronometrar(analise2.atualizar_tendencias, categoria_dia, anterior)
+    print(f"   cálculo completo:      {t_completo:.3f}s")
+    print(f"   só os períodos novos:  {t_incremental:.3f}s  ({t_completo / t_incremental:.1f}x)")
+
+
+def _versao_codigo():
+    """Commit atual do repositório (com '+' se houver alterações não commitadas), ou None fora do git"""
+    try:
+        pasta = Path(__file__).parent
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=pasta, capture_output=True, text=True, check=True).stdout.strip()
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=pasta, capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if alterado else '')
+    except Exception:
+        return None
+
+
+def medir_funcoes_publicas(df, repeticoes=3):
+    """Mede o tempo de cada função pública de analise2 sobre um frame bruto; retorna {função: segundos}"""
+    tempos = {}
+    with tempfile.TemporaryDirectory() as pasta, contextlib.redirect_stdout(io.StringIO()):
+        cache_original, analise2.cache_dir = analise2.cache_dir, Path(pasta)
+        try:
+            # A detecção de papéis guarda o resultado por esquema (memória e disco): limpa o cache a cada repetição
+            def sem_cache_papeis():
+                analise2._cache_papeis.clear()
+                (Path(pasta) / "papeis_colunas.json").unlink(missing_ok=True)
+                return (df,)
+            for nome in ('categoria', 'solucao', 'data', 'status'):
+                funcao = getattr(analise2, f"encontrar_coluna_{nome}")
+                tempos[funcao.__name__], _ = _cronometrar(funcao, repeticoes=repeticoes, preparar=sem_cache_papeis)
+
+            tempos['processar_datas'], _ = _cronometrar(
+                analise2.processar_datas, repeticoes=repeticoes,
+                preparar=lambda: (df[['Data de Abertura']].copy(), 'Data de Abertura'))
+            tempos['analise_chamados'], resultado = _cronometrar(analise2.analise_chamados, repeticoes=repeticoes,
+                                                                 preparar=sem_cache_papeis)
+            df_clean, categoria, solucao, data, status, contagem = resultado
+            agregados = analise2.agregar_chamados(df_clean, categoria, solucao, status)
+            tempos['agregar_chamados'], _ = _cronometrar(analise2.agregar_chamados, df_clean, categoria, solucao, status,
+                                                         repeticoes=repeticoes)
+            tempos['analisar_solucoes_por_categoria'], df_solucoes = _cronometrar(
+                analise2.analisar_solucoes_por_categoria, df_clean, categoria, solucao, agregados, repeticoes=repeticoes)
+            tempos['criar_graficos_interativos'], _ = _cronometrar(
+                analise2.criar_graficos_interativos, df_clean, categoria, solucao, data, status, contagem, df_solucoes,
+                agregados, repeticoes=repeticoes)
+            tempos['exportar_analises'], _ = _cronometrar(
+                analise2.exportar_analises, contagem, df_solucoes, agregados, pasta, repeticoes=repeticoes)
+        finally:
+            analise2.cache_dir = cache_original
+            analise2.reiniciar_medicoes()
+    return tempos
+
+
+def executar_suite(tamanhos=(10_000, 100_000, 1_000_000), repeticoes=3, arquivo=ARQUIVO_RESULTADOS, **parametros):
+    """Roda a suíte para cada tamanho e acrescenta os resultados (um registro por função) ao arquivo JSONL"""
+    execucao = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'codigo': _versao_codigo(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'maquina': platform.node(),
+    }
+    registros = []
+    for n_linhas in tamanhos:
+        df = gerar_chamados_sinteticos(n_linhas, **parametros)
+        print(f"\n⏱️ Suíte com {n_linhas:,} chamados")
+        for funcao, tempo in medir_funcoes_publicas(df, repeticoes).items():
+            print(f"   {funcao:<34} {tempo:.3f}s")
+            registros.append({**execucao, 'n_linhas': n_linhas, 'parametros': parametros, 'funcao': funcao,
+                              'tempo_s': round(tempo, 5), 'repeticoes': repeticoes})
+    with open(arquivo, 'a', encoding='utf-8') as f:
+        for registro in registros:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    print(f"\n💾 {len(registros)} medições gravadas em {arquivo}")
+    return registros
+
+
+def comparar_resultados(arquivo=ARQUIVO_RESULTADOS, limite=1.10):
+    """Compara a última execução com a anterior de mesmos parâmetros, por função e tamanho, e aponta regressões"""
+    with open(arquivo, encoding='utf-8') as f:
+        registros = pd.DataFrame([json.loads(linha) for linha in f if linha.strip()])
+    registros['chave'] = registros['parametros'].map(lambda p: json.dumps(p, sort_keys=True))
+    ultima = registros.loc[registros['data'].idxmax(), 'chave']
+    registros = registros[registros['chave'] == ultima]
+    execucoes = registros['data'].drop_duplicates().sort_values().tolist()
+    if len(execucoes) < 2:
+        print("ℹ️ É preciso ao menos duas execuções para comparar")
+        return None
+    anterior, atual = (registros[registros['data'] == data].set_index(['n_linhas', 'funcao'])['tempo_s']
+                       for data in execucoes[-2:])
+    comparacao = pd.DataFrame({'anterior': anterior, 'atual': atual}).dropna()
+    comparacao['razao'] = comparacao['atual'] / comparacao['anterior']
+    print(f"\n📊 {execucoes[-2]} → {execucoes[-1]}")
+    for (n_linhas, funcao), linha in comparacao.iterrows():
+        marca = "⚠️" if linha['razao'] > limite else "  "
+        print(f" {marca} {n_linhas:>9,} {funcao:<34} {linha['anterior']:.3f}s → {linha['atual']:.3f}s ({linha['razao']:.2f}x)")
+    return comparacao
+
+
+def benchmarks_pontuais():
+    """Comparações pontuais entre implementações anteriores e atuais"""
+    benchmark_normalizacao()
+    benchmark_agregacao()
+    benchmark_top_solucoes()
+    benchmark_dashboard()
+    benchmark_detalhes_categorias()
+    benchmark_cubo()
+    benchmark_resultados()
+    benchmark_exportacao()
+    benchmark_leitura_planilhas()
+    benchmark_sla()
+    benchmark_tendencias()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de analise2.py")
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="tamanhos da suíte (10 mil a 5 milhões de chamados)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--categorias', type=int, default=60)
+    parser.add_argument('--solucoes', type=int, default=400)
+    parser.add_argument('--assimetria', type=float, default=1.1, help="expoente de Zipf (0 = uniforme)")
+    parser.add_argument('--ausentes', type=float, default=0.02, help="fração de valores ausentes")
+    parser.add_argument('--variantes', type=float, default=0.05, help="fração de grafias variantes nas categorias")
+    parser.add_argument('--formato-data', default=None, help="grava as datas como texto neste formato (ex.: %%d/%%m/%%Y %%H:%%M)")
+    parser.add_argument('--arquivo', type=Path, default=ARQUIVO_RESULTADOS)
+    parser.add_argument('--comparar', action='store_true', help="só compara as duas últimas execuções")
+    parser.add_argument('--pontuais', action='store_true', help="roda as comparações pontuais antes/depois")
+    args = parser.parse_args()
+
+    if args.pontuais:
+        benchmarks_pontuais()
+    elif args.comparar:
+        comparar_resultados(args.arquivo)
+    else:
+        executar_suite(args.linhas, args.repeticoes, args.arquivo, n_categorias=args.categorias,
+                       n_solucoes=args.solucoes, assimetria=args.assimetria, taxa_ausentes=args.ausentes,
+                       taxa_variantes=args.variantes, formato_data=args.formato_data)
+        comparar_resultados(args.arquivo)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os testes importam analise2 e os geradores de dados de bench_analise direto da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import gerar_chamados_sinteticos
+
+CATEGORIA, SOLUCAO, STATUS = 'Problema Informado', 'Solução Apresentada', 'Status'
+
+
+@pytest.fixture(scope='module')
+def chamados():
+    """Chamados com ausências em todas as colunas e grafias variantes nas categorias"""
+    df = gerar_chamados_sinteticos(20_000, n_categorias=80, n_solucoes=300, taxa_ausentes=0.05, semente=7)
+    return analise2.processar_datas(df, 'Data de Abertura')
+
+
+def _contagens(serie):
+    """{chave como tupla de textos: contagem}, sem as combinações zeradas, para comparar independente da ordem"""
+    return {tuple(str(v) for v in (chave if isinstance(chave, tuple) else (chave,))): int(contagem)
+            for chave, contagem in serie.items() if contagem}
+
+
+def test_agregados_iguais_ao_groupby(chamados):
+    """Cada contagem do motor de códigos inteiros coincide com o groupby/value_counts direto do pandas"""
+    df = chamados
+    agregados = analise2.calcular_agregados(df, CATEGORIA, SOLUCAO, STATUS)
+    esperados = {
+        'categorias': df[CATEGORIA].value_counts(),
+        'solucoes': df.groupby([CATEGORIA, SOLUCAO]).size(),
+        'status': df[STATUS].value_counts(),
+        'categoria_status': df.groupby([CATEGORIA, STATUS]).size(),
+        'ano_mes': df.groupby(['Ano', 'Mês']).size(),
+        'dia_semana': df['Dia_Semana'].value_counts(),
+        'hora': df['Hora'].value_counts(),
+        'dia_hora': df.groupby(['Dia_Semana', 'Hora']).size(),
+    }
+    assert agregados['total'] == len(df)
+    for chave, esperado in esperados.items():
+        assert _contagens(agregados[chave]) == _contagens(esperado), chave
+    por_dia = df.groupby([CATEGORIA, df['Data de Abertura'].dt.normalize().dt.strftime('%Y-%m-%d')]).size()
+    obtido = agregados['categoria_dia']
+    obtido.index = obtido.index.set_levels(obtido.index.levels[1].strftime('%Y-%m-%d'), level=1)
+    assert _contagens(obtido) == _contagens(por_dia)
+
+
+def test_ordem_de_primeira_aparicao(chamados):
+    """As contagens brutas seguem a ordem de primeira aparição, como groupby(sort=False)"""
+    agregados = analise2.calcular_agregados(chamados, CATEGORIA, SOLUCAO, STATUS)
+    esperado = chamados.groupby([CATEGORIA, SOLUCAO], sort=False).size()
+    assert agregados['solucoes'].index.tolist() == esperado.index.tolist()
+    assert agregados['categorias'].index.tolist() == chamados[CATEGORIA].dropna().unique().tolist()
+
+
+def test_somar_agregados_de_blocos(chamados):
+    """Somar os agregados de dois blocos dá as mesmas contagens de agregar o frame inteiro"""
+    metade = len(chamados) // 2
+    blocos = [analise2.calcular_agregados(parte, CATEGORIA, SOLUCAO, STATUS)
+              for parte in (chamados.iloc[:metade], chamados.iloc[metade:])]
+    somados = analise2.somar_agregados(*blocos)
+    inteiro = analise2.calcular_agregados(chamados, CATEGORIA, SOLUCAO, STATUS)
+    assert somados['total'] == inteiro['total']
+    for chave in ('categorias', 'solucoes', 'status', 'categoria_status', 'ano_mes', 'dia_hora', 'categoria_dia'):
+        assert _contagens(somados[chave]) == _contagens(inteiro[chave]), chave
+
+
+@pytest.mark.parametrize('n_solucoes, n_categorias', [(5, 10), (3, 80), (1, 1), (50, 200)])
+def test_top_solucoes_igual_ao_laco(chamados, n_solucoes, n_categorias):
+    """O top-N vetorizado dá as mesmas linhas, na mesma ordem (empates inclusive), que um nlargest por categoria"""
+    agregados = analise2.agregar_chamados(chamados, CATEGORIA, SOLUCAO, STATUS)
+    df_solucoes, categorias = agregados['solucoes'], agregados['categorias']
+    esperado = pd.concat([df_solucoes[df_solucoes[CATEGORIA] == categoria].nlargest(n_solucoes, 'Contagem')
+                          for categoria in categorias.head(n_categorias).index], ignore_index=True)
+    obtido = analise2.top_solucoes_por_categoria(df_solucoes, categorias, CATEGORIA, n_solucoes, n_categorias)
+    pd.testing.assert_frame_equal(obtido.drop(columns='Ranking'), esperado)
@@ -0,0 +1,143 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import analise2
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Armazém de resultados numa pasta temporária, com o cache ligado"""
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path / 'cache')
+    monkeypatch.setattr(analise2, 'USAR_CACHE', True)
+    monkeypatch.setattr(analise2, 'ATUALIZAR_CACHE', False)
+    return tmp_path / 'cache'
+
+
+class Contador:
+    """Cálculo de etapa que conta quantas vezes foi executado"""
+
+    def __init__(self, valor):
+        self.valor, self.chamadas = valor, 0
+
+    def __call__(self):
+        self.chamadas += 1
+        return self.valor
+
+
+def test_mesmas_entradas_reaproveitam(cache):
+    serie = pd.Series([3, 2, 1], index=pd.Index(['a', 'b', 'c'], name='Categoria'), name='count')
+    calcular = Contador(serie)
+    primeiro = analise2.memorizar_etapa('agregados', ('planilha', {'meta': 8}), calcular)
+    segundo = analise2.memorizar_etapa('agregados', ('planilha', {'meta': 8}), calcular)
+    assert calcular.chamadas == 1
+    assert segundo.equals(primeiro)
+    assert len(list(cache.glob('*'))) == 1
+
+
+def test_parametro_diferente_recalcula(cache):
+    calcular = Contador({'total': 10})
+    analise2.memorizar_etapa('sla', ('planilha', {'meta': 8}), calcular)
+    analise2.memorizar_etapa('sla', ('planilha', {'meta': 24}), calcular)
+    analise2.memorizar_etapa('tendencias', ('planilha', {'meta': 8}), calcular)
+    assert calcular.chamadas == 3
+    # A primeira combinação continua no armazém
+    analise2.memorizar_etapa('sla', ('planilha', {'meta': 8}), calcular)
+    assert calcular.chamadas == 3
+
+
+def test_none_tambem_e_reaproveitado(cache):
+    calcular = Contador(None)
+    assert analise2.memorizar_etapa('sla', ('planilha',), calcular) is None
+    assert analise2.memorizar_etapa('sla', ('planilha',), calcular) is None
+    assert calcular.chamadas == 1
+
+
+@pytest.mark.parametrize('desligar', [
+    lambda monkeypatch: monkeypatch.setattr(analise2, 'USAR_CACHE', False),  # --sem-cache
+    lambda monkeypatch: monkeypatch.setattr(analise2, 'cache_dir', None),     # nenhuma pasta de cache
+])
+def test_sem_cache_sempre_calcula(cache, monkeypatch, desligar):
+    desligar(monkeypatch)
+    calcular = Contador([1, 2, 3])
+    for _ in range(2):
+        assert analise2.memorizar_etapa('agregados', ('planilha',), calcular) == [1, 2, 3]
+    assert calcular.chamadas == 2
+    assert not cache.exists()
+
+
+def test_usar_cache_falso_na_chamada(cache):
+    calcular = Contador([1])
+    analise2.memorizar_etapa('agregados', ('planilha',), calcular, usar_cache=False)
+    analise2.memorizar_etapa('agregados', ('planilha',), calcular, usar_cache=False)
+    assert calcular.chamadas == 2
+
+
+def test_atualizar_cache_recalcula_e_regrava(cache, monkeypatch):
+    analise2.memorizar_etapa('agregados', ('planilha',), Contador('antigo'))
+    monkeypatch.setattr(analise2, 'ATUALIZAR_CACHE', True)
+    calcular = Contador('novo')
+    assert analise2.memorizar_etapa('agregados', ('planilha',), calcular) == 'novo'
+    assert calcular.chamadas == 1
+    monkeypatch.setattr(analise2, 'ATUALIZAR_CACHE', False)
+    assert analise2.memorizar_etapa('agregados', ('planilha',), Contador('outro')) == 'novo'
+
+
+def test_resultado_ilegivel_e_recalculado(cache):
+    analise2.memorizar_etapa('agregados', ('planilha',), Contador('ok'))
+    (arquivo,) = cache.glob('*')
+    arquivo.write_bytes(b'corrompido')
+    calcular = Contador('ok')
+    assert analise2.memorizar_etapa('agregados', ('planilha',), calcular) == 'ok'
+    assert calcular.chamadas == 1
+
+
+def _arquivo(pasta, nome, tamanho_kb, idade_dias):
+    """Arquivo de cache com o tamanho e a data de último uso pedidos"""
+    arquivo = pasta / nome
+    arquivo.write_bytes(b'0' * tamanho_kb * 1024)
+    instante = time.time() - idade_dias * 86400
+    os.utime(arquivo, (instante, instante))
+    return arquivo
+
+
+def test_limpar_cache_remove_expirados_e_menos_usados(cache):
+    cache.mkdir()
+    antigo = _arquivo(cache, 'antigo.pkl', 10, 40)
+    pouco_usado = _arquivo(cache, 'pouco_usado.pkl', 400, 3)
+    usado = _arquivo(cache, 'usado.pkl', 400, 1)
+    recente = _arquivo(cache, 'recente.pkl', 400, 0)
+    removidos = analise2.limpar_cache(tamanho_max_mb=1, idade_max_dias=30, manter=[recente])
+    assert set(removidos) == {antigo, pouco_usado}
+    assert usado.exists() and recente.exists()
+
+
+def test_limpar_cache_nunca_remove_o_que_manter(cache):
+    cache.mkdir()
+    grande = _arquivo(cache, 'grande.pkl', 2048, 90)
+    outro = _arquivo(cache, 'outro.pkl', 10, 0)
+    assert analise2.limpar_cache(tamanho_max_mb=1, idade_max_dias=30, manter=[grande]) == [outro]
+    assert grande.exists()
+
+
+def test_reaproveitar_renova_o_uso(cache):
+    """Ler um resultado do armazém conta como uso: ele sobrevive à limpeza por LRU"""
+    analise2.memorizar_etapa('agregados', ('a',), Contador('a'))
+    analise2.memorizar_etapa('agregados', ('b',), Contador('b'))
+    instante = time.time() - 5 * 86400
+    for arquivo in cache.glob('*'):
+        os.utime(arquivo, (instante, instante))
+    analise2.memorizar_etapa('agregados', ('a',), Contador('a'))
+    tamanho = min(arquivo.stat().st_size for arquivo in cache.glob('*'))
+    removidos = analise2.limpar_cache(tamanho_max_mb=tamanho / 1024 / 1024, idade_max_dias=None)
+    assert len(removidos) == 1
+    calcular = Contador('a')
+    analise2.memorizar_etapa('agregados', ('a',), calcular)
+    assert calcular.chamadas == 0
+
+
+def test_sem_pasta_de_cache(monkeypatch):
+    monkeypatch.setattr(analise2, 'cache_dir', None)
+    assert analise2.limpar_cache() == []
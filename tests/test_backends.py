@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import _frame_sintetico
+
+pytest.importorskip('duckdb')
+
+COLUNAS = ('Categoria', 'Solução Apresentada', 'Data de Abertura', 'Status')
+
+CASOS = {
+    'vazio': lambda: _frame_sintetico(0),
+    'uma linha': lambda: _frame_sintetico(1),
+    'sem soluções': lambda: _frame_sintetico(1000).assign(**{COLUNAS[1]: None}),
+    'muitas categorias': lambda: _frame_sintetico(20_000, n_categorias=10_000, n_solucoes=10_000),
+    'zipf': lambda: _frame_sintetico(100_000, n_categorias=300, n_solucoes=2000),
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_temporario(tmp_path, monkeypatch):
+    """O despejo do DuckDB vai para a pasta de cache: nos testes, uma pasta temporária"""
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path / 'cache')
+
+
+@pytest.mark.parametrize('chaves', [
+    pd.DataFrame({'a': np.array([], dtype=np.int64), 'b': np.array([], dtype=np.int64)}),
+    pd.DataFrame({'a': [3], 'b': [1]}),
+    pd.DataFrame({'a': [2, 0, 2, 1, 0, 2], 'b': [5, 5, 5, 4, 5, 1]}),
+    pd.DataFrame({'a': np.random.default_rng(0).integers(0, 50, 100_000),
+                  'b': np.random.default_rng(1).integers(0, 200, 100_000)}),
+], ids=['vazio', 'uma linha', 'repetidas', 'aleatorias'])
+def test_contar_combinacoes(chaves):
+    """DuckDB conta as mesmas combinações do pandas, na mesma ordem de primeira aparição"""
+    esperado = analise2.contar_combinacoes(chaves, 'pandas')
+    obtido = analise2.contar_combinacoes(chaves, 'duckdb')
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError):
+        analise2.contar_combinacoes(pd.DataFrame({'a': [1]}), 'polars')
+
+
+def test_backend_lido_na_chamada(monkeypatch):
+    """Sem backend explícito vale o BACKEND_AGREGACAO do momento da chamada (ex.: --backend)"""
+    monkeypatch.setattr(analise2, 'BACKEND_AGREGACAO', 'polars')
+    with pytest.raises(ValueError):
+        analise2.contar_combinacoes(pd.DataFrame({'a': [1]}))
+
+
+def test_despejo_sem_cache(tmp_path, monkeypatch):
+    """Com --sem-cache o DuckDB não cria nada na pasta de cache"""
+    monkeypatch.setattr(analise2, 'USAR_CACHE', False)
+    chaves = pd.DataFrame({'a': [2, 0, 2], 'b': [1, 1, 1]})
+    pd.testing.assert_frame_equal(analise2.contar_combinacoes(chaves, 'duckdb'),
+                                  analise2.contar_combinacoes(chaves, 'pandas'), check_dtype=False)
+    assert not (tmp_path / 'cache').exists()
+
+
+@pytest.mark.parametrize('caso', list(CASOS))
+def test_cubo_e_agregados(caso):
+    """Cubo e agregados idênticos nos dois backends"""
+    df = CASOS[caso]()
+    cubo_esperado = analise2.construir_cubo(df, *COLUNAS, backend='pandas')
+    cubo = analise2.construir_cubo(df, *COLUNAS, backend='duckdb')
+    pd.testing.assert_frame_equal(cubo['linhas'], cubo_esperado['linhas'])
+
+    esperados = analise2.agregar_chamados(df, COLUNAS[0], COLUNAS[1], COLUNAS[3], backend='pandas')
+    obtidos = analise2.agregar_chamados(df, COLUNAS[0], COLUNAS[1], COLUNAS[3], backend='duckdb')
+    _comparar(obtidos, esperados)
+
+
+def _comparar(obtido, esperado, chave='agregados'):
+    """Igualdade de agregados, descendo nos dicionários (ex.: as séries de tendências)"""
+    if isinstance(esperado, dict):
+        assert obtido.keys() == esperado.keys(), chave
+        for nome in esperado:
+            _comparar(obtido[nome], esperado[nome], f"{chave}.{nome}")
+    elif isinstance(esperado, pd.DataFrame):
+        pd.testing.assert_frame_equal(obtido, esperado, obj=chave)
+    elif isinstance(esperado, pd.Series):
+        pd.testing.assert_series_equal(obtido, esperado, obj=chave)
+    elif isinstance(esperado, np.ndarray):
+        np.testing.assert_array_equal(obtido, esperado, err_msg=chave)
+    else:
+        assert obtido == esperado, chave
@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import gerar_chamados_sinteticos
+
+COLUNAS = ('Problema Informado', 'Solução Apresentada', 'Data de Abertura', 'Status')
+CATEGORIA, SOLUCAO, DATA, STATUS = COLUNAS
+
+
+@pytest.fixture(scope='module')
+def chamados():
+    """Chamados com ausências em todas as colunas, inclusive na data"""
+    df = gerar_chamados_sinteticos(20_000, n_categorias=60, n_solucoes=200, taxa_ausentes=0.05, semente=11)
+    return analise2.processar_datas(df, DATA)
+
+
+@pytest.fixture(scope='module')
+def cubo(chamados):
+    return analise2.construir_cubo(chamados, *COLUNAS)
+
+
+def _contagens(serie):
+    """{chave como tupla de textos: contagem} para comparar independente da ordem"""
+    return {tuple(str(v) for v in (chave if isinstance(chave, tuple) else (chave,))): int(contagem)
+            for chave, contagem in serie.items() if contagem}
+
+
+def _fatia(df, inicio, fim, categorias, status):
+    """Filtro equivalente a fatiar_cubo aplicado direto ao frame (datas inclusivas)"""
+    datas = df[DATA]
+    return df[(datas >= inicio) & (datas < pd.Timestamp(fim) + pd.Timedelta(days=1))
+              & df[CATEGORIA].isin(categorias) & df[STATUS].isin(status)]
+
+
+@pytest.mark.parametrize('dimensoes, colunas', [
+    ('categoria', [CATEGORIA]),
+    ('status', [STATUS]),
+    (['categoria', 'solucao'], [CATEGORIA, SOLUCAO]),
+    (['ano', 'mes'], ['Ano', 'Mês']),
+    (['dia_semana', 'hora'], ['Dia_Semana', 'Hora']),
+])
+def test_consolidacao_igual_ao_groupby(chamados, cubo, dimensoes, colunas):
+    """O rollup do cubo coincide com o groupby do frame, ignorando as linhas com valor ausente"""
+    obtido = analise2.consolidar_cubo(cubo, dimensoes)
+    assert _contagens(obtido) == _contagens(chamados.groupby(colunas).size())
+    assert obtido.is_monotonic_decreasing
+    assert analise2.consolidar_cubo(cubo, []) == len(chamados)
+
+
+def test_consolidacao_por_data(chamados, cubo):
+    obtido = analise2.consolidar_cubo(cubo, 'data', ordenar=False)
+    esperado = chamados.groupby(chamados[DATA].dt.normalize()).size()
+    assert obtido.sort_index().to_dict() == esperado.to_dict()
+
+
+def test_fatia_igual_ao_filtro_do_frame(chamados, cubo):
+    """Período, categorias, status e horas filtrados no cubo contam o mesmo que o filtro do frame"""
+    categorias = chamados[CATEGORIA].value_counts().index[:8].tolist()
+    status = ['Fechado', 'Aberto']
+    fatia = analise2.fatiar_cubo(cubo, '2022-03-01', '2023-06-30', categoria=categorias, status=status,
+                                 hora=range(8, 18))
+    df = _fatia(chamados, '2022-03-01', '2023-06-30', categorias, status)
+    df = df[df['Hora'].between(8, 17)]
+    assert analise2.consolidar_cubo(fatia, []) == len(df)
+    assert _contagens(analise2.consolidar_cubo(fatia, ['categoria', 'solucao'])) == \
+        _contagens(df.groupby([CATEGORIA, SOLUCAO]).size())
+
+
+def test_fatia_por_dimensao_de_tempo(chamados, cubo):
+    fatia = analise2.fatiar_cubo(cubo, ano=[2022], dia_semana=[5, 6])
+    df = chamados[(chamados['Ano'] == 2022) & chamados['Dia_Semana'].isin([5, 6])]
+    assert _contagens(analise2.consolidar_cubo(fatia, 'categoria')) == _contagens(df[CATEGORIA].value_counts())
+
+
+def test_top_n_igual_ao_nlargest(chamados, cubo):
+    """Top-N geral e por categoria: mesmas contagens que nlargest e grupos na ordem do total da categoria"""
+    geral = analise2.top_n_cubo(cubo, 'solucao', n=5)
+    assert geral.tolist() == chamados[SOLUCAO].value_counts().nlargest(5).tolist()
+
+    obtido = analise2.top_n_cubo(cubo, 'solucao', n=3, por='categoria')
+    por_par = chamados.groupby([CATEGORIA, SOLUCAO]).size()
+    totais = chamados[CATEGORIA].value_counts()
+    grupos = obtido.index.get_level_values(0)
+    # Categorias sem nenhuma solução informada não aparecem no ranking
+    assert set(grupos) == set(por_par.index.get_level_values(0))
+    assert totais.reindex(grupos.unique()).is_monotonic_decreasing
+    for categoria, contagens in obtido.groupby(level=0, sort=False):
+        esperado = por_par.loc[categoria].nlargest(3)
+        assert contagens.tolist() == esperado.tolist(), categoria
+        assert all(por_par.loc[chave] == valor for chave, valor in contagens.items())
+
+
+def test_agregados_do_cubo_iguais_a_agregar_chamados(chamados, cubo):
+    """Filtros do app Streamlit: agregados do cubo iguais a reagregar o frame filtrado"""
+    categorias = chamados[CATEGORIA].value_counts().index[:10].tolist()
+    filtro = ('2021-01-01', '2022-06-30', categorias, ['Fechado', 'Aberto'])
+    esperado = analise2.agregar_chamados(_fatia(chamados, *filtro), CATEGORIA, SOLUCAO, STATUS)
+    obtido = analise2.finalizar_agregados(analise2.agregados_do_cubo(cubo, *filtro), CATEGORIA, SOLUCAO)
+    assert obtido['total'] == esperado['total']
+    assert obtido['categorias'].equals(esperado['categorias'])
+    assert obtido['solucoes'].equals(esperado['solucoes'])
+
+
+def test_cubo_persistido_identico(cubo, tmp_path, monkeypatch):
+    """salvar_cubo/carregar_cubo devolvem o mesmo cubo e as consultas continuam iguais"""
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path / 'cache')
+    assert analise2.carregar_cubo('planilha-v1') is None
+    analise2.salvar_cubo(cubo, 'planilha-v1')
+    carregado = analise2.carregar_cubo('planilha-v1')
+    assert carregado['linhas'].equals(cubo['linhas'])
+    assert carregado.keys() == cubo.keys()
+    assert carregado['origem'] == cubo['origem'] and carregado['colunas'] == cubo['colunas']
+    for papel, rotulos in cubo['rotulos'].items():
+        assert carregado['rotulos'][papel].tolist() == rotulos.tolist()
+    assert analise2.top_n_cubo(carregado, 'solucao', 3, por='categoria').equals(
+        analise2.top_n_cubo(cubo, 'solucao', 3, por='categoria'))
+
+    # Uma nova versão da mesma planilha substitui o cubo anterior
+    analise2.salvar_cubo(cubo, 'planilha-v2')
+    assert analise2.carregar_cubo('planilha-v1') is None
+    assert analise2.carregar_cubo('planilha-v2') is not None
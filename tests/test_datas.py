@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+
+
+def _datas_aleatorias(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 2 * 365 * 1440, n), unit='min')
+
+
+@pytest.mark.parametrize('formato', ['%d/%m/%Y %H:%M', '%d/%m/%Y', '%d-%m-%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S'])
+def test_formato_detectado_e_conversao_igual_ao_strptime(formato):
+    """O formato dominante é detectado (dd/mm antes de mm/dd nos dias até 12) e a conversão rápida bate com o strptime"""
+    textos = pd.Series(_datas_aleatorias(3000).strftime(formato))
+    assert analise2.detectar_formato_data(textos) == (formato, 1.0)
+    datas, falhas = analise2.converter_datas(textos)
+    pd.testing.assert_series_equal(datas, pd.to_datetime(textos, format=formato), check_dtype=False)
+    assert falhas == 0
+
+
+def test_dia_ate_12_lido_como_dia():
+    datas, _ = analise2.converter_datas(pd.Series(['03/04/2023 10:00', '12/01/2023 08:30']))
+    assert datas.tolist() == [pd.Timestamp('2023-04-03 10:00'), pd.Timestamp('2023-01-12 08:30')]
+
+
+def test_falhas_contam_so_valores_invalidos():
+    """Textos fora de qualquer formato contam como falha; vazios e ausentes não"""
+    validos = list(_datas_aleatorias(500).strftime('%d/%m/%Y %H:%M'))
+    serie = pd.Series(validos + ['abc', '31/02/2023 10:00', 'sem data', '', '   ', None])
+    datas, falhas = analise2.converter_datas(serie)
+    assert falhas == 3
+    assert datas.notna().sum() == len(validos)
+    df = analise2.processar_datas(pd.DataFrame({'Data': serie}), 'Data')
+    assert df.attrs['datas_invalidas'] == 3
+    assert df['Ano'].notna().sum() == len(validos)
+
+
+def test_outros_formatos_pela_inferencia():
+    """Linhas fora do formato dominante ainda são convertidas (ISO e texto livre com dia primeiro)"""
+    serie = pd.Series(list(_datas_aleatorias(200).strftime('%d/%m/%Y %H:%M')) + ['2023-05-06 07:08', '6 May 2023'])
+    datas, falhas = analise2.converter_datas(serie)
+    assert falhas == 0
+    assert datas.iloc[-2:].tolist() == [pd.Timestamp('2023-05-06 07:08'), pd.Timestamp('2023-05-06')]
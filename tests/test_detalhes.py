@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import _frame_sintetico
+
+
+def test_rotulos_com_o_mesmo_texto_ficam_separados():
+    """1 e '1' são categorias distintas: cada uma tem seu detalhe, na posição do ranking"""
+    df = pd.DataFrame({
+        'Categoria': [1, '1', 1, 'nan', None, 'x'],
+        'Solução Apresentada': ['a', 'b', 'a', 'c', 'd', 'e'],
+        'Status': ['Fechado', 'Fechado', 'Aberto', 'Fechado', 'Fechado', 'Fechado'],
+        'Data de Abertura': pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01', '2024-01-05', '2024-01-06',
+                                            '2024-01-07']),
+    })
+    df = analise2.processar_datas(df, 'Data de Abertura')
+    agregados = analise2.agregar_chamados(df, 'Categoria', 'Solução Apresentada', 'Status')
+    detalhes = analise2.indice_detalhes_categorias(agregados, 'Categoria', 'Solução Apresentada')
+
+    assert [(d['categoria'], d['total']) for d in detalhes] == [('1', 2), ('1', 1), ('nan', 1), ('x', 1)]
+    assert detalhes[0]['solucoes'] == [['a', 2]] and detalhes[1]['solucoes'] == [['b', 1]]
+    assert detalhes[0]['meses'] == {'inicio': '2024-01', 'contagens': [1, 0, 1]}
+    assert detalhes[1]['status'] == [['Fechado', 1]]
+
+
+def test_indice_segue_o_ranking_e_partes_cobrem_todas(tmp_path):
+    """Detalhes na ordem do ranking de categorias, status somando o total, e cada categoria em exatamente uma parte"""
+    df = _frame_sintetico(20_000, n_categorias=250, n_solucoes=400)
+    agregados = analise2.agregar_chamados(df, 'Categoria', 'Solução Apresentada', 'Status')
+    detalhes = analise2.indice_detalhes_categorias(agregados, 'Categoria', 'Solução Apresentada')
+    assert [d['categoria'] for d in detalhes] == [str(c) for c in agregados['categorias'].index]
+    assert all(d['total'] == sum(c for _, c in d.get('status', [])) for d in detalhes)
+
+    pasta = analise2.exportar_detalhes_categorias(detalhes, tmp_path, por_parte=100)
+    indice = json.loads((pasta / "indice.js").read_text(encoding='utf-8')[len('registrarIndiceDetalhes('):-3])
+    assert indice['categorias'] == [d['categoria'] for d in detalhes]
+    partes = []
+    for arquivo in sorted(pasta.glob("parte_*.js")):
+        texto = arquivo.read_text(encoding='utf-8')
+        partes += json.loads(texto[texto.index(', ') + 2:-3])
+    assert partes == detalhes
+
+
+@pytest.mark.parametrize('modo', analise2.MODOS_PLOTLY)
+def test_modo_plotly_lido_na_chamada(monkeypatch, modo):
+    """Sem modo explícito vale o MODO_PLOTLY do momento da chamada (ex.: --plotly inline)"""
+    pytest.importorskip('plotly')
+    monkeypatch.setattr(analise2, 'MODO_PLOTLY', modo)
+    assert ('src="https://cdn.plot.ly/' in analise2._script_plotly()) == (modo == 'cdn')
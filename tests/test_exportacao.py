@@ -0,0 +1,15 @@
+import sys
+
+import pandas as pd
+
+import analise2
+
+
+def test_outros_formatos_sem_xlsxwriter(tmp_path, monkeypatch):
+    """Sem o xlsxwriter o Excel falha sozinho e os demais formatos pedidos ainda são gravados"""
+    monkeypatch.setitem(sys.modules, 'xlsxwriter', None)  # `import xlsxwriter` passa a levantar ImportError
+    contagem = pd.Series([5, 3], index=pd.Index(['Rede', 'Impressora'], name='Categoria'), name='count')
+    saida = analise2.exportar_analises(contagem, None, diretorio_saida=tmp_path, formatos=('xlsx', 'csv.gz'))
+    assert saida == tmp_path
+    assert not (tmp_path / 'analise_completa_chamados.xlsx').exists()
+    assert pd.read_csv(tmp_path / 'analise_geral_por_categoria.csv.gz')['Quantidade'].tolist() == [5, 3]
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Importados só dentro das funções que os usam
+MODULOS_SOB_DEMANDA = ('plotly', 'xlsxwriter', 'openpyxl', 'duckdb', 'streamlit', 'seaborn', 'matplotlib',
+                       'concurrent.futures.process', 'cProfile', 'webbrowser', 'argparse')
+
+# Custo próprio de `import analise2`, além de pandas e numpy: medido em ~10 ms; com plotly no topo do módulo eram
+# ~150 ms. Tempo de parede varia demais entre máquinas e CI, então a medição só roda com ANALISE_MEDIR_IMPORTACAO=1
+# (o valor pode trocar o orçamento, ex.: ANALISE_MEDIR_IMPORTACAO=80).
+ORCAMENTO_IMPORTACAO_MS = 100
+REPETICOES = 5
+
+
+def _importar_em_processo_novo(codigo):
+    """Roda o código num interpretador novo, na raiz do repositório, e devolve a saída padrão"""
+    # O bytecode precisa ser gravado: o que se mede é a importação a partir do .pyc, não a compilação
+    ambiente = {nome: valor for nome, valor in os.environ.items() if nome != 'PYTHONDONTWRITEBYTECODE'}
+    processo = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=ambiente,
+                              capture_output=True, text=True, check=True)
+    return processo.stdout.strip()
+
+
+def test_importacao_sem_dependencias_pesadas():
+    """`import analise2` carrega apenas pandas e numpy; o restante é importado sob demanda"""
+    codigo = f"import sys, analise2; print(','.join(m for m in {MODULOS_SOB_DEMANDA!r} if m in sys.modules))"
+    carregados = [m for m in _importar_em_processo_novo(codigo).split(',') if m]
+    assert not carregados, f"módulos que deveriam ser importados sob demanda: {', '.join(carregados)}"
+
+
+def test_tempo_de_importacao():
+    """Tempo próprio de `import analise2` (mediana de processos novos, com pandas e numpy já importados)"""
+    opcao = os.environ.get('ANALISE_MEDIR_IMPORTACAO', '')
+    if opcao in ('', '0'):
+        pytest.skip("medição de tempo opcional: defina ANALISE_MEDIR_IMPORTACAO=1")
+    orcamento = float(opcao) if opcao not in ('1', 'sim') else ORCAMENTO_IMPORTACAO_MS
+    codigo = ("import time, numpy, pandas\n"
+              "inicio = time.perf_counter()\n"
+              "import analise2\n"
+              "print((time.perf_counter() - inicio) * 1000)")
+    # A primeira importação compila analise2 se o .pyc estiver desatualizado e fica fora da mediana
+    medidas = [float(_importar_em_processo_novo(codigo)) for _ in range(REPETICOES + 1)][1:]
+    proprio = float(np.median(medidas))
+    assert proprio <= orcamento, f"import analise2 levou {proprio:.1f} ms > {orcamento:g} ms"
+
+
+def test_linha_de_comando_sem_streamlit():
+    """`python analise2.py --help` decide entre app e linha de comando sem importar o streamlit"""
+    codigo = ("import runpy, sys\n"
+              "sys.argv = ['analise2.py', '--help']\n"
+              "try:\n"
+              "    runpy.run_path('analise2.py', run_name='__main__')\n"
+              "except SystemExit:\n"
+              "    pass\n"
+              "print('streamlit' in sys.modules, file=sys.stderr)")
+    processo = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert processo.stderr.strip() == 'False'
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import gerar_chamados_sinteticos
+
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+    """Planilha sintética com grafias variantes e ausências, e um cache vazio só deste teste"""
+    monkeypatch.setattr(analise2, 'USAR_CACHE', False)
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path / 'cache')
+    df = gerar_chamados_sinteticos(3000, n_categorias=15, n_solucoes=40, taxa_variantes=0.2, semente=3)
+    return tmp_path / 'chamados.xlsx', df
+
+
+def _ordenada(tabela):
+    """Tabela em ordem de rótulos, para comparar resultados que só diferem na ordem dos empates"""
+    if isinstance(tabela, pd.Series):
+        return tabela.sort_index()
+    return tabela.sort_values(list(tabela.columns[:2]), ignore_index=True)
+
+
+@pytest.mark.parametrize('canonicalizar, agrupar_solucoes', [(False, False), (True, True)])
+def test_incremental_igual_ao_cubo(planilha, tmp_path, monkeypatch, canonicalizar, agrupar_solucoes):
+    """Os agregados incrementais, em duas execuções, coincidem com os do cubo da planilha completa"""
+    monkeypatch.setattr(analise2, 'CANONICALIZAR_CATEGORIAS', canonicalizar)
+    monkeypatch.setattr(analise2, 'AGRUPAR_SOLUCOES_SIMILARES', agrupar_solucoes)
+    caminho, df = planilha
+    estado = tmp_path / 'estado.pkl'
+    df.iloc[:2000].to_excel(caminho, index=False)
+    analise2.analise_chamados_incremental(caminho, tamanho_bloco=700, caminho_estado=estado)
+    df.to_excel(caminho, index=False)
+    coluna_categoria, coluna_solucao, _, _, incremental = analise2.analise_chamados_incremental(
+        caminho, tamanho_bloco=700, caminho_estado=estado)
+
+    cubo = analise2.obter_cubo(caminho, usar_cache=False)
+    completo = analise2.finalizar_agregados(analise2.agregados_do_cubo(cubo), coluna_categoria, coluna_solucao)
+
+    assert incremental['total'] == completo['total']
+    for chave in ('categorias', 'solucoes', 'status', 'ano_mes', 'dia_hora', 'categoria_status', 'categoria_dia'):
+        esperado, obtido = _ordenada(completo[chave]), _ordenada(incremental[chave])
+        assert obtido.equals(esperado), chave
+    assert incremental['sla']['chamados'] == completo['sla']['chamados']
+    assert incremental['sla']['geral'].equals(completo['sla']['geral'])
+    for grupo in ('categoria', 'status'):
+        assert _ordenada(incremental['sla'][grupo]).equals(_ordenada(completo['sla'][grupo])), grupo
+
+
+def test_horas_resolucao_em_faixas(planilha):
+    """As contagens por duração têm uma entrada por faixa de RESOLUCAO_SLA_MINUTOS, não uma por chamado"""
+    _, df = planilha
+    df = analise2.processar_datas(df.copy(), 'Data de Abertura')
+    df['Data de Fechamento'] = df['Data de Abertura'] + pd.to_timedelta(
+        pd.Series(range(len(df))) * 37, unit='s')  # durações todas distintas
+    horas = analise2.agregar_horas_resolucao(df, 'Problema Informado', 'Status', 'Data de Abertura',
+                                             'Data de Fechamento')
+    duracoes = horas.index.get_level_values('Horas')
+    passo = analise2.RESOLUCAO_SLA_MINUTOS / 60
+    assert ((duracoes / passo) % 1 == 0).all()
+    geral = horas.xs('geral', level='Grupo')
+    assert len(geral) <= duracoes.max() / passo + 1
+    assert geral.sum() == df['Data de Fechamento'].notna().sum()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import gerar_chamados_sinteticos
+
+N_PASTAS = 3
+N_LINHAS = 400
+
+
+@pytest.fixture
+def pastas(tmp_path, monkeypatch):
+    """Pastas de trabalho com duas abas cada; a segunda equipe usa outro cabeçalho para a categoria"""
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path / 'cache')
+    monkeypatch.setattr(analise2, 'USAR_CACHE', True)
+    df = gerar_chamados_sinteticos(N_LINHAS, taxa_ausentes=0, taxa_variantes=0)
+    metade = N_LINHAS // 2
+    for i in range(N_PASTAS):
+        with pd.ExcelWriter(tmp_path / f"chamados_{i:02d}.xlsx") as escritor:
+            df.iloc[:metade].to_excel(escritor, sheet_name='Equipe A', index=False)
+            df.iloc[metade:].rename(columns={'Problema Informado': 'Tipo de Problema'}).to_excel(
+                escritor, sheet_name='Equipe B', index=False)
+    return tmp_path, df
+
+
+def test_paralelo_igual_a_sequencial(pastas):
+    """Ler as pastas em processos dá o mesmo frame que lê-las uma a uma e concatenar"""
+    pasta, _ = pastas
+    arquivos = sorted(pasta.glob('*.xlsx'))
+    paralelo = analise2.carregar_dados(pasta, usar_cache=False, max_tarefas=2)
+    partes = [analise2.carregar_dados(arquivo, usar_cache=False) for arquivo in arquivos]
+    sequencial = pd.concat(analise2.alinhar_colunas([p.drop(columns=analise2.COLUNAS_ORIGEM) for p in partes]),
+                           ignore_index=True)
+    pd.testing.assert_frame_equal(paralelo.drop(columns=analise2.COLUNAS_ORIGEM), sequencial)
+    for coluna in analise2.COLUNAS_ORIGEM:
+        esperado = np.concatenate([parte[coluna].astype(str).to_numpy() for parte in partes])
+        assert (paralelo[coluna].astype(str).to_numpy() == esperado).all(), coluna
+
+
+def test_colunas_alinhadas(pastas):
+    """A categoria da segunda aba entra na coluna da primeira, na ordem das pastas e das abas"""
+    pasta, df = pastas
+    lido = analise2.carregar_dados(pasta, usar_cache=False, max_tarefas=2)
+    assert len(lido) == N_PASTAS * N_LINHAS
+    assert 'Tipo de Problema' not in lido.columns
+    esperado = np.tile(df['Problema Informado'].astype(str).to_numpy(), N_PASTAS)
+    assert (lido['Problema Informado'].astype(str).to_numpy() == esperado).all()
+
+
+def test_cache_igual_ao_excel(pastas, capsys):
+    """A segunda leitura vem toda do cache colunar e é idêntica à primeira"""
+    pasta, _ = pastas
+    frio = analise2.carregar_dados(pasta, max_tarefas=2)
+    capsys.readouterr()
+    quente = analise2.carregar_dados(pasta, max_tarefas=2)
+    assert f"({N_PASTAS} do cache)" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(quente, frio)
+
+
+def test_sem_planilha_informada(monkeypatch):
+    """Sem caminho nem planilha configurada a leitura falha com uma mensagem clara, e a linha de comando sai com erro"""
+    monkeypatch.setattr(analise2, 'path', None)
+    monkeypatch.delenv('ANALISE_CHAMADOS_PLANILHA', raising=False)
+    with pytest.raises(ValueError, match='Nenhuma planilha informada'):
+        analise2.carregar_dados()
+    with pytest.raises(SystemExit) as saida:
+        analise2.main([])
+    assert saida.value.code == 2
+
+
+def test_pastas_derivadas_da_planilha(pastas, monkeypatch):
+    """configurar_execucao só com a planilha põe saídas e cache na pasta dela"""
+    pasta, _ = pastas
+    for nome in ('path', 'out_dir', 'cache_dir', 'estado_path'):
+        monkeypatch.setattr(analise2, nome, None)
+    for nome in ('ABAS_PLANILHA', 'AGRUPAR_SOLUCOES_SIMILARES', 'ATUALIZAR_CACHE'):
+        monkeypatch.setattr(analise2, nome, getattr(analise2, nome))
+    analise2.configurar_execucao(pasta / 'chamados_00.xlsx')
+    assert analise2.out_dir == pasta
+    assert analise2.cache_dir == pasta / 'cache_chamados'
+    assert analise2.estado_path == pasta / analise2.ARQUIVO_ESTADO
+
+
+@pytest.mark.parametrize('persistir', [False, True])
+def test_cache_papeis_em_disco_so_com_pasta_explicita(pastas, monkeypatch, persistir):
+    """Os papéis ficam sempre na memória; papeis_colunas.json só é gravado se a pasta de cache foi escolhida"""
+    pasta, df = pastas
+    monkeypatch.setattr(analise2, 'PERSISTIR_PAPEIS', persistir)
+    monkeypatch.setattr(analise2, '_cache_papeis', {})
+    papeis = analise2.detectar_papeis_colunas(df)
+    assert analise2._chave_esquema(df) in analise2._cache_papeis
+    assert (pasta / 'cache' / 'papeis_colunas.json').exists() == persistir
+    assert analise2.detectar_papeis_colunas(df) == papeis
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+
+VARIANTES = ['Impressão', 'IMPRESSÃO ', 'impressao!', 'Rede / Wi-Fi', 'E-mail\tcorporativo', 'Ação nº 2',
+             'çÇãõÜ', '', '   ', '123', 'Vídeo Conferência']
+
+
+@pytest.mark.parametrize('valores', [
+    VARIANTES,
+    [f"Solução nº {i} aplicada" for i in range(500)],  # todos distintos: pior caso para a memoização
+    [1, 2.5, 'Rede', 1, 'Rede'],
+], ids=['variantes', 'distintos', 'misturados'])
+def test_normalizar_coluna_igual_a_normalizar_texto(valores):
+    """A versão vetorizada dá o mesmo texto que normalizar_texto aplicado linha a linha"""
+    serie = pd.Series(np.random.default_rng(0).choice(np.array(valores, dtype=object), 2000))
+    esperado = serie.map(analise2.normalizar_texto)
+    assert analise2.normalizar_coluna(serie).tolist() == esperado.tolist()
+
+
+def test_nulos_continuam_nulos():
+    serie = pd.Series(['Rede', None, np.nan, 'REDE'], index=[10, 11, 12, 13], name='Categoria')
+    obtido = analise2.normalizar_coluna(serie)
+    assert obtido.isna().tolist() == [False, True, True, False]
+    assert obtido.dropna().tolist() == ['rede', 'rede']
+    assert obtido.index.equals(serie.index) and obtido.name == 'Categoria'
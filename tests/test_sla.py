@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+
+# Com o calendário padrão: expediente das 8h às 18h, de segunda a sexta; 2024-01-05 é uma sexta-feira
+SEXTA = '2024-01-05'
+
+
+def _horas(abertura, fechamento, **parametros):
+    return analise2.horas_uteis(np.array([abertura], dtype='datetime64[s]'),
+                                np.array([fechamento], dtype='datetime64[s]'), **parametros)[0]
+
+
+def _horas_uteis_por_linha(abertura, fechamento, horario=analise2.HORARIO_COMERCIAL, feriados=()):
+    """Referência lenta: soma, dia a dia, o trecho do expediente coberto pelo chamado"""
+    if pd.isna(abertura) or pd.isna(fechamento) or fechamento < abertura:
+        return np.nan
+    feriados = {pd.Timestamp(d) for d in feriados}
+    total, dia = 0.0, abertura.normalize()
+    while dia <= fechamento.normalize():
+        if analise2.DIAS_UTEIS[dia.weekday()] == '1' and dia not in feriados:
+            inicio = max(abertura, dia + pd.Timedelta(hours=horario[0]))
+            fim = min(fechamento, dia + pd.Timedelta(hours=horario[1]))
+            total += max(0.0, (fim - inicio).total_seconds())
+        dia += pd.Timedelta(days=1)
+    return total / 3600
+
+
+@pytest.mark.parametrize('abertura, fechamento, esperado', [
+    ('2024-01-04T09:00', '2024-01-04T11:30', 2.5),    # mesmo dia
+    ('2024-01-04T09:00', '2024-01-04T09:00', 0.0),    # fechado na hora
+    ('2024-01-04T17:00', '2024-01-05T09:00', 2.0),    # atravessa a noite
+    ('2024-01-05T17:00', '2024-01-08T09:00', 2.0),    # atravessa o fim de semana
+    ('2024-01-06T10:00', '2024-01-07T15:00', 0.0),    # aberto e fechado no fim de semana
+    ('2024-01-06T10:00', '2024-01-08T10:00', 2.0),    # aberto no sábado
+    ('2024-01-04T06:00', '2024-01-04T07:30', 0.0),    # antes do expediente
+    ('2024-01-04T06:00', '2024-01-04T10:00', 2.0),    # aberto antes do expediente
+    ('2024-01-04T19:00', '2024-01-05T08:30', 0.5),    # aberto depois do expediente
+    ('2024-01-01T09:00', '2024-01-12T18:00', 99.0),   # duas semanas úteis menos a primeira hora
+])
+def test_horas_uteis(abertura, fechamento, esperado):
+    assert _horas(abertura, fechamento) == pytest.approx(esperado)
+
+
+def test_feriados():
+    """Feriados contam como fim de semana, inclusive no dia da abertura e no do fechamento"""
+    assert _horas('2024-01-04T09:00', '2024-01-08T09:00', feriados=[SEXTA]) == pytest.approx(10.0)
+    assert _horas(f'{SEXTA}T10:00', '2024-01-08T09:00', feriados=[SEXTA]) == pytest.approx(1.0)
+    assert _horas(f'{SEXTA}T10:00', f'{SEXTA}T12:00', feriados=[SEXTA]) == 0.0
+
+
+def test_sem_fechamento_ou_fechamento_anterior():
+    """Sem uma das datas, ou com o fechamento antes da abertura, a duração fica indefinida"""
+    abertura = np.array(['2024-01-04T09:00', 'NaT', '2024-01-04T09:00', '2024-01-04T09:00'], dtype='datetime64[s]')
+    fechamento = np.array(['NaT', '2024-01-04T10:00', '2024-01-04T08:00', '2024-01-04T10:00'], dtype='datetime64[s]')
+    horas = analise2.horas_uteis(abertura, fechamento)
+    assert np.isnan(horas[:3]).all()
+    assert horas[3] == pytest.approx(1.0)
+
+
+def test_horas_uteis_igual_a_soma_dia_a_dia():
+    """Durações aleatórias (inclusive de vários dias e com feriados) batem com a soma dia a dia"""
+    rng = np.random.default_rng(42)
+    n = 2000
+    abertura = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, n), unit='s')
+    fechamento = abertura + pd.to_timedelta(rng.exponential(3 * 86400, n).astype(np.int64), unit='s')
+    fechamento = fechamento.where(rng.random(n) > 0.05)
+    feriados = ['2022-04-21', '2022-09-07', '2023-11-15', '2024-12-25']
+    horas = analise2.horas_uteis(abertura.to_numpy(), fechamento.to_numpy(), feriados=feriados)
+    referencia = [_horas_uteis_por_linha(a, f, feriados=feriados) for a, f in zip(abertura, fechamento)]
+    np.testing.assert_allclose(horas, referencia, equal_nan=True)
+
+
+def test_percentis_por_grupo_igual_ao_np_percentile():
+    """Percentis, média e % no prazo de cada grupo iguais aos do numpy (interpolação linear), com NaN e sem grupo"""
+    rng = np.random.default_rng(7)
+    n = 20_000
+    codigos = rng.integers(-1, 25, n)  # -1: sem categoria
+    horas = rng.exponential(12, n)
+    horas[rng.random(n) < 0.05] = np.nan
+    rotulos = np.array([f"Categoria {i}" for i in range(25)], dtype=object)
+    tabela = analise2.percentis_por_grupo(codigos, rotulos, horas, 'Categoria', percentis=(50, 90, 99),
+                                          meta_horas=16).set_index('Categoria')
+    validos = (codigos >= 0) & ~np.isnan(horas)
+    assert tabela['Chamados'].sum() == validos.sum()
+    for codigo, rotulo in enumerate(rotulos):
+        grupo = horas[validos & (codigos == codigo)]
+        linha = tabela.loc[rotulo]
+        assert linha['Chamados'] == len(grupo)
+        for p in (50, 90, 99):
+            assert linha[f'P{p}_Horas'] == pytest.approx(round(np.percentile(grupo, p), 2), abs=0.006)
+        assert linha['Media_Horas'] == pytest.approx(round(grupo.mean(), 2), abs=0.006)
+        assert linha['Percentual_No_Prazo'] == pytest.approx(round((grupo <= 16).mean() * 100, 2), abs=0.006)
+
+
+def test_percentis_sem_duracoes():
+    tabela = analise2.percentis_por_grupo(np.array([0, 1]), np.array(['a', 'b'], dtype=object),
+                                          np.array([np.nan, np.nan]), 'Categoria')
+    assert tabela.empty and 'P90_Horas' in tabela.columns
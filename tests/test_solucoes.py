@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+
+SOLUCOES = ['reinicializacao do servico de impressao', 'reinicializado o servico de impressao',
+            'troca de senha do usuario', 'senha do usuario trocada', 'liberacao de acesso a pasta',
+            'substituicao do toner da impressora', 'orientacao ao usuario sobre o sistema']
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(analise2, 'cache_dir', tmp_path)
+    monkeypatch.setattr(analise2, 'USAR_CACHE', True)
+    return tmp_path
+
+
+def test_cache_de_assinaturas_so_com_os_textos_atuais(cache):
+    """O cache é refeito com os textos da execução: não cresce com soluções que já saíram da planilha"""
+    limiar = analise2.LIMIAR_SIMILARIDADE_SOLUCOES
+    analise2._grupos_com_cache(SOLUCOES[:4], limiar)
+    atuais = SOLUCOES[2:]
+    grupos = analise2._grupos_com_cache(atuais, limiar)
+    salvo = pd.read_pickle(analise2._arquivo_assinaturas())
+    assert list(salvo['textos']) == atuais
+    assert salvo['assinaturas'].shape == (len(atuais), analise2.N_PERMUTACOES_MINHASH)
+    np.testing.assert_array_equal(grupos, analise2._grupos_com_cache(atuais, limiar, usar_cache=False))
+    # As assinaturas reaproveitadas do cache são as mesmas de um cálculo do zero
+    analise2._arquivo_assinaturas().unlink()
+    analise2._grupos_com_cache(atuais, limiar)
+    np.testing.assert_array_equal(pd.read_pickle(analise2._arquivo_assinaturas())['assinaturas'],
+                                  salvo['assinaturas'])
+
+
+def _grupos_forca_bruta(normalizados, limiar):
+    """Referência: Jaccard exato entre todos os pares de textos e componentes conexas das arestas acima do limiar"""
+    pares = analise2._radicais_textos(normalizados)
+    conjuntos = [set() for _ in normalizados]
+    for texto, radical in zip(pares['texto'], pares['radical']):
+        conjuntos[texto].add(radical)
+    origem, destino = [], []
+    for i in range(len(conjuntos)):
+        for j in range(i + 1, len(conjuntos)):
+            uniao = len(conjuntos[i] | conjuntos[j])
+            if uniao and len(conjuntos[i] & conjuntos[j]) / uniao >= limiar:
+                origem.append(i)
+                destino.append(j)
+    return analise2.componentes_conexas(len(conjuntos), np.array(origem, dtype=np.int64),
+                                        np.array(destino, dtype=np.int64))
+
+
+def _textos_com_variantes(semente=0):
+    """Frases de 6 palavras distintas e, para cada uma, variantes com uma palavra a mais (Jaccard 6/7)"""
+    rng = np.random.default_rng(semente)
+    vocabulario = [f"{chr(97 + i // 26)}{chr(97 + i % 26)}vqxz" for i in range(400)]  # radicais distintos
+    textos = []
+    for _ in range(60):
+        base = list(rng.choice(vocabulario, 6, replace=False))
+        textos.append(' '.join(base))
+        for _ in range(rng.integers(0, 3)):
+            textos.append(' '.join(base + [str(rng.choice(vocabulario))]))
+    return list(dict.fromkeys(textos))
+
+
+@pytest.mark.parametrize('textos', [SOLUCOES, _textos_com_variantes()], ids=['solucoes', 'variantes'])
+def test_minhash_igual_a_forca_bruta(textos):
+    """MinHash + LSH nunca une textos abaixo do limiar e, com variantes bem acima dele, acha os mesmos grupos"""
+    limiar = analise2.LIMIAR_SIMILARIDADE_SOLUCOES
+    normalizados = list(analise2.normalizar_coluna(pd.Series(textos, dtype=object), compactar_espacos=True))
+    obtido = analise2._grupos_com_cache(normalizados, limiar, usar_cache=False)
+    esperado = _grupos_forca_bruta(normalizados, limiar)
+    # Cada grupo do LSH está contido num grupo da referência (sem uniões falsas)...
+    assert pd.Series(esperado).groupby(obtido).nunique().eq(1).all()
+    # ...e os pares com Jaccard 6/7 são sempre candidatos, então os grupos coincidem
+    np.testing.assert_array_equal(obtido, esperado)
+
+
+def test_representante_e_a_variante_mais_frequente():
+    textos = np.array(['Troca de senha do usuário', 'troca de senha do usuario!', 'Liberação de acesso à pasta'],
+                      dtype=object)
+    representantes = analise2.agrupar_textos_similares(textos, np.array([3, 10, 5]), usar_cache=False)
+    assert representantes.tolist() == [1, 1, 2]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analise2
+from bench_analise import gerar_chamados_sinteticos
+
+CATEGORIA = 'Problema Informado'
+
+
+@pytest.fixture(scope='module')
+def chamados():
+    """Dois anos de chamados ordenados pela abertura, com uma categoria que só surge no fim"""
+    df = gerar_chamados_sinteticos(30_000, n_categorias=40, taxa_ausentes=0.01, taxa_variantes=0,
+                                   data_inicio='2023-01-01', data_fim='2024-12-31', semente=5)
+    df = df.sort_values('Data de Abertura', ignore_index=True)
+    df.loc[df.index[-400:], CATEGORIA] = 'Categoria nova'
+    return analise2.processar_datas(df, 'Data de Abertura')
+
+
+def _tendencias(df):
+    return analise2.atualizar_tendencias(analise2.calcular_agregados(df, CATEGORIA)['categoria_dia'])
+
+
+@pytest.mark.parametrize('fracao', [0.5, 0.9, 0.999])
+def test_incremental_igual_ao_completo(chamados, fracao):
+    """Continuar as séries da primeira parte do frame dá os z-scores e alertas do cálculo completo"""
+    corte = int(len(chamados) * fracao)
+    anterior = _tendencias(chamados.iloc[:corte])
+    incremental = analise2.atualizar_tendencias(
+        analise2.calcular_agregados(chamados, CATEGORIA)['categoria_dia'], anterior)
+    completo = _tendencias(chamados)
+    for periodo in ('diaria', 'semanal'):
+        assert incremental[periodo]['periodos_novos'] < completo[periodo]['periodos_novos']
+        assert sorted(incremental[periodo]['rotulos']) == sorted(completo[periodo]['rotulos'])
+        linhas = pd.Index(incremental[periodo]['rotulos']).get_indexer(completo[periodo]['rotulos'])
+        for chave in ('contagens', 'media', 'desvio', 'z'):
+            np.testing.assert_array_equal(incremental[periodo][chave][linhas], completo[periodo][chave],
+                                          err_msg=f"{periodo}.{chave}")
+
+    ordenar = lambda tabela: tabela.sort_values(['Periodo', 'Categoria'], ignore_index=True)
+    alertas = analise2.alertas_tendencias(incremental)
+    pd.testing.assert_frame_equal(ordenar(alertas), ordenar(analise2.alertas_tendencias(completo)))
+    assert 'Categoria nova' in set(alertas['Categoria'])
+
+
+def test_configuracao_diferente_recalcula_tudo(chamados, monkeypatch):
+    """Séries anteriores calculadas com outra janela não são reaproveitadas"""
+    anterior = _tendencias(chamados.iloc[:len(chamados) // 2])
+    monkeypatch.setattr(analise2, 'JANELA_TENDENCIA_DIAS', analise2.JANELA_TENDENCIA_DIAS + 7)
+    categoria_dia = analise2.calcular_agregados(chamados, CATEGORIA)['categoria_dia']
+    incremental = analise2.atualizar_tendencias(categoria_dia, anterior)
+    assert incremental['diaria']['periodos_novos'] == incremental['diaria']['contagens'].shape[1]
+    completo = analise2.atualizar_tendencias(categoria_dia)
+    np.testing.assert_array_equal(incremental['diaria']['z'], completo['diaria']['z'])